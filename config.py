@@ -141,6 +141,49 @@ TOOL_CONFIGS = {
             }
         ]
     },
+    "place_gazetteer_search": {
+        "name": "Place Geography Search",
+        "description": "Search for places and return structured records with state FIPS, place FIPS, GEOID, place type and county",
+        "tools": [
+            {
+                "name": "search_place_gazetteer",
+                "description": "Search for places by keyword(s) and return records ready to pass to the ACS place tools",
+                "parameters": {
+                    "keyword": {"type": "array", "items": {"type": "string"}, "description": "Search term(s) to match against place names (case-insensitive). Array of strings (e.g., ['waupaca', 'appleton'])"},
+                    "max_results": {"type": "integer", "description": "Maximum number of results to return (default: 20)", "optional": True}
+                }
+            }
+        ]
+    },
+    "county_gazetteer_search": {
+        "name": "County Geography Search",
+        "description": "Search for counties and return structured records with state FIPS, county FIPS and GEOID",
+        "tools": [
+            {
+                "name": "search_county_gazetteer",
+                "description": "Search for counties by keyword(s) and return records ready to pass to the ACS county tools",
+                "parameters": {
+                    "keyword": {"type": "array", "items": {"type": "string"}, "description": "Search term(s) to match against county names (case-insensitive). Array of strings (e.g., ['dupage', 'cook county illinois'])"},
+                    "max_results": {"type": "integer", "description": "Maximum number of results to return (default: 20)", "optional": True}
+                }
+            }
+        ]
+    },
+    "geography_resolver": {
+        "name": "Batch Geography Resolver",
+        "description": "Resolve a list of free-text place or county names to FIPS codes in one call",
+        "tools": [
+            {
+                "name": "resolve_geographies",
+                "description": "Resolve up to 1000 place or county names to FIPS codes with a confidence score and ambiguity flag for each",
+                "parameters": {
+                    "names": {"type": "array", "items": {"type": "string"}, "description": "Free-text names, optionally with a state name or postal code (e.g., ['Milwaukee, WI', 'Cook County, IL', 'Waupaca'])"},
+                    "geo_type": {"type": "string", "description": "'place', 'county', or 'auto' to pick per name (default: 'auto')", "optional": True},
+                    "state_fips": {"type": "string", "description": "Restrict matches to one state when names carry no state (e.g., '55')", "optional": True}
+                }
+            }
+        ]
+    },
     "acs_social_place": {
         "name": "ACS Social Place Data",
         "description": "Pulls data from the US Census Bureau's American Community Survey (ACS) 5-year estimates for place-level social characteristics",
@@ -389,7 +432,21 @@ TOOL_CONFIGS = {
                 "description": "Get simplified OEWS occupation and wage data for multiple locations and occupations with location quotients",
                 "parameters": {
                     "geo_codes": {"type": "array", "items": {"type": "string"}, "description": "Geographic area codes (e.g., ['0600000'] for California, ['0000000'] for national, ['0016980'] for Chicago metro). Array of strings for multiple locations"},
-                    "occ_codes": {"type": "array", "items": {"type": "string"}, "description": "SOC occupation codes (e.g., ['111011'] for Chief Executives, ['151252'] for Software Developers). Array of strings for multiple occupations"}
+                    "occ_codes": {"type": "array", "items": {"type": "string"}, "description": "SOC occupation codes (e.g., ['111011'] for Chief Executives, ['151252'] for Software Developers). Array of strings for multiple occupations"},
+                    "backend": {"type": "string", "description": "'api' (default, BLS timeseries API: employment and median hourly wage) or 'store' (local store built from the OEWS all-data release: adds hourly and annual means and 10th-90th percentile wages)", "optional": True},
+                    "year": {"type": "string", "description": "Release year for the 'store' backend (optional, defaults to the newest ingested release)", "optional": True}
+                }
+            },
+            {
+                "name": "get_top_occupations",
+                "description": "Discover the top occupations in one area by employment, location quotient or wage from the local OEWS store without knowing SOC codes",
+                "parameters": {
+                    "area_code": {"type": "string", "description": "OEWS area code (e.g., '0016980' for Chicago metro, '1700000' for Illinois), 2-digit state FIPS or 5-digit CBSA code"},
+                    "metric": {"type": "string", "description": "'employment' (default), 'employment_lq', 'jobs_per_1000', or a wage statistic such as 'hourly_median', 'annual_mean', 'annual_pct90'", "optional": True},
+                    "top_k": {"type": "integer", "description": "Number of occupations to return (default: 10, max: 100)", "optional": True},
+                    "detailed_only": {"type": "boolean", "description": "Rank detailed occupations only (default: true)", "optional": True},
+                    "min_employment": {"type": "integer", "description": "Skip occupations with lower employment (default: 0)", "optional": True},
+                    "year": {"type": "string", "description": "Release year (optional, defaults to the newest ingested release)", "optional": True}
                 }
             }
         ]
@@ -432,7 +489,56 @@ TOOL_CONFIGS = {
                 "parameters": {
                     "geo_codes": {"type": "array", "items": {"type": "string"}, "description": "Geographic area codes (e.g., ['17043'] for DuPage County IL, ['US000'] for national, ['06'] for California state). Array of strings for multiple locations"},
                     "industry_codes": {"type": "array", "items": {"type": "string"}, "description": "NAICS industry codes (e.g., ['1013'] for Manufacturing, ['10'] for Total All Industries). Array of strings for multiple industries"},
-                    "year": {"type": "string", "description": "Specific year for historical data (optional, defaults to latest available)", "optional": True}
+                    "year": {"type": "string", "description": "Specific year for historical data (optional, defaults to latest available)", "optional": True},
+                    "backend": {"type": "string", "description": "'api' (default, BLS timeseries API), 'slices' (QCEW open data CSV slices, annual averages; faster for many industries or areas) or 'store' (local Parquet store built from the BLS singlefile archives, annual averages)", "optional": True}
+                }
+            },
+            {
+                "name": "get_qcew_time_series",
+                "description": "Get quarterly QCEW employment and establishment time series over a range of years with year-over-year growth and CAGR",
+                "parameters": {
+                    "geo_codes": {"type": "array", "items": {"type": "string"}, "description": "Geographic area codes (e.g., ['17043'] for DuPage County IL, ['US000'] for national, ['06'] for California state)"},
+                    "industry_codes": {"type": "array", "items": {"type": "string"}, "description": "NAICS industry codes (e.g., ['1013'] for Manufacturing, ['10'] for Total All Industries)"},
+                    "start_year": {"type": "string", "description": "First year of the series (e.g., '2015')"},
+                    "end_year": {"type": "string", "description": "Last year of the series (optional, defaults to the current year; at most 20 years per request)", "optional": True}
+                }
+            },
+            {
+                "name": "get_qcew_shift_share",
+                "description": "Shift-share analysis of QCEW employment change between two periods: national growth, industry mix and competitive share for each area and industry",
+                "parameters": {
+                    "geo_codes": {"type": "array", "items": {"type": "string"}, "description": "Geographic area codes (e.g., ['17043'] for DuPage County IL, ['06'] for California state)"},
+                    "industry_codes": {"type": "array", "items": {"type": "string"}, "description": "NAICS industry codes (e.g., ['1013', '1023'])"},
+                    "base_year": {"type": "string", "description": "Base year (e.g., '2019')"},
+                    "end_year": {"type": "string", "description": "End year (optional, defaults to the latest published data)", "optional": True},
+                    "backend": {"type": "string", "description": "'api' (default, latest quarter vs. the same quarter of base_year from the BLS API) or 'store' (annual averages from the local QCEW Parquet store)", "optional": True}
+                }
+            },
+            {
+                "name": "get_top_industries",
+                "description": "Discover the top industries in one area by employment, establishments, location quotient or average weekly wage without knowing NAICS codes",
+                "parameters": {
+                    "area_code": {"type": "string", "description": "QCEW area code (e.g., '17043' for DuPage County IL, 'C1698' for Chicago MSA) or 2-digit state FIPS code"},
+                    "metric": {"type": "string", "description": "'employees' (default), 'establishments', 'employee_lq' or 'avg_weekly_wage'", "optional": True},
+                    "top_k": {"type": "integer", "description": "Number of industries to return (default: 10, max: 100)", "optional": True},
+                    "naics_level": {"type": "integer", "description": "NAICS digits to rank at, 2 (sector) to 6 (default)", "optional": True},
+                    "ownership_code": {"type": "string", "description": "'5' private (default) or '0' total covered", "optional": True},
+                    "year": {"type": "string", "description": "Year of annual averages (optional, defaults to the latest published year)", "optional": True},
+                    "min_employees": {"type": "integer", "description": "Skip industries with fewer employees, useful when ranking by LQ (default: 0)", "optional": True},
+                    "backend": {"type": "string", "description": "'slices' (default, QCEW open data area slice) or 'store' (local QCEW Parquet store)", "optional": True}
+                }
+            },
+            {
+                "name": "screen_qcew_counties",
+                "description": "Screen every county in a state by industry from the local QCEW Parquet store, ranked by employment, establishments, wages or location quotient",
+                "parameters": {
+                    "state_fips": {"type": "string", "description": "2-digit state FIPS code (e.g., '17' for Illinois)"},
+                    "industry_codes": {"type": "array", "items": {"type": "string"}, "description": "Industry codes to include (e.g., ['311', '3254']); defaults to every 6-digit NAICS industry", "optional": True},
+                    "year": {"type": "string", "description": "Year of annual averages (optional, defaults to the newest year in the store)", "optional": True},
+                    "ownership_code": {"type": "string", "description": "'0' total covered, '1' federal, '2' state, '3' local government, '5' private (default)", "optional": True},
+                    "min_employees": {"type": "integer", "description": "Drop county-industry rows with fewer employees (default: 0)", "optional": True},
+                    "sort_by": {"type": "string", "description": "'employees' (default), 'establishments', 'avg_weekly_wage' or 'employee_lq'", "optional": True},
+                    "limit": {"type": "integer", "description": "Maximum rows to return (default: 50, max: 1000)", "optional": True}
                 }
             }
         ]
@@ -459,7 +565,8 @@ TOOL_CONFIGS = {
                 "name": "search_qcew_naics",
                 "description": "Search for industries by keyword(s) and return their NAICS codes",
                 "parameters": {
-                    "keyword": {"type": "array", "items": {"type": "string"}, "description": "Search term(s) to match against industry names (case-insensitive). Array of strings (e.g., ['manufacturing', 'retail']) for multiple searches, or single string ['manufacturing'] for one search"}
+                    "keyword": {"type": "array", "items": {"type": "string"}, "description": "Search term(s) to match against industry names (case-insensitive). Array of strings (e.g., ['manufacturing', 'retail']) for multiple searches, or single string ['manufacturing'] for one search"},
+                    "max_results": {"type": "integer", "description": "Maximum number of results to return (default: 20)", "optional": True}
                 }
             }
         ]
@@ -498,6 +605,27 @@ TOOL_CONFIGS = {
             }
         ]
     },
+    "rank_acs_data_change": {
+        "name": "Rank ACS Data Change",
+        "description": "Find geographic areas with the largest change in a specific ACS data point between two years",
+        "tools": [
+            {
+                "name": "rank_acs_data_change",
+                "description": "Find geographic areas (places, counties, states, MSAs) with the largest increase or decrease in a specified ACS data point between two years",
+                "parameters": {
+                    "data_point": {"type": "string", "description": "The ACS data point/variable to compare (e.g., 'DP04_0089E' for median home value)"},
+                    "geo_type": {"type": "string", "description": "The geographic type to query ('place', 'county', 'state', 'metropolitan statistical area/micropolitan statistical area')"},
+                    "start_year": {"type": "string", "description": "The earlier ACS year (e.g., '2017')"},
+                    "end_year": {"type": "string", "description": "The later ACS year (e.g., '2022')"},
+                    "state_fips": {"type": "string", "description": "The FIPS code for the state to limit results to. If not provided, queries all areas. Note: Not applicable for MSA queries.", "optional": True},
+                    "sort_by": {"type": "string", "description": "'percent_change' or 'absolute_change' (default: 'percent_change')", "optional": True},
+                    "direction": {"type": "string", "description": "'high' for the biggest gains or 'low' for the biggest declines (default: 'high')", "optional": True},
+                    "limit": {"type": "integer", "description": "Number of results to return (default: 20, max: 100)", "optional": True},
+                    "min_start_value": {"type": "number", "description": "Skip areas whose start year value is below this threshold", "optional": True}
+                }
+            }
+        ]
+    },
     "eia_elec_rates": {
         "name": "EIA Electricity Rates",
         "description": "Get electricity rates by zipcode from investor-owned and non-investor-owned utilities",
@@ -545,6 +673,68 @@ TOOL_CONFIGS = {
             }
         ]
     },
+    "geography_crosswalk": {
+        "name": "Geography Crosswalk",
+        "description": "Translate codes between ACS state/county/place/CBSA, ZIP, QCEW area and OEWS area code systems",
+        "tools": [
+            {
+                "name": "translate_geographies",
+                "description": "Translate geography codes from one system to another in one in-memory lookup, following chains such as ZIP -> county -> CBSA automatically",
+                "parameters": {
+                    "codes": {"type": "array", "items": {"type": "string"}, "description": "Codes to translate. County and place codes are full GEOIDs (e.g., ['17043'] or ['1714000'])"},
+                    "from_system": {"type": "string", "description": "Source system: 'state', 'county', 'place', 'cbsa', 'zip', 'qcew_area', or 'oews_area'"},
+                    "to_system": {"type": "string", "description": "Target system, one of the same values"}
+                }
+            }
+        ]
+    },
+    "autocomplete": {
+        "name": "Name Autocomplete",
+        "description": "Complete partial place, county, MSA, occupation and industry names from sorted in-memory prefix indexes",
+        "tools": [
+            {
+                "name": "autocomplete_names",
+                "description": "Return the top completions with their codes for a partial name, ranked by whether the name starts with it and by population",
+                "parameters": {
+                    "prefix": {"type": "string", "description": "Partial input as typed (e.g., 'Sprin', 'new yo')"},
+                    "types": {"type": "array", "items": {"type": "string"}, "description": "Optional name types: 'place', 'county', 'msa', 'soc', 'naics' (default: all)"},
+                    "max_results": {"type": "integer", "description": "Maximum completions per type (default: 10, max: 50)"}
+                }
+            }
+        ]
+    },
+    "code_descriptions": {
+        "name": "Classification Code Lookup",
+        "description": "Look up names and hierarchy parents for NAICS, SOC, QCEW area, OEWS area, CIP and award level codes",
+        "tools": [
+            {
+                "name": "describe_codes",
+                "description": "Return the name, parent code and parent name for each code in one in-memory lookup",
+                "parameters": {
+                    "system": {"type": "string", "description": "Code system: 'naics', 'soc', 'qcew_area', 'oews_area', 'cip', or 'award_level'"},
+                    "codes": {"type": "array", "items": {"type": "string"}, "description": "Codes to describe. Array of strings (e.g., ['1013', '336111'] for NAICS)"}
+                }
+            },
+            {
+                "name": "expand_codes",
+                "description": "Expand codes into their children or all descendants at one hierarchy level (e.g., every 3-digit subsector of NAICS 31-33) for one batched data request",
+                "parameters": {
+                    "system": {"type": "string", "description": "Code system: 'naics', 'soc', 'qcew_area', 'oews_area', 'cip', or 'award_level'"},
+                    "codes": {"type": "array", "items": {"type": "string"}, "description": "Codes to expand (e.g., ['31-33'])"},
+                    "level": {"type": "integer", "description": "Absolute hierarchy level to expand to (NAICS: 1 sector, 2 3-digit, 3 4-digit, 4 5-digit, 5 6-digit; SOC: 1 major group, 2 detailed). Defaults to direct children", "optional": True}
+                }
+            },
+            {
+                "name": "rollup_codes",
+                "description": "Sum additive values (employment, establishments) for detailed codes up to their parents at one hierarchy level without another data request",
+                "parameters": {
+                    "system": {"type": "string", "description": "Code system: 'naics', 'soc', 'qcew_area', 'oews_area', 'cip', or 'award_level'"},
+                    "values": {"type": "object", "description": "Code -> value at one level of detail (e.g., {'311111': 120, '311119': 40})"},
+                    "level": {"type": "integer", "description": "Absolute hierarchy level to roll up to (see expand_codes)"}
+                }
+            }
+        ]
+    },
     "ipeds_cip_codes": {
         "name": "IPEDS CIP Code Lookup",
         "description": "Look up Classification of Instructional Programs (CIP) codes and descriptions",
@@ -622,4 +812,119 @@ SERVER_CONFIG = {
     "description": "A demonstration MCP server with tools, prompts, and resources",
     "port": int(os.getenv("PORT", 8000)),
     "host": os.getenv("HOST", "0.0.0.0")
-}
\ No newline at end of file
+}
+
+def _parse_hot_rank_variables(value: str) -> list:
+    """Parse "DP05_0001E:county,DP03_0062E:state" into (variable, geo_type) pairs."""
+    pairs = []
+    for item in value.split(","):
+        if ":" in item:
+            data_point, geo_type = item.split(":", 1)
+            pairs.append((data_point.strip(), geo_type.strip().lower()))
+    return pairs
+
+
+# Hot (variable, geo_type) pairs whose rankings are precomputed in memory so
+# rank_acs_data_* can answer them without calling the Census API.
+# Override with RANK_INDEX_HOT_VARIABLES="DP05_0001E:county,DP03_0062E:place"
+_MSA_GEO_TYPE = "metropolitan statistical area/micropolitan statistical area"
+RANK_INDEX_CONFIG = {
+    "enabled": os.getenv("RANK_INDEX_ENABLED", "true").lower() == "true",
+    "refresh_interval_seconds": int(os.getenv("RANK_INDEX_REFRESH_SECONDS", 24 * 60 * 60)),
+    "hot_variables": _parse_hot_rank_variables(os.getenv("RANK_INDEX_HOT_VARIABLES", "")) or [
+        (data_point, geo_type)
+        for data_point in [
+            "DP05_0001E",   # Total population
+            "DP03_0062E",   # Median household income
+            "DP03_0128PE",  # Percent of all people below the poverty level
+            "DP04_0089E",   # Median home value (owner-occupied units)
+        ]
+        for geo_type in ["county", "place", "state", _MSA_GEO_TYPE]
+    ]
+}
+
+# Directory holding the county-CBSA, place-county, ZIP-county and OEWS area-county
+# relation files built by "python -m tools.common.crosswalk"
+CROSSWALK_CONFIG = {
+    "data_dir": os.getenv("CROSSWALK_DATA_DIR", os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "crosswalks"))
+}
+
+# Directory holding versioned lookup-table artifacts built by "python -m tools.common.lookup_tables".
+# Tables without an artifact use the built-in tables in the search modules.
+LOOKUP_TABLE_CONFIG = {
+    "data_dir": os.getenv("LOOKUP_TABLE_DATA_DIR", os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "lookup"))
+}
+
+# BLS Public Data API requests: batches of 50 series posted at once, the per-request timeout,
+# registration keys (comma-separated in BLS_API_KEYS) with their daily query and series limits,
+# and how long fetched local and national baseline series are served from memory
+BLS_API_CONFIG = {
+    "max_parallel_batches": int(os.getenv("BLS_MAX_PARALLEL_BATCHES", 4)),
+    "timeout_seconds": float(os.getenv("BLS_TIMEOUT_SECONDS", 60)),
+    "registration_keys": [key.strip() for key in os.getenv("BLS_API_KEYS", "243f61eeaa6c450db0a2ecb8dc08c44f").split(",") if key.strip()],
+    "daily_request_limit": int(os.getenv("BLS_DAILY_REQUEST_LIMIT", 500)),
+    "daily_series_limit": int(os.getenv("BLS_DAILY_SERIES_LIMIT", 25000)),
+    "series_cache_ttl_seconds": int(os.getenv("BLS_SERIES_CACHE_TTL_SECONDS", 6 * 60 * 60)),
+    # National LQ baseline series: QCEW publishes quarterly, OEWS annually
+    "baseline_ttl_seconds": {
+        "quarterly": int(os.getenv("BLS_QCEW_BASELINE_TTL_SECONDS", 7 * 24 * 60 * 60)),
+        "annual": int(os.getenv("BLS_OEWS_BASELINE_TTL_SECONDS", 30 * 24 * 60 * 60))
+    }
+}
+
+# Retry, backoff, hedging and circuit breaker policy for upstream HTTP requests
+# (tools.common.upstream). The default applies to every host; the per-host entries override
+# it. Hedging sends a duplicate GET when the first has not answered within hedge_after_seconds.
+UPSTREAM_CONFIG = {
+    "default": {
+        "max_attempts": int(os.getenv("UPSTREAM_MAX_ATTEMPTS", 3)),
+        "backoff_base_seconds": float(os.getenv("UPSTREAM_BACKOFF_BASE_SECONDS", 0.5)),
+        "backoff_max_seconds": float(os.getenv("UPSTREAM_BACKOFF_MAX_SECONDS", 8.0)),
+        # Circuit breaker: open after this many consecutive failures, probe again after the open period
+        "breaker_failure_threshold": int(os.getenv("UPSTREAM_BREAKER_FAILURES", 5)),
+        "breaker_open_seconds": float(os.getenv("UPSTREAM_BREAKER_OPEN_SECONDS", 30)),
+        "breaker_max_open_seconds": float(os.getenv("UPSTREAM_BREAKER_MAX_OPEN_SECONDS", 300)),
+        "stale_ttl_seconds": int(os.getenv("UPSTREAM_STALE_TTL_SECONDS", 24 * 60 * 60))
+    },
+    "policies": {
+        "api.census.gov": {
+            "max_attempts": int(os.getenv("UPSTREAM_CENSUS_MAX_ATTEMPTS", 3)),
+            "hedge_after_seconds": float(os.getenv("UPSTREAM_CENSUS_HEDGE_SECONDS", 3.0)) or None
+        },
+        "api.bls.gov": {
+            "max_attempts": int(os.getenv("UPSTREAM_BLS_MAX_ATTEMPTS", 2))
+        },
+        "educationdata.urban.org": {
+            "max_attempts": int(os.getenv("UPSTREAM_IPEDS_MAX_ATTEMPTS", 4)),
+            "breaker_failure_threshold": int(os.getenv("UPSTREAM_IPEDS_BREAKER_FAILURES", 3)),
+            # Longest a single IPEDS request may take across all attempts
+            "deadline_seconds": float(os.getenv("UPSTREAM_IPEDS_DEADLINE_SECONDS", 120))
+        }
+    }
+}
+
+# QCEW open data CSV slices used by get_qcew_data(backend="slices"). Point QCEW_SLICE_BASE_URL
+# at a local mirror to serve slices without calling data.bls.gov.
+QCEW_SLICE_CONFIG = {
+    "base_url": os.getenv("QCEW_SLICE_BASE_URL", "https://data.bls.gov/cew/data/api"),
+    "cache_ttl_seconds": int(os.getenv("QCEW_SLICE_CACHE_TTL_SECONDS", 24 * 60 * 60))
+}
+
+# Partitioned Parquet store built from the BLS QCEW singlefile archives by
+# "python -m tools.qcew_data.qcew_store", used by get_qcew_data(backend="store") and screen_qcew_counties
+QCEW_STORE_CONFIG = {
+    "data_dir": os.getenv("QCEW_STORE_DIR", os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "qcew_store"))
+}
+
+# Local copies of the OpenEI utility rate by ZIP code files used by get_electricity_rates,
+# revalidated with a conditional GET once refresh_interval_seconds have passed
+EIA_RATE_STORE_CONFIG = {
+    "data_dir": os.getenv("EIA_RATE_STORE_DIR", os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "eia_rates")),
+    "refresh_interval_seconds": int(os.getenv("EIA_RATE_REFRESH_SECONDS", 7 * 24 * 60 * 60))
+}
+
+# Parquet store built from the OEWS all-data release by "python -m tools.oews_data.oews_store",
+# used by get_oews_data(backend="store")
+OEWS_STORE_CONFIG = {
+    "data_dir": os.getenv("OEWS_STORE_DIR", os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "oews_store"))
+}
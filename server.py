@@ -21,7 +21,7 @@ from starlette.types import ASGIApp
 from datetime import datetime
 from typing import Optional, Dict, Union, Any, List, Tuple
 
-from config import TOOL_CONFIGS, PROMPT_CONFIGS, RESOURCE_CONFIGS, SERVER_CONFIG
+from config import TOOL_CONFIGS, PROMPT_CONFIGS, RESOURCE_CONFIGS, SERVER_CONFIG, RANK_INDEX_CONFIG, CROSSWALK_CONFIG, LOOKUP_TABLE_CONFIG, BLS_API_CONFIG, UPSTREAM_CONFIG, QCEW_SLICE_CONFIG, QCEW_STORE_CONFIG, OEWS_STORE_CONFIG, EIA_RATE_STORE_CONFIG
 from tools.acs_data.acs_social_county import acs_social_county_pull
 from tools.acs_data.acs_economic_county import acs_economic_county_pull
 from tools.acs_data.acs_housing_county import acs_housing_county_pull
@@ -41,20 +41,38 @@ from tools.acs_data.fips_census_county import search_county_fips
 from tools.acs_data.fips_census_place import search_place_fips
 from tools.acs_data.fips_census_msa import search_msa_fips
 from tools.acs_data.fips_census_state import search_state_fips
+from tools.acs_data.gazetteer import search_place_gazetteer, search_county_gazetteer
+from tools.acs_data.resolve_geographies import resolve_geographies
 from tools.oews_data.oews_data import get_oews_data
 from tools.oews_data.oews_fips import search_oews_fips
 from tools.oews_data.oews_soc import search_oews_soc
+from tools.oews_data.oews_store import set_oews_store_dir, oews_store_status
+from tools.oews_data.oews_top import get_top_occupations
 from tools.qcew_data.qcew_data import get_qcew_data
+from tools.qcew_data.qcew_slices import set_qcew_slice_source
+from tools.qcew_data.qcew_timeseries import get_qcew_time_series
+from tools.qcew_data.qcew_shift_share import get_qcew_shift_share
+from tools.qcew_data.qcew_top import get_top_industries
+from tools.qcew_data.qcew_store import set_qcew_store_dir, qcew_store_status, screen_qcew_counties
 from tools.qcew_data.qcew_fips import search_qcew_fips
 from tools.qcew_data.qcew_naics import search_qcew_naics
+from tools.common.code_index import describe_codes, expand_codes, rollup_codes
+from tools.common.autocomplete import autocomplete_names
+from tools.common.crosswalk import translate_geographies, set_crosswalk_data_dir
+from tools.common.lookup_tables import set_lookup_data_dir, lookup_table_status
+from tools.common.bls_api import configure_bls_api, bls_api_status
+from tools.common.upstream import configure_upstream, upstream_status
 from tools.acs_data.rank_acs_data_high import rank_acs_data_high
 from tools.acs_data.rank_acs_data_low import rank_acs_data_low
+from tools.acs_data.rank_acs_data_change import rank_acs_data_change
+from tools.acs_data.rank_acs_index import start_rank_index_refresher, rank_index_status
 from tools.acs_data.acs_demographics_county import acs_demographics_county_pull
 from tools.acs_data.acs_demographics_place import acs_demographics_place_pull
 from tools.acs_data.acs_demographics_msa import acs_demographics_msa_pull
 from tools.acs_data.acs_demographics_state import acs_demographics_state_pull
 from tools.acs_data.acs_demographics_national import acs_demographics_national_pull
 from tools.eia_data.eia_elec_rates import get_electricity_rates
+from tools.eia_data.eia_rate_store import set_eia_rate_store, eia_rate_store_status
 from tools.ipeds_data.ipeds_institution_directory import get_postsecondary_institutions as ipeds_get_institutions
 from tools.ipeds_data.ipeds_program_data import get_programs as ipeds_get_programs
 from tools.ipeds_data.get_cip_codes import get_cip_codes as ipeds_get_cip_codes
@@ -165,6 +183,33 @@ def lookup_state_fips(keyword: List[str], max_results: Optional[int] = 20) -> Li
         logger.error(f"Error in search_state_fips: {e}")
         raise ValueError("Invalid input: Please provide a valid search keyword")
 
+@mcp.tool()
+def lookup_place_geography(keyword: List[str], max_results: Optional[int] = 20) -> List[Dict[str, Any]]:
+    """Search for places (cities, towns, CDPs) by keyword(s) and return structured records with state_fips, place_fips, full GEOID, place type, county and population. The state_fips and place_fips can be passed directly to the get_acs_place_* tools without a separate state lookup."""
+    try:
+        return search_place_gazetteer(keyword, max_results)
+    except Exception as e:
+        logger.error(f"Error in search_place_gazetteer: {e}")
+        raise ValueError("Invalid input: Please provide a valid search keyword")
+
+@mcp.tool()
+def lookup_county_geography(keyword: List[str], max_results: Optional[int] = 20) -> List[Dict[str, Any]]:
+    """Search for counties by keyword(s) and return structured records with state_fips, county_fips, full GEOID and population. The state_fips and county_fips can be passed directly to the get_acs_county_* tools without a separate state lookup."""
+    try:
+        return search_county_gazetteer(keyword, max_results)
+    except Exception as e:
+        logger.error(f"Error in search_county_gazetteer: {e}")
+        raise ValueError("Invalid input: Please provide a valid search keyword")
+
+@mcp.tool()
+def resolve_geography_names(names: List[str], geo_type: Optional[str] = "auto", state_fips: Optional[str] = None) -> Dict[str, Any]:
+    """Resolve a list of up to 1000 free-text place or county names (e.g. pasted from a spreadsheet, like "Milwaukee, WI" or "Cook County, IL") to FIPS codes in one call. Misspellings are tolerated. Returns a compact table with one row per name: matched name, geo_type, state_fips, place/county code, GEOID, a 0-1 confidence score, an ambiguity flag and up to three close alternatives."""
+    try:
+        return resolve_geographies(names, geo_type, state_fips)
+    except Exception as e:
+        logger.error(f"Error in resolve_geographies: {e}")
+        raise ValueError("Invalid input: Please provide a list of place or county names")
+
 @mcp.tool()
 def get_acs_msa_social_data(msa_fips: List[str], year: Optional[str] = None) -> Dict[str, Any]:
     """Pulls MSA/Micropolitan area-level social characteristics data from the US Census Bureau's American Community Survey (ACS) 5-year estimates. Supports multiple MSAs in a single request by passing multiple FIPS codes in the array."""
@@ -247,14 +292,23 @@ def get_acs_national_housing_data(year: Optional[str] = None) -> Dict[str, Any]:
         raise ValueError("Invalid input: Please provide valid optional year")
 
 @mcp.tool()
-def get_oews_occupation_wage_data(geo_codes: List[str], occ_codes: List[str]) -> Dict[str, Any]:
-    """Get simplified OEWS occupation and wage data for multiple locations and occupations with location quotients. Uses BLS OEWS API to fetch employment and wage data."""
+def get_oews_occupation_wage_data(geo_codes: List[str], occ_codes: List[str], backend: Optional[str] = "api", year: Optional[str] = None) -> Dict[str, Any]:
+    """Get simplified OEWS occupation and wage data for multiple locations and occupations with location quotients. Uses BLS OEWS API to fetch employment and wage data. Set backend="store" to read from the local store built from the OEWS all-data release, which returns full wage distributions (hourly and annual mean and 10th, 25th, median, 75th and 90th percentiles) with no API calls; year then selects the release."""
     try:
-        return get_oews_data(geo_codes, occ_codes)
+        return get_oews_data(geo_codes, occ_codes, backend or "api", year)
     except Exception as e:
         logger.error(f"Error in get_oews_data: {e}")
         raise ValueError("Invalid input: Please provide valid geographic area codes and occupation codes")
 
+@mcp.tool()
+def find_top_area_occupations(area_code: str, metric: Optional[str] = "employment", top_k: Optional[int] = 10, detailed_only: Optional[bool] = True, min_employment: Optional[int] = 0, year: Optional[str] = None) -> Dict[str, Any]:
+    """Find the top occupations in one area without guessing SOC codes. Ranks every occupation in the local OEWS store for the area by employment, employment_lq (location quotient), jobs_per_1000 or a wage statistic (e.g. hourly_median, annual_mean, annual_pct90). Use min_employment to skip small occupations when ranking by LQ or wage."""
+    try:
+        return get_top_occupations(area_code, metric, top_k, detailed_only, min_employment, year)
+    except Exception as e:
+        logger.error(f"Error in get_top_occupations: {e}")
+        raise ValueError("Invalid input: Please provide a valid OEWS area code and metric")
+
 @mcp.tool()
 def lookup_oews_area_fips(keyword: List[str], max_results: Optional[int] = 20) -> List[Tuple[str, str]]:
     """Search for OEWS geographic areas by keyword(s) and return their FIPS codes. Includes states, metros, and nonmetropolitan areas."""
@@ -274,14 +328,50 @@ def lookup_oews_occupation_codes(keyword: List[str], max_results: Optional[int]
         raise ValueError("Invalid input: Please provide a valid search keyword")
 
 @mcp.tool()
-def get_qcew_industry_employment_data(geo_codes: List[str], industry_codes: List[str], year: Optional[str] = None) -> Dict[str, Any]:
-    """Get simplified QCEW industry establishment and employee data for multiple locations and industries with location quotients. Uses BLS QCEW API to fetch employment and establishment data. Optionally specify a year for historical data."""
+def get_qcew_industry_employment_data(geo_codes: List[str], industry_codes: List[str], year: Optional[str] = None, backend: Optional[str] = "api") -> Dict[str, Any]:
+    """Get simplified QCEW industry establishment and employee data for multiple locations and industries with location quotients. Uses BLS QCEW API to fetch employment and establishment data. Optionally specify a year for historical data. Set backend="slices" to read annual averages from the QCEW open data CSV files (one download per area or industry), which is faster for requests covering many industries or many areas, or backend="store" to read them from the local Parquet store built from the BLS singlefile archives."""
     try:
-        return get_qcew_data(geo_codes, industry_codes, year)
+        return get_qcew_data(geo_codes, industry_codes, year, backend or "api")
     except Exception as e:
         logger.error(f"Error in get_qcew_data: {e}")
         raise ValueError("Invalid input: Please provide valid geographic area codes, industry codes, and optional year")
 
+@mcp.tool()
+def get_qcew_industry_employment_trends(geo_codes: List[str], industry_codes: List[str], start_year: str, end_year: Optional[str] = None) -> Dict[str, Any]:
+    """Get quarterly QCEW employment and establishment time series for multiple locations and industries over a range of years (up to 20), with year-over-year growth for every quarter and compound annual growth (CAGR) per series. Values are compact arrays aligned to a shared list of quarters."""
+    try:
+        return get_qcew_time_series(geo_codes, industry_codes, start_year, end_year)
+    except Exception as e:
+        logger.error(f"Error in get_qcew_time_series: {e}")
+        raise ValueError("Invalid input: Please provide valid geographic area codes, industry codes, and a start year")
+
+@mcp.tool()
+def get_qcew_shift_share_analysis(geo_codes: List[str], industry_codes: List[str], base_year: str, end_year: Optional[str] = None, backend: Optional[str] = "api") -> Dict[str, Any]:
+    """Shift-share analysis of QCEW employment for multiple locations and industries: splits each industry's employment change since base_year into national growth, industry mix and competitive share, with totals per location. Industries suppressed in either period are flagged "incomplete", have no components and are left out of the totals. Fetches both periods and the U.S. baseline in one batched BLS request per 50 series. Set backend="store" to compare annual averages from the local QCEW Parquet store."""
+    try:
+        return get_qcew_shift_share(geo_codes, industry_codes, base_year, end_year, backend or "api")
+    except Exception as e:
+        logger.error(f"Error in get_qcew_shift_share: {e}")
+        raise ValueError("Invalid input: Please provide valid geographic area codes, industry codes, and a base year")
+
+@mcp.tool()
+def find_top_area_industries(area_code: str, metric: Optional[str] = "employees", top_k: Optional[int] = 10, naics_level: Optional[int] = 6, ownership_code: Optional[str] = "5", year: Optional[str] = None, min_employees: Optional[int] = 0, backend: Optional[str] = "slices") -> Dict[str, Any]:
+    """Find the top industries in one area (e.g. "most concentrated industries in DuPage County") without guessing NAICS codes. Ranks every industry at a NAICS level (2-6 digits) by employees, establishments, employee_lq (location quotient) or avg_weekly_wage, reading all of the area's industries in one QCEW open data download (or from the local QCEW store with backend="store"). Use min_employees to skip tiny industries when ranking by LQ."""
+    try:
+        return get_top_industries(area_code, metric, top_k, naics_level, ownership_code, year, min_employees, backend)
+    except Exception as e:
+        logger.error(f"Error in get_top_industries: {e}")
+        raise ValueError("Invalid input: Please provide a valid QCEW area code and metric")
+
+@mcp.tool()
+def screen_qcew_county_industries(state_fips: str, industry_codes: Optional[List[str]] = None, year: Optional[str] = None, ownership_code: Optional[str] = "5", min_employees: Optional[int] = 0, sort_by: Optional[str] = "employees", limit: Optional[int] = 50) -> Dict[str, Any]:
+    """Screen every county in a state across industries (all 6-digit NAICS industries by default) using the local QCEW Parquet store built from the BLS singlefile archives. Returns county-industry rows with employees, establishments, average weekly wage and the BLS employment location quotient, ranked by sort_by."""
+    try:
+        return screen_qcew_counties(state_fips, industry_codes, year, ownership_code, min_employees, sort_by, limit)
+    except Exception as e:
+        logger.error(f"Error in screen_qcew_counties: {e}")
+        raise ValueError("Invalid input: Please provide a valid 2-digit state FIPS code and optional industry codes")
+
 @mcp.tool()
 def lookup_qcew_area_fips(keyword: List[str], max_results: Optional[int] = 20) -> List[Tuple[str, str]]:
     """Search for QCEW geographic areas by keyword(s) and return their FIPS codes. Includes counties, states, and other geographic areas used in QCEW data."""
@@ -292,14 +382,59 @@ def lookup_qcew_area_fips(keyword: List[str], max_results: Optional[int] = 20) -
         raise ValueError("Invalid input: Please provide a valid search keyword")
 
 @mcp.tool()
-def lookup_qcew_industry_codes(keyword: List[str]) -> List[Tuple[str, str]]:
+def lookup_qcew_industry_codes(keyword: List[str], max_results: Optional[int] = 20) -> List[Tuple[str, str]]:
     """Search for industries by keyword(s) and return their NAICS (North American Industry Classification System) codes. Find industries by name or description."""
     try:
-        return search_qcew_naics(keyword)
+        return search_qcew_naics(keyword, max_results)
     except Exception as e:
         logger.error(f"Error in search_qcew_naics: {e}")
         raise ValueError("Invalid input: Please provide a valid search keyword")
 
+@mcp.tool()
+def describe_classification_codes(system: str, codes: List[str]) -> Dict[str, Any]:
+    """Look up names and hierarchy parents for known codes in one call. system is one of "naics", "soc", "qcew_area", "oews_area", "cip", "award_level". Use this to label codes (e.g. NAICS 1013, SOC 291141, QCEW area C1698) without a keyword search; the QCEW, OEWS and IPEDS tools already return names with their results."""
+    try:
+        return describe_codes(system, codes)
+    except Exception as e:
+        logger.error(f"Error in describe_codes: {e}")
+        raise ValueError("Invalid input: Please provide a valid code system and list of codes")
+
+@mcp.tool()
+def expand_classification_codes(system: str, codes: List[str], level: Optional[int] = None) -> Dict[str, Any]:
+    """Expand codes into their children, or all descendants at one hierarchy level, e.g. every 3-digit subsector of NAICS 31-33 (system="naics", codes=["31-33"], level=2). NAICS levels: 1 sector, 2 3-digit, 3 4-digit, 4 5-digit, 5 6-digit; QCEW supersectors such as 1013 expand to their NAICS sectors (31-33); SOC levels: 1 major group, 2 detailed occupation. Pass the returned "codes" list to the QCEW or OEWS tools to fetch them all in one batched request."""
+    try:
+        return expand_codes(system, codes, level)
+    except Exception as e:
+        logger.error(f"Error in expand_codes: {e}")
+        raise ValueError("Invalid input: Please provide a valid code system, list of codes and optional level")
+
+@mcp.tool()
+def rollup_classification_codes(system: str, values: Dict[str, float], level: int) -> Dict[str, Any]:
+    """Sum additive values (employment, establishments) already fetched for detailed NAICS or SOC codes up to their parents at one hierarchy level (see expand_classification_codes for levels), without another BLS request. Pass codes from one level of detail so nothing is counted twice."""
+    try:
+        return rollup_codes(system, values, level)
+    except Exception as e:
+        logger.error(f"Error in rollup_codes: {e}")
+        raise ValueError("Invalid input: Please provide a valid code system, code values and level")
+
+@mcp.tool()
+def autocomplete_lookup_names(prefix: str, types: Optional[List[str]] = None, max_results: Optional[int] = 10) -> Dict[str, Any]:
+    """Complete partial input (e.g. "Sprin", "new yo", "registered nur") to place, county, MSA, SOC occupation and NAICS industry names with their codes. types limits the name types ("place", "county", "msa", "soc", "naics"); max_results is per type. Use this for typeahead and to offer choices for an ambiguous name; use the search_* tools for full keyword searches."""
+    try:
+        return autocomplete_names(prefix, types, max_results)
+    except Exception as e:
+        logger.error(f"Error in autocomplete_names: {e}")
+        raise ValueError("Invalid input: Please provide a partial name to complete")
+
+@mcp.tool()
+def translate_geography_codes(codes: List[str], from_system: str, to_system: str) -> Dict[str, Any]:
+    """Translate geography codes between systems in one call: "state", "county" (5-digit GEOID), "place" (7-digit GEOID), "cbsa" (ACS MSA / IPEDS CBSA), "zip" (EIA), "qcew_area" (e.g. 17043, 17000, C1698) and "oews_area" (e.g. 0016980, 1700000). Chains such as ZIP -> county -> CBSA -> QCEW MSA are followed automatically; each match carries the share of the input area in it when known."""
+    try:
+        return translate_geographies(codes, from_system, to_system)
+    except Exception as e:
+        logger.error(f"Error in translate_geographies: {e}")
+        raise ValueError("Invalid input: Please provide a list of codes and valid geography systems")
+
 @mcp.tool()
 def rank_acs_data_highest(data_point: str, geo_type: str, state_fips: Optional[str] = None, year: Optional[str] = None, limit: Optional[int] = 20) -> Dict[str, Any]:
     """Find geographic areas (places, counties, states, MSAs) with the highest values for a specified ACS data point. Returns areas ranked by highest values."""
@@ -318,6 +453,15 @@ def rank_acs_data_lowest(data_point: str, geo_type: str, state_fips: Optional[st
         logger.error(f"Error in rank_acs_data_low: {e}")
         raise ValueError("Invalid input: Please provide valid parameters for ACS data ranking")
 
+@mcp.tool()
+def rank_acs_data_change_over_time(data_point: str, geo_type: str, start_year: str, end_year: str, state_fips: Optional[str] = None, sort_by: Optional[str] = "percent_change", direction: Optional[str] = "high", limit: Optional[int] = 20, min_start_value: Optional[float] = None) -> Dict[str, Any]:
+    """Find geographic areas (places, counties, states, MSAs) with the largest increase or decrease in a specified ACS data point between two years. Returns areas ranked by absolute or percent change."""
+    try:
+        return rank_acs_data_change(data_point, geo_type, start_year, end_year, state_fips, sort_by, direction, limit, min_start_value)
+    except Exception as e:
+        logger.error(f"Error in rank_acs_data_change: {e}")
+        raise ValueError("Invalid input: Please provide valid parameters for ACS change ranking")
+
 @mcp.tool()
 def get_acs_county_demographics_data(geo_fips: List[str], state_fips: str, year: Optional[str] = None) -> Dict[str, Any]:
     """Pulls county-level demographic data including total population, sex (male/female distribution), age distribution, race, and voting age population from the US Census Bureau's American Community Survey (ACS) 5-year estimates."""
@@ -523,7 +667,14 @@ async def health_check(request: Request):
         "timestamp": datetime.now().isoformat(),
         "tools": list(TOOL_CONFIGS.keys()),
         "prompts": list(PROMPT_CONFIGS.keys()),
-        "resources": list(RESOURCE_CONFIGS.keys())
+        "resources": list(RESOURCE_CONFIGS.keys()),
+        "rank_indexes": rank_index_status(),
+        "lookup_tables": lookup_table_status(),
+        "bls_api": bls_api_status(),
+        "upstream": upstream_status(),
+        "qcew_store": qcew_store_status(),
+        "oews_store": oews_store_status(),
+        "eia_rate_store": eia_rate_store_status()
     })
 
 async def mcp_redirect(request: Request):
@@ -585,6 +736,19 @@ def main():
         logger.info(f"Environment - PORT: {os.getenv('PORT')}, MCP_TRANSPORT: {os.getenv('MCP_TRANSPORT')}")
         logger.info(f"Command line args: {sys.argv}")
         
+        set_lookup_data_dir(LOOKUP_TABLE_CONFIG["data_dir"])
+        set_crosswalk_data_dir(CROSSWALK_CONFIG["data_dir"])
+        configure_upstream(**UPSTREAM_CONFIG)
+        configure_bls_api(**BLS_API_CONFIG)
+        set_qcew_slice_source(QCEW_SLICE_CONFIG["base_url"], QCEW_SLICE_CONFIG["cache_ttl_seconds"])
+        set_qcew_store_dir(QCEW_STORE_CONFIG["data_dir"])
+        set_oews_store_dir(OEWS_STORE_CONFIG["data_dir"])
+        set_eia_rate_store(EIA_RATE_STORE_CONFIG["data_dir"], EIA_RATE_STORE_CONFIG["refresh_interval_seconds"])
+
+        # Precompute hot ACS rankings in the background so startup is not blocked
+        if RANK_INDEX_CONFIG["enabled"]:
+            start_rank_index_refresher(RANK_INDEX_CONFIG["hot_variables"], RANK_INDEX_CONFIG["refresh_interval_seconds"])
+        
         if len(sys.argv) > 1 and sys.argv[1] == "--stdio":
             logger.info("Starting MCP server with stdio transport")
             mcp.run(transport="stdio")
@@ -0,0 +1,78 @@
+import pytest
+
+from tools.common import bls_api
+from tools.common.bls_api import fetch_bls_series
+
+US = "ENUUS00010010"
+LOCAL = "ENU1704310010"
+
+
+def _series(series_id, year, period, value):
+    return {"seriesID": series_id, "data": [{"year": year, "period": period, "value": value}]}
+
+
+@pytest.fixture
+def bls(monkeypatch):
+    """Serve series from a dict of series ID -> series and record the IDs of each post."""
+    published = {}
+    posted = []
+
+    def post_batch(batch_number, batch, params, registration_key):
+        posted.append(list(batch))
+        return {
+            "series": [published[series_id] for series_id in batch if series_id in published],
+            "timing": {"batch": batch_number, "series_count": len(batch), "status": "ok"},
+        }
+
+    monkeypatch.setattr(bls_api, "_post_batch", post_batch)
+    bls_api._SERIES_CACHE.clear()
+    bls_api._BASELINE_CACHE.clear()
+    yield published, posted
+    bls_api._SERIES_CACHE.clear()
+    bls_api._BASELINE_CACHE.clear()
+
+
+def _by_id(batches):
+    return {series["seriesID"]: series for batch in batches for series in batch}
+
+
+def test_baseline_is_refetched_when_local_series_have_a_newer_period(bls):
+    published, posted = bls
+    published.update({US: _series(US, "2024", "Q01", "100"), LOCAL: _series(LOCAL, "2024", "Q01", "10")})
+    fetch_bls_series([US, LOCAL], {"latest": "true"}, [US])
+
+    # A new quarter is released; the local series cache expires before the baseline's
+    published.update({US: _series(US, "2024", "Q02", "110"), LOCAL: _series(LOCAL, "2024", "Q02", "12")})
+    bls_api._SERIES_CACHE.clear()
+    posted.clear()
+    series = _by_id(fetch_bls_series([US, LOCAL], {"latest": "true"}, [US]))
+
+    assert series[US]["data"][0]["period"] == "Q02"
+    assert series[LOCAL]["data"][0]["period"] == "Q02"
+    assert posted == [[LOCAL], [US]]
+
+
+def test_current_baseline_is_served_from_cache(bls):
+    published, posted = bls
+    published.update({US: _series(US, "2024", "Q01", "100"), LOCAL: _series(LOCAL, "2024", "Q01", "10")})
+    fetch_bls_series([US, LOCAL], {"latest": "true"}, [US])
+    bls_api._SERIES_CACHE.clear()
+    posted.clear()
+
+    fetch_bls_series([US, LOCAL], {"latest": "true"}, [US])
+
+    assert posted == [[LOCAL]]
+
+
+def test_closed_period_baseline_is_reused_without_checking(bls):
+    published, posted = bls
+    params = {"startyear": "2015", "endyear": "2015"}
+    published.update({US: _series(US, "2015", "Q04", "100"), LOCAL: _series(LOCAL, "2015", "Q04", "10")})
+    fetch_bls_series([US, LOCAL], params, [US])
+    published[LOCAL] = _series(LOCAL, "2016", "Q01", "10")
+    bls_api._SERIES_CACHE.clear()
+    posted.clear()
+
+    fetch_bls_series([US, LOCAL], params, [US])
+
+    assert posted == [[LOCAL]]
@@ -0,0 +1,36 @@
+from tools.common.code_index import expand_codes, get_code_index, rollup_codes
+
+
+def test_supersector_is_not_a_naics_level():
+    index = get_code_index("naics")
+
+    assert "1013" not in index.children("10")
+    assert index.level("1013") is None
+    assert index.level("31-33") == 1
+
+
+def test_supersector_expands_to_its_sectors():
+    assert expand_codes("naics", ["1013"])["codes"] == ["31-33"]
+    assert expand_codes("naics", ["101"])["codes"] == ["1011", "1012", "1013"]
+
+    subsectors = expand_codes("naics", ["1013"], level=2)["codes"]
+    assert subsectors == expand_codes("naics", ["31-33"], level=2)["codes"]
+    assert "311" in subsectors
+
+
+def test_unknown_or_childless_codes_are_errors():
+    unknown = expand_codes("naics", ["31-33", "3999"])
+    assert unknown["status"] == "error"
+    assert "3999" in unknown["error_message"]
+
+    childless = expand_codes("naics", ["311111"])
+    assert childless["status"] == "error"
+    assert "311111" in childless["error_message"]
+
+
+def test_rollup_leaves_supersectors_unmatched():
+    result = rollup_codes("naics", {"311111": 3, "311119": 1, "1013": 50}, level=2)
+
+    assert result["totals"]["311"]["value"] == 4
+    assert list(result["totals"]) == ["311"]
+    assert result["unmatched"] == ["1013"]
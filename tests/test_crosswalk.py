@@ -0,0 +1,62 @@
+import pytest
+
+from tools.common import crosswalk
+from tools.common.crosswalk import set_crosswalk_data_dir, translate_code, translate_geographies
+
+
+@pytest.fixture
+def no_relation_files(tmp_path):
+    original = crosswalk._data_dir
+    set_crosswalk_data_dir(str(tmp_path))
+    yield
+    set_crosswalk_data_dir(str(original))
+
+
+@pytest.fixture
+def relation_files(tmp_path):
+    (tmp_path / "place_county.csv").write_text(
+        "left,right,left_weight,right_weight\n"
+        "1714000,17031,,\n"
+        "1714000,17043,,\n"
+        "1738570,17031,1.0,\n"
+    )
+    (tmp_path / "county_cbsa.csv").write_text(
+        "left,right,left_weight,right_weight\n"
+        "17031,16980,1.0,\n"
+        "17043,16980,1.0,\n"
+    )
+    original = crosswalk._data_dir
+    set_crosswalk_data_dir(str(tmp_path))
+    yield
+    set_crosswalk_data_dir(str(original))
+
+
+def test_place_to_county_without_relation_files_does_not_fan_out_through_state(no_relation_files):
+    with pytest.raises(ValueError, match="No crosswalk from place to county"):
+        translate_code("1714000", "place", "county")
+    with pytest.raises(ValueError, match="No crosswalk from county to place"):
+        translate_code("17031", "county", "place")
+
+    response = translate_geographies(["1714000"], "place", "county")
+    assert response["status"] == "error"
+
+
+def test_upward_translations_still_work_without_relation_files(no_relation_files):
+    assert translate_code("17031", "county", "state") == [("17", 1.0)]
+    assert translate_code("1714000", "place", "qcew_area") == [("17000", 1.0)]
+
+
+def test_chains_follow_loaded_relation_files(relation_files):
+    assert sorted(code for code, _ in translate_code("1714000", "place", "county")) == ["17031", "17043"]
+    assert translate_code("1738570", "place", "qcew_area") == [("17031", 1.0)]
+    assert [code for code, _ in translate_code("1714000", "place", "cbsa")] == ["16980"]
+    assert sorted(code for code, _ in translate_code("16980", "cbsa", "county")) == ["17031", "17043"]
+
+
+def test_qcew_csa_codes_are_not_read_as_cbsas(no_relation_files):
+    assert translate_code("C1698", "qcew_area", "cbsa") == [("16980", 1.0)]
+    with pytest.raises(ValueError, match="CS176"):
+        translate_code("CS176", "qcew_area", "cbsa")
+
+    response = translate_geographies(["CS176"], "qcew_area", "cbsa")
+    assert response["status"] == "error"
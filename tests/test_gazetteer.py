@@ -0,0 +1,40 @@
+import pytest
+
+from tools.acs_data.gazetteer import search_place_gazetteer
+from tools.common import crosswalk
+from tools.common.crosswalk import set_crosswalk_data_dir
+
+
+@pytest.fixture
+def place_county_file(tmp_path):
+    (tmp_path / "place_county.csv").write_text(
+        "left,right,left_weight,right_weight\n"
+        "1714000,17031,,\n"
+        "1714000,17043,,\n"
+        "5584375,55135,1.0,\n"
+    )
+    original = crosswalk._data_dir
+    set_crosswalk_data_dir(str(tmp_path))
+    yield
+    set_crosswalk_data_dir(str(original))
+
+
+@pytest.fixture
+def no_relation_files(tmp_path):
+    original = crosswalk._data_dir
+    set_crosswalk_data_dir(str(tmp_path))
+    yield
+    set_crosswalk_data_dir(str(original))
+
+
+def test_place_county_comes_from_the_relation_file(place_county_file):
+    waupaca = search_place_gazetteer(["waupaca city"], 1)[0]
+    chicago = search_place_gazetteer(["chicago city, illinois"], 1)[0]
+
+    assert waupaca["geoid"] == "5584375"
+    assert waupaca["county"] == "Waupaca County"
+    assert chicago["county"] == "Cook County; DuPage County"
+
+
+def test_place_county_is_none_without_the_relation_file(no_relation_files):
+    assert search_place_gazetteer(["waupaca city"], 1)[0]["county"] is None
@@ -0,0 +1,52 @@
+from tools.common.lookup_index import LookupIndex
+
+ENTRIES = [
+    ("Manufactured (mobile) home dealers", "45993"),
+    ("Food manufacturing", "311"),
+    ("Other food manufacturing", "3119"),
+    ("Manufacturing", "31-33"),
+    ("Software publishers", "5132"),
+]
+
+
+def test_misspelling_prefers_the_closest_word():
+    index = LookupIndex(ENTRIES)
+
+    assert index.search(["manufacturng"], 1) == [("Manufacturing", "31-33")]
+    assert ("Manufactured (mobile) home dealers", "45993") not in index.search(["manufacturng"], None)
+
+
+def test_substring_search_matches_inside_words():
+    index = LookupIndex(ENTRIES)
+
+    assert index.search(["oftw"], None, substring_fallback=False) == [("Software publishers", "5132")]
+    assert index.substring_search(["oftw"]) == [("Software publishers", "5132")]
+    assert index.substring_search(["anufact", "food"]) == [("Food manufacturing", "311"), ("Other food manufacturing", "3119")]
+    assert index.substring_search(["zzz"]) == []
+
+
+def test_optional_terms_rank_without_filtering():
+    index = LookupIndex([
+        ("Jefferson city, Iowa", "39450"),
+        ("Jefferson village, Ohio", "38500"),
+        ("Jefferson City city, Missouri", "37000"),
+    ], qualifier_separator=", ")
+
+    results = index.search(["jefferson"], None, optional_terms=["village"])
+
+    assert results[0] == ("Jefferson village, Ohio", "38500")
+    assert len(results) == 3
+
+
+def test_fragment_inside_a_word_beats_a_typo_correction():
+    index = LookupIndex([("Personal care workers", "399099"), ("Software developers", "151252")])
+
+    assert index.search(["ware"], 1) == [("Software developers", "151252")]
+
+
+def test_substring_fallback_fills_the_remaining_places():
+    index = LookupIndex([("Page County, Iowa", "19145"), ("DuPage County, Illinois", "17043"), ("Cook County, Illinois", "17031")])
+
+    assert index.search(["page"], None, substring_fallback=False) == [("Page County, Iowa", "19145")]
+    assert index.search(["page"], None) == [("Page County, Iowa", "19145"), ("DuPage County, Illinois", "17043")]
+    assert index.search(["page"], 1) == [("Page County, Iowa", "19145")]
@@ -0,0 +1,87 @@
+import gzip
+import json
+
+from tools.common import lookup_tables
+from tools.common.lookup_tables import build_lookup_tables, load_lookup_table, set_lookup_data_dir
+
+
+COUNTY_GAZETTEER = (
+    "USPS\tGEOID\tANSICODE\tNAME\n"
+    "AL\t01001\t00161526\tAutauga County\n"
+    "AL\t01003\t00161527\tBaldwin County\n"
+    "IL\t17001\t00424202\tAdams County\n"
+    "IL\t17003\t00424203\tAlexander County\n"
+    "IN\t18001\t00450401\tAdams County\n"
+)
+
+PLACE_GAZETTEER = (
+    "USPS\tGEOID\tANSICODE\tNAME\n"
+    "AL\t0100100\t02582661\tAbanda CDP\n"
+    "IL\t1700100\t02393891\tAbingdon city\n"
+    "IN\t1800100\t02396262\tAdvance town\n"
+    "CO\t0811810\t02409975\tCa\u00f1on City city\n"
+)
+
+
+def _artifact(output_dir, table):
+    manifest = json.loads((output_dir / "manifest.json").read_text())
+    with gzip.open(output_dir / manifest["tables"][table]["file"], "rt", encoding="utf-8") as handle:
+        return manifest["tables"][table], json.load(handle)
+
+
+def test_county_build_keeps_counties_with_repeated_state_relative_codes(tmp_path):
+    source = tmp_path / "counties.txt"
+    source.write_text(COUNTY_GAZETTEER)
+
+    built = build_lookup_tables(str(tmp_path / "out"), "2023", {"county": str(source)})
+
+    assert built == {"county": 5}
+    entry, payload = _artifact(tmp_path / "out", "county")
+    assert entry["rows"] == 5
+    assert sorted(zip(payload["codes"], payload["names"])) == [
+        ("001", "Adams County, Illinois"),
+        ("001", "Adams County, Indiana"),
+        ("001", "Autauga County, Alabama"),
+        ("003", "Alexander County, Illinois"),
+        ("003", "Baldwin County, Alabama"),
+    ]
+
+
+def test_place_build_keeps_places_with_repeated_state_relative_codes(tmp_path):
+    source = tmp_path / "places.txt"
+    source.write_text(PLACE_GAZETTEER)
+
+    built = build_lookup_tables(str(tmp_path / "out"), "2023", {"place": str(source)})
+
+    assert built == {"place": 4}
+    _, payload = _artifact(tmp_path / "out", "place")
+    assert set(payload["codes"]) == {"00100", "11810"}
+    assert len(set(payload["names"])) == 4
+
+
+def test_rebuild_of_same_sources_is_byte_identical(tmp_path):
+    source = tmp_path / "counties.txt"
+    source.write_text(COUNTY_GAZETTEER)
+
+    build_lookup_tables(str(tmp_path / "a"), "2023", {"county": str(source)})
+    build_lookup_tables(str(tmp_path / "b"), "2023", {"county": str(source)})
+
+    assert (tmp_path / "a" / "county-2023.json.gz").read_bytes() == (tmp_path / "b" / "county-2023.json.gz").read_bytes()
+
+
+def test_accented_queries_match_artifact_rows(tmp_path):
+    source = tmp_path / "places.txt"
+    source.write_text(PLACE_GAZETTEER, encoding="utf-8")
+    build_lookup_tables(str(tmp_path / "out"), "2023", {"place": str(source)})
+    original = lookup_tables._data_dir
+    set_lookup_data_dir(str(tmp_path / "out"))
+    try:
+        table = load_lookup_table("place")
+        index = table.lookup_index()
+
+        expected = [("Ca\u00f1on City city, Colorado", "11810")]
+        assert index.search(["ca\u00f1on", "city"], 1) == expected
+        assert index.search(["canon", "city"], 1) == expected
+        assert table.as_dict() is table.as_dict()
+    finally:
+        set_lookup_data_dir(str(original))
@@ -0,0 +1,84 @@
+import functools
+import threading
+from http.server import HTTPServer, SimpleHTTPRequestHandler
+
+import pytest
+
+from tools.common.bls_api import BLSSeriesBatches
+from tools.qcew_data import qcew_data, qcew_slices
+from tools.qcew_data.qcew_data import get_qcew_data
+from tools.qcew_data.qcew_slices import set_qcew_slice_source
+
+HEADER = (
+    "area_fips,own_code,industry_code,agglvl_code,size_code,year,qtr,disclosure_code,"
+    "annual_avg_estabs,annual_avg_emplvl,total_annual_wages,annual_avg_wkly_wage,lq_annual_avg_emplvl\n"
+)
+
+# (area, ownership, industry) -> (establishments, employees)
+CELLS = {
+    ("US000", "0", "10"): (11000000, 153000000),
+    ("US000", "5", "10"): (10700000, 130000000),
+    ("US000", "5", "1013"): (360000, 12900000),
+    ("17043", "0", "10"): (40000, 600000),
+    ("17043", "5", "10"): (39000, 550000),
+    ("17043", "5", "1013"): (1500, 60000),
+}
+
+
+def _slice(area_code):
+    return HEADER + "".join(
+        f"{area},{own},{industry},70,0,2023,A,,{establishments},{employees},1,1500,1.00\n"
+        for (area, own, industry), (establishments, employees) in CELLS.items() if area == area_code
+    )
+
+
+@pytest.fixture
+def slice_server(tmp_path):
+    directory = tmp_path / "2023" / "a" / "area"
+    directory.mkdir(parents=True)
+    for area_code in ("US000", "17043"):
+        (directory / f"{area_code}.csv").write_text(_slice(area_code))
+
+    class Handler(SimpleHTTPRequestHandler):
+        def log_message(self, *args):
+            pass
+
+    server = HTTPServer(("127.0.0.1", 0), functools.partial(Handler, directory=str(tmp_path)))
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    original_url = qcew_slices._SETTINGS["base_url"]
+    set_qcew_slice_source(f"http://127.0.0.1:{server.server_port}")
+    qcew_slices._SLICE_CACHE.clear()
+    yield
+    server.shutdown()
+    server.server_close()
+    set_qcew_slice_source(original_url)
+    qcew_slices._SLICE_CACHE.clear()
+
+
+@pytest.fixture
+def bls_series(monkeypatch):
+    def fetch(series_ids, params, baseline_ids=(), release_cadence="quarterly"):
+        series = []
+        for series_id in series_ids:
+            cell = CELLS.get((series_id[3:8], series_id[10:11], series_id[11:]))
+            data = []
+            if cell is not None:
+                value = cell[1] if series_id[8:9] == "1" else cell[0]
+                data = [{"year": "2023", "period": "Q05", "periodName": "Annual", "value": str(value)}]
+            series.append({"seriesID": series_id, "data": data})
+        # Private series first, so the result cannot depend on which ownership comes last
+        return BLSSeriesBatches([sorted(series, key=lambda item: item["seriesID"][10:11], reverse=True)])
+
+    monkeypatch.setattr(qcew_data, "fetch_bls_series", fetch)
+
+
+def test_api_and_slices_use_the_same_ownership(slice_server, bls_series):
+    from_api = get_qcew_data(["17043"], ["1013"], year="2023")["locations"]["17043"]
+    from_slices = get_qcew_data(["17043"], ["1013"], year="2023", backend="slices")["locations"]["17043"]
+
+    for industry_code in ("10", "1013"):
+        assert from_api["industries"][industry_code]["ownership"] == "Private"
+        assert from_slices["industries"][industry_code]["ownership"] == "Private"
+        assert from_api["industries"][industry_code]["employees"] == from_slices["industries"][industry_code]["employees"]
+    assert from_api["industries"]["1013"]["employee_lq"] == from_slices["industries"]["1013"]["employee_lq"]
+    assert from_api["total_employees"] == from_slices["total_employees"]
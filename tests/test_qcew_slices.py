@@ -0,0 +1,114 @@
+import functools
+import threading
+from http.server import HTTPServer, SimpleHTTPRequestHandler
+
+import pytest
+
+from tools.qcew_data import qcew_slices
+from tools.qcew_data.qcew_slices import fetch_qcew_slice, get_qcew_slice_rows, set_qcew_slice_source
+
+HEADER = (
+    "area_fips,own_code,industry_code,agglvl_code,size_code,year,qtr,disclosure_code,"
+    "annual_avg_estabs,annual_avg_emplvl,total_annual_wages,annual_avg_wkly_wage,lq_annual_avg_emplvl\n"
+)
+
+AREA_17043 = HEADER + (
+    "17043,0,10,70,0,2023,A,,40000,600000,1,1500,1.00\n"
+    "17043,5,10,71,0,2023,A,,39000,550000,1,1450,1.00\n"
+    "17043,1,10,71,0,2023,A,,100,5000,1,1800,0.80\n"
+    "17043,5,1013,73,0,2023,A,,1500,60000,1,1600,1.10\n"
+    "17043,5,1013,73,1,2023,A,,900,1200,1,1200,1.10\n"
+    "17043,5,1023,73,0,2023,A,N,0,0,0,0,0\n"
+)
+
+AREA_17031 = HEADER + (
+    "17031,0,10,70,0,2023,A,,150000,2500000,1,1700,1.00\n"
+    "17031,5,1013,73,0,2023,A,,6000,200000,1,1650,0.90\n"
+)
+
+INDUSTRY_1013 = HEADER + (
+    "17031,5,1013,73,0,2023,A,,6000,200000,1,1650,0.90\n"
+    "17043,5,1013,73,0,2023,A,,1500,60000,1,1600,1.10\n"
+    "17097,5,1013,73,0,2023,A,,1200,50000,1,1550,1.30\n"
+)
+
+
+@pytest.fixture
+def slice_server(tmp_path):
+    """Serve slice fixtures at /{year}/{quarter}/{kind}/{code}.csv and record requested paths."""
+    for kind, code, body in (("area", "17043", AREA_17043), ("area", "17031", AREA_17031), ("industry", "1013", INDUSTRY_1013)):
+        directory = tmp_path / "2023" / "a" / kind
+        directory.mkdir(parents=True, exist_ok=True)
+        (directory / f"{code}.csv").write_text(body)
+
+    requested = []
+
+    class Handler(SimpleHTTPRequestHandler):
+        def do_GET(self):
+            requested.append(self.path)
+            super().do_GET()
+
+        def log_message(self, *args):
+            pass
+
+    server = HTTPServer(("127.0.0.1", 0), functools.partial(Handler, directory=str(tmp_path)))
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+
+    original_url = qcew_slices._SETTINGS["base_url"]
+    set_qcew_slice_source(f"http://127.0.0.1:{server.server_port}")
+    qcew_slices._SLICE_CACHE.clear()
+    yield requested
+
+    server.shutdown()
+    server.server_close()
+    set_qcew_slice_source(original_url)
+    qcew_slices._SLICE_CACHE.clear()
+
+
+def test_missing_slice_returns_none(slice_server):
+    assert fetch_qcew_slice("area", "99999", "2023") is None
+    assert fetch_qcew_slice("area", "17043", "2019") is None
+
+
+def test_slice_keeps_total_and_private_ownership_at_all_sizes(slice_server):
+    rows = fetch_qcew_slice("area", "17043", "2023")
+
+    assert [(row["own_code"], row["industry_code"]) for row in rows] == [("0", "10"), ("5", "10"), ("5", "1013"), ("5", "1023")]
+    manufacturing = rows[2]
+    assert manufacturing["employees"] == 60000
+    assert manufacturing["establishments"] == 1500
+    assert manufacturing["avg_weekly_wage"] == 1600
+    assert manufacturing["employee_lq"] == pytest.approx(1.1)
+    assert manufacturing["disclosed"] is True
+    assert rows[3]["disclosed"] is False
+
+
+def test_repeated_slice_is_served_from_cache(slice_server):
+    first = fetch_qcew_slice("area", "17043", "2023")
+    second = fetch_qcew_slice("area", "17043", "2023")
+
+    assert second == first
+    assert slice_server == ["/2023/a/area/17043.csv"]
+
+
+def test_rows_use_area_slices_when_there_are_fewer_areas(slice_server):
+    rows, year = get_qcew_slice_rows(["17043"], ["10", "1013"], "2023")
+
+    assert year == "2023"
+    assert sorted((row["area_fips"], row["own_code"], row["industry_code"]) for row in rows) == [
+        ("17043", "0", "10"), ("17043", "5", "10"), ("17043", "5", "1013"),
+    ]
+    assert slice_server == ["/2023/a/area/17043.csv"]
+
+
+def test_rows_use_industry_slices_when_there_are_fewer_industries(slice_server):
+    rows, year = get_qcew_slice_rows(["17031", "17043"], ["1013"], "2023")
+
+    assert year == "2023"
+    assert sorted(row["area_fips"] for row in rows) == ["17031", "17043"]
+    assert slice_server == ["/2023/a/industry/1013.csv"]
+
+
+def test_no_published_slice_returns_no_year(slice_server):
+    assert get_qcew_slice_rows(["17043"], ["1013"], "2019") == ([], None)
@@ -0,0 +1,74 @@
+import pytest
+
+from tools.acs_data import rank_acs_index
+from tools.acs_data.rank_acs_index import RankIndex, _store_index, get_rank_index
+
+ROWS = [
+    {"name": "Illinois", "value": 12.5, "state_fips": "17"},
+    {"name": "Wisconsin", "value": 5.9, "state_fips": "55"},
+]
+
+
+@pytest.fixture(autouse=True)
+def empty_indexes():
+    saved = dict(rank_acs_index._INDEXES)
+    rank_acs_index._INDEXES.clear()
+    yield
+    rank_acs_index._INDEXES.clear()
+    rank_acs_index._INDEXES.update(saved)
+
+
+def test_newer_vintage_evicts_the_older_one():
+    _store_index(RankIndex("DP05_0001E", "state", "2022", ROWS))
+    _store_index(RankIndex("DP05_0001E", "state", "2023", ROWS))
+    _store_index(RankIndex("DP05_0001E", "county", "2022", ROWS))
+
+    assert get_rank_index("DP05_0001E", "state", "2022") is None
+    assert get_rank_index("DP05_0001E", "state", "2023") is not None
+    assert get_rank_index("DP05_0001E", "county", "2022") is not None
+    assert len(rank_acs_index._INDEXES) == 2
+
+
+def test_older_vintage_is_not_kept_beside_a_newer_one():
+    _store_index(RankIndex("DP05_0001E", "state", "2023", ROWS))
+    _store_index(RankIndex("DP05_0001E", "state", "2021", ROWS))
+
+    assert get_rank_index("DP05_0001E", "state", "2021") is None
+    assert list(rank_acs_index._INDEXES) == [("DP05_0001E", "state", "2023")]
+
+
+def test_msa_search_prior_reads_the_msa_population_index():
+    from tools.acs_data.fips_census_msa import _get_msa_geoids, _get_msa_population_prior
+
+    assert _get_msa_population_prior() is None
+    _store_index(RankIndex("DP05_0001E", "metropolitan statistical area/micropolitan statistical area", "2023", [
+        {"name": "Chicago-Naperville-Elgin, IL-IN Metro Area", "value": 9262825.0, "msa_fips": "16980"},
+    ]))
+
+    prior = _get_msa_population_prior()
+    assert prior is not None
+    assert prior(_get_msa_geoids().index("16980")) == 9262825.0
+
+
+def test_census_api_fallback_drops_missing_value_annotations(monkeypatch):
+    import importlib
+    rank_acs_data_low = importlib.import_module("tools.acs_data.rank_acs_data_low")
+
+    class Response:
+        status_code = 200
+
+        def json(self):
+            return [
+                ["NAME", "DP03_0062E", "state"],
+                ["Illinois", "78433", "17"],
+                ["Wisconsin", "-666666666", "55"],
+                ["Indiana", "67173", "18"],
+            ]
+
+    monkeypatch.setattr(rank_acs_data_low, "upstream_get", lambda *args, **kwargs: Response())
+
+    result = rank_acs_data_low.rank_acs_data_low("DP03_0062E", "state", year="2022")
+
+    assert result["query_info"].get("source") != "precomputed_index"
+    assert [row["name"] for row in result["data"]] == ["Indiana", "Illinois"]
+    assert result["total_found"] == 2
@@ -0,0 +1,47 @@
+import numpy as np
+import pytest
+
+from tools.common.regional_metrics import shift_share
+from tools.qcew_data import qcew_shift_share
+from tools.qcew_data.qcew_shift_share import get_qcew_shift_share
+
+
+def test_cells_missing_a_period_have_no_components():
+    components = shift_share(
+        np.array([[100.0, np.nan, 0.0, 50.0]]),
+        np.array([[110.0, 30.0, 20.0, np.nan]]),
+        np.array([1000.0, 1000.0, 1000.0, 1000.0]),
+        np.array([1100.0, 1000.0, 1000.0, 1000.0]),
+    )
+
+    for values in components.values():
+        assert np.isnan(values[0, 1]) and np.isnan(values[0, 3])
+    # A real zero base puts the whole change in the regional shift
+    assert components["change"][0, 2] == 20.0
+    assert components["regional_shift"][0, 2] == 20.0
+    parts = components["national_share"] + components["industry_mix"] + components["regional_shift"]
+    assert parts[0, 0] == pytest.approx(components["change"][0, 0])
+
+
+def test_suppressed_base_is_flagged_and_left_out_of_totals(monkeypatch):
+    values = {
+        ("US000", "10", "base"): 1000.0, ("US000", "10", "end"): 1100.0,
+        ("US000", "1013", "base"): 100.0, ("US000", "1013", "end"): 110.0,
+        ("US000", "1023", "base"): 100.0, ("US000", "1023", "end"): 100.0,
+        ("17043", "1013", "base"): 50.0, ("17043", "1013", "end"): 60.0,
+        ("17043", "1023", "base"): np.nan, ("17043", "1023", "end"): 40.0,
+    }
+    monkeypatch.setattr(qcew_shift_share, "_periods_from_api", lambda *args: {
+        "base_period": "2019-Q1",
+        "end_period": "2024-Q1",
+        "value": lambda area_code, industry_code, which: values.get((area_code, industry_code, which), np.nan),
+    })
+
+    area = get_qcew_shift_share(["17043"], ["1013", "1023"], "2019")["areas"]["17043"]
+
+    finance = area["industries"]["1023"]
+    assert finance["incomplete"] is True
+    assert finance["end_employees"] == 40
+    assert finance["change"] is None and finance["competitive_share"] is None
+    assert area["industries"]["1013"]["incomplete"] is False
+    assert area["totals"]["change"] == 10.0
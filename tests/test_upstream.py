@@ -0,0 +1,38 @@
+import threading
+from http.server import BaseHTTPRequestHandler, HTTPServer
+
+import pytest
+
+from tools.common import upstream
+from tools.common.upstream import configure_upstream, upstream_get
+
+
+@pytest.fixture
+def flaky_server():
+    """Answer 524 (Cloudflare origin timeout) to the first request and 200 afterwards."""
+    statuses = [524]
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            self.send_response(statuses.pop(0) if statuses else 200)
+            self.send_header("Content-Length", "2")
+            self.end_headers()
+            self.wfile.write(b"ok")
+
+        def log_message(self, *args):
+            pass
+
+    server = HTTPServer(("127.0.0.1", 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    configure_upstream({"127.0.0.1": {"max_attempts": 2, "backoff_base_seconds": 0.01, "timeout_seconds": 5, "stale_ttl_seconds": 0}})
+    yield f"http://127.0.0.1:{server.server_port}/data"
+    server.shutdown()
+    server.server_close()
+    upstream._HOST_POLICIES.pop("127.0.0.1", None)
+
+
+def test_cloudflare_origin_timeout_is_retried(flaky_server):
+    response = upstream_get(flaky_server)
+
+    assert response.status_code == 200
+    assert response.text == "ok"
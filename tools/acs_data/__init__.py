@@ -9,6 +9,8 @@ Modules:
 - fips_acs_place: Search and retrieve place FIPS codes
 - fips_acs_msa: Search and retrieve MSA/Micropolitan FIPS codes
 - fips_acs_state: Search and retrieve state FIPS codes  
+- gazetteer: Structured place/county tables with state FIPS, GEOID, place type and county
+- resolve_geographies: Resolve lists of free-text place/county names to FIPS codes in one call
 - acs_social_county: Retrieve social characteristics data (DP02) by county
 - acs_economic_county: Retrieve economic characteristics data (DP03) by county
 - acs_housing_county: Retrieve housing characteristics data (DP04) by county
@@ -31,12 +33,17 @@ Modules:
 - acs_demographics_national: Retrieve demographic data (DP05) for the entire US
 - rank_acs_data_high: Rank geographic areas by highest values for ACS data points
 - rank_acs_data_low: Rank geographic areas by lowest values for ACS data points
+- rank_acs_data_change: Rank geographic areas by change in ACS data points between two years
+- acs_variable_pull: Pull and cache a single ACS variable for every area of a geographic type
+- rank_acs_index: Precomputed in-memory rank indexes for hot ACS variables
 """
 
 from .fips_census_county import search_county_fips
 from .fips_census_place import search_place_fips
 from .fips_census_msa import search_msa_fips
 from .fips_census_state import search_state_fips
+from .gazetteer import search_place_gazetteer, search_county_gazetteer
+from .resolve_geographies import resolve_geographies
 from .acs_social_county import acs_social_county_pull
 from .acs_economic_county import acs_economic_county_pull
 from .acs_housing_county import acs_housing_county_pull
@@ -59,12 +66,17 @@ from .acs_demographics_state import acs_demographics_state_pull
 from .acs_demographics_national import acs_demographics_national_pull
 from .rank_acs_data_high import rank_acs_data_high
 from .rank_acs_data_low import rank_acs_data_low
+from .rank_acs_data_change import rank_acs_data_change
+from .acs_variable_pull import acs_variable_pull
 
 __all__ = [
     'search_county_fips',
     'search_place_fips',
     'search_msa_fips',
     'search_state_fips',
+    'search_place_gazetteer',
+    'search_county_gazetteer',
+    'resolve_geographies',
     'acs_social_county_pull',
     'acs_economic_county_pull',
     'acs_housing_county_pull',
@@ -86,5 +98,7 @@ __all__ = [
     'acs_demographics_state_pull',
     'acs_demographics_national_pull',
     'rank_acs_data_high',
-    'rank_acs_data_low'
+    'rank_acs_data_low',
+    'rank_acs_data_change',
+    'acs_variable_pull'
 ]
\ No newline at end of file
@@ -1,6 +1,7 @@
 from datetime import datetime
 from typing import Dict, Optional, Union, Any, List
 import requests
+from tools.common.upstream import upstream_get
 
 def acs_demographics_state_pull(
     state_fips: List[str], 
@@ -66,7 +67,7 @@ def acs_demographics_state_pull(
         }
 
         url = f"https://api.census.gov/data/{target_year}/acs/acs5/profile"
-        response = requests.get(url, params=params, timeout=30)
+        response = upstream_get(url, params=params, timeout=30)
 
         if response.status_code != 200:
             return _error_response(
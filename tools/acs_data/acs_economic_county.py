@@ -1,6 +1,7 @@
 from datetime import datetime
 from typing import Dict, Optional, Union, Any, List
 import requests
+from tools.common.upstream import upstream_get
 
 def acs_economic_county_pull(
     geo_fips: List[str], 
@@ -73,7 +74,7 @@ def acs_economic_county_pull(
         }
 
         url = f"https://api.census.gov/data/{target_year}/acs/acs5/profile"
-        response = requests.get(url, params=params, timeout=30)
+        response = upstream_get(url, params=params, timeout=30)
 
         if response.status_code != 200:
             return _error_response(
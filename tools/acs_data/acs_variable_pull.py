@@ -0,0 +1,163 @@
+from datetime import datetime
+from typing import Dict, Optional, Any, List
+import requests
+
+from tools.common.cache import TTLCache
+from tools.common.upstream import upstream_get
+
+# ACS 5-year releases do not change once published, so a nationwide pull can be
+# reused for a long time. Keyed by (data_point, geo_type, state_fips, year).
+_VARIABLE_CACHE = TTLCache(ttl_seconds=24 * 60 * 60, max_entries=64)
+
+# Census API annotation values that stand in for missing or suppressed estimates
+ACS_MISSING_VALUES = {-999999999.0, -888888888.0, -666666666.0, -555555555.0, -333333333.0, -222222222.0}
+
+GEO_TYPES = ["place", "county", "state", "metropolitan statistical area/micropolitan statistical area"]
+
+# Census geography columns (in response order) that make up the GEOID for each geo_type
+_GEOID_COLUMNS = {
+    "place": ["state", "place"],
+    "county": ["state", "county"],
+    "state": ["state"],
+    "metropolitan statistical area/micropolitan statistical area": ["metropolitan statistical area/micropolitan statistical area"],
+}
+
+
+def acs_variable_pull(
+    data_point: str,
+    geo_type: str,
+    state_fips: Optional[str] = None,
+    year: Optional[str] = None,
+    use_cache: bool = True
+) -> Dict[str, Any]:
+    """
+    Pulls a single ACS data profile variable for every area of a geographic type.
+
+    This is the shared fetch behind the ranking tools. Results are cached in memory
+    so repeated rankings of the same variable and vintage do not hit the Census API.
+
+    Args:
+        data_point (str): The ACS data point/variable to pull (e.g., "DP05_0001E")
+        geo_type (str): "place", "county", "state", or "metropolitan statistical area/micropolitan statistical area"
+        state_fips (Optional[str]): Limit place/county/state results to one state. Ignored for MSAs.
+        year (Optional[str]): Year of ACS data. Defaults to current year minus 2. Must be 2010 or later.
+        use_cache (bool): Read and write the in-memory pull cache. Defaults to True.
+
+    Returns:
+        Dict[str, Any]: Response containing:
+            - status: "success" or "error"
+            - year: Year of data pulled (if successful)
+            - data: List of {"geoid", "name", "value", <geo columns>} rows (if successful)
+            - error_message: Error details (if unsuccessful)
+    """
+    try:
+        def _error_response(message: str) -> Dict[str, str]:
+            return {"status": "error", "error_message": message}
+
+        # Validate inputs
+        if not isinstance(data_point, str) or not data_point.strip():
+            return _error_response("data_point must be a non-empty string.")
+
+        if not isinstance(geo_type, str) or geo_type.lower() not in GEO_TYPES:
+            return _error_response("geo_type must be one of: 'place', 'county', 'state', 'metropolitan statistical area/micropolitan statistical area'.")
+
+        geo_type = geo_type.lower()
+
+        if state_fips is not None and (not isinstance(state_fips, str) or not state_fips.isdigit()):
+            return _error_response("state_fips must be a string of digits or None.")
+
+        # Handle year parameter and validate
+        if year is not None:
+            try:
+                year_int = int(year)
+                if year_int < 2010:
+                    return _error_response("Year must be 2010 or later.")
+                if year_int > datetime.now().year:
+                    return _error_response(f"Year cannot be in the future. Current year is {datetime.now().year}.")
+                target_year = str(year_int)
+            except (ValueError, TypeError):
+                return _error_response("Year must be a valid integer string.")
+        else:
+            target_year = str(datetime.now().year - 2)
+
+        if not data_point.startswith(("DP02_", "DP03_", "DP04_", "DP05_")):
+            return _error_response("data_point must start with DP02_, DP03_, DP04_, or DP05_.")
+
+        if geo_type == "metropolitan statistical area/micropolitan statistical area":
+            state_fips = None
+
+        cache_key = (data_point, geo_type, state_fips or "", target_year)
+        cached = _VARIABLE_CACHE.get(cache_key) if use_cache else None
+        if cached is not None:
+            return cached
+
+        params = {
+            "get": f"NAME,{data_point}",
+            "for": f"{geo_type}:*",
+            "key": "091b3e6e230ae7273599c133be45cec90de9e80a",
+        }
+
+        if geo_type in ["place", "county"]:
+            params["in"] = f"state:{state_fips}" if state_fips else "state:*"
+        elif geo_type == "state" and state_fips:
+            params["for"] = f"state:{state_fips}"
+
+        url = f"https://api.census.gov/data/{target_year}/acs/acs5/profile"
+        response = upstream_get(url, params=params, timeout=30)
+
+        if response.status_code != 200:
+            return _error_response(
+                f"API request failed with status {response.status_code}: {response.text}"
+            )
+
+        data = response.json()
+
+        if not isinstance(data, list) or len(data) < 2:
+            return _error_response("Invalid or empty data returned from API.")
+
+        headers = data[0]
+        if data_point not in headers:
+            return _error_response(f"Data point '{data_point}' not found in the response.")
+        if "NAME" not in headers:
+            return _error_response("NAME column not found in the response.")
+
+        value_index = headers.index(data_point)
+        name_index = headers.index("NAME")
+        geo_indices = [(column, headers.index(column)) for column in _GEOID_COLUMNS[geo_type] if column in headers]
+
+        rows = []
+        for row in data[1:]:
+            try:
+                raw_value = row[value_index]
+                if raw_value is None or raw_value == "" or raw_value == "null":
+                    continue
+                value = float(raw_value)
+                if value in ACS_MISSING_VALUES:
+                    continue
+
+                geo_row = {
+                    "geoid": "".join(row[index] for _, index in geo_indices),
+                    "name": row[name_index],
+                    "value": value,
+                }
+                for column, index in geo_indices:
+                    geo_row["msa_fips" if column.startswith("metropolitan") else f"{column}_fips"] = row[index]
+                rows.append(geo_row)
+            except (ValueError, TypeError, IndexError):
+                # Skip rows with invalid numeric values
+                continue
+
+        result = {"status": "success", "year": target_year, "data": rows}
+        if use_cache:
+            _VARIABLE_CACHE.set(cache_key, result)
+        return result
+
+    except requests.RequestException as e:
+        return {"status": "error", "error_message": f"Network error: {str(e)}"}
+    except Exception as e:
+        return {"status": "error", "error_message": f"Unexpected error: {str(e)}"}
+
+
+if __name__ == "__main__":
+    result = acs_variable_pull("DP05_0001E", "county", "17", "2022")
+    print(result["status"], len(result.get("data", [])))
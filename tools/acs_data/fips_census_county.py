@@ -1,5 +1,11 @@
-from typing import Dict, List, Tuple, Optional, Union
-import re
+from functools import lru_cache
+from typing import Callable, Dict, List, Tuple, Optional, Union
+
+from tools.common.lookup_index import LookupIndex
+from tools.common.lookup_tables import load_lookup_table
+from tools.common.name_normalization import WORD_ALIASES, normalize_query
+from tools.acs_data.fips_census_state import _get_state_fips_data
+from tools.acs_data.rank_acs_index import population_prior
 
 """
 FIPS County Search Tool
@@ -11,6 +17,10 @@ This is designed for use as an LLM tool to provide manageable result sets.
 
 def _get_county_fips_data() -> Dict[str, str]:
     """Internal function containing the complete county FIPS dictionary."""
+    # A built lookup-table artifact replaces the table below (python -m tools.common.lookup_tables)
+    table = load_lookup_table("county")
+    if table is not None:
+        return table.as_dict()
     return {
             "Autauga County, Alabama": "001",
             "Baldwin County, Alabama": "003",
@@ -3158,14 +3168,40 @@ def _get_county_fips_data() -> Dict[str, str]:
             "Weston County, Wyoming": "045",
     }
 
+
+@lru_cache(maxsize=1)
+def _get_county_index() -> LookupIndex:
+    """Internal function returning the typo-tolerant index over county names, built on first use."""
+    table = load_lookup_table("county")
+    if table is not None:
+        return table.lookup_index(qualifier_separator=", ", word_aliases=WORD_ALIASES)
+    return LookupIndex(_get_county_fips_data().items(), qualifier_separator=", ", word_aliases=WORD_ALIASES)
+
+
+@lru_cache(maxsize=1)
+def _get_county_geoids() -> Tuple[Optional[str], ...]:
+    """Internal function returning the GEOID (state + county FIPS) of each county index entry."""
+    index = _get_county_index()
+    state_fips = _get_state_fips_data()
+    geoids = []
+    for name, code in zip(index.names, index.codes):
+        state = state_fips.get(name.rsplit(", ", 1)[-1])
+        geoids.append(state + code if state else None)
+    return tuple(geoids)
+
+def _get_county_population_prior() -> Optional[Callable[[int], float]]:
+    """Internal function returning the population search prior for counties, or None until a population index is built."""
+    return population_prior("county", _get_county_geoids())
+
 def search_county_fips(keyword: List[str], max_results: Optional[int] = 20) -> List[Tuple[str, str]]:
     """
     Search for counties by keyword(s) and return their FIPS codes.
     
-    Supports flexible multi-word searches and multiple search terms. Results are prioritized by match quality:
-    1. Exact word matches (e.g., "cook" → "Cook County")
-    2. All words match (e.g., "cook county illinois" → "Cook County, Illinois") 
-    3. Partial matches (e.g., "coo" → "Cook County")
+    Supports flexible multi-word searches and multiple search terms. Results are ranked by
+    relevance (BM25): whole-word matches score above prefix matches (e.g., "coo" → "Cook
+    County") and misspellings, rarer words count for more than common ones, and shorter
+    names that match fully rank above longer ones. When a population index has been built,
+    more populous areas rank higher among equally good matches.
     
     Args:
         keyword (List[str]): Search term(s) to match against county names (case-insensitive).
@@ -3192,39 +3228,21 @@ def search_county_fips(keyword: List[str], max_results: Optional[int] = 20) -> L
     if not keywords:
         return []
     
-    county_data = _get_county_fips_data()
+    index = _get_county_index()
+    prior = _get_county_population_prior()
     all_results = []
     
     # Process each keyword separately
     for search_keyword in keywords:
-        # Split the search query into individual terms
-        search_terms = re.split(r'\W+', search_keyword)
-        search_terms = [term for term in search_terms if term]  # Remove empty strings
+        # Expand nicknames and postal codes, canonicalize abbreviations and make type words optional
+        search_terms, optional_terms = normalize_query(search_keyword)
         
         if not search_terms:
             continue
         
-        # Find matches with different priority levels for this keyword
-        exact_matches = []
-        all_word_matches = []
-        partial_matches = []
-        
-        for county_name, fips_code in county_data.items():
-            county_lower = county_name.lower()
-            county_words = re.split(r'\W+', county_lower)
-            
-            # Priority 1: Single term that exactly matches a word in the county name
-            if len(search_terms) == 1 and search_terms[0] in county_words:
-                exact_matches.append((county_name, fips_code))
-            # Priority 2: All search terms appear as words in the county name
-            elif len(search_terms) > 1 and all(term in county_words for term in search_terms):
-                all_word_matches.append((county_name, fips_code))
-            # Priority 3: All search terms appear somewhere in the county name (substring match)
-            elif all(term in county_lower for term in search_terms):
-                partial_matches.append((county_name, fips_code))
+        # Rank matching counties by relevance, with prefix and typo-tolerant matching
+        keyword_results = index.search(search_terms, max_results, prior, optional_terms=optional_terms)
         
-        # Combine results for this keyword, prioritizing exact matches
-        keyword_results = exact_matches + all_word_matches + partial_matches
         all_results.extend(keyword_results)
     
     # Remove duplicates while preserving order
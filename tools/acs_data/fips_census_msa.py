@@ -1,5 +1,10 @@
-from typing import Dict, List, Tuple, Optional, Union
-import re
+from functools import lru_cache
+from typing import Callable, Dict, List, Tuple, Optional, Union
+
+from tools.common.lookup_index import LookupIndex
+from tools.common.lookup_tables import load_lookup_table
+from tools.common.name_normalization import WORD_ALIASES, normalize_query
+from tools.acs_data.rank_acs_index import population_prior
 
 """
 FIPS MSA Search Tool
@@ -12,6 +17,10 @@ This is designed for use as an LLM tool to provide manageable result sets.
 
 def _get_msa_fips_data() -> Dict[str, str]:
     """Internal function containing the complete MSA/Micro FIPS dictionary."""
+    # A built lookup-table artifact replaces the table below (python -m tools.common.lookup_tables)
+    table = load_lookup_table("msa")
+    if table is not None:
+        return table.as_dict()
     return {
         "Aberdeen, SD Micro Area": "10100",
         "Aberdeen, WA Micro Area": "10140",
@@ -940,14 +949,36 @@ def _get_msa_fips_data() -> Dict[str, str]:
         "Zapata, TX Micro Area": "49820",
     }
 
+
+@lru_cache(maxsize=1)
+def _get_msa_index() -> LookupIndex:
+    """Internal function returning the typo-tolerant index over MSA/Micro area names, built on first use."""
+    table = load_lookup_table("msa")
+    if table is not None:
+        return table.lookup_index(qualifier_separator=", ", word_aliases=WORD_ALIASES)
+    return LookupIndex(_get_msa_fips_data().items(), qualifier_separator=", ", word_aliases=WORD_ALIASES)
+
+
+@lru_cache(maxsize=1)
+def _get_msa_geoids() -> Tuple[Optional[str], ...]:
+    """Internal function returning the GEOID (CBSA code) of each MSA/Micro area index entry."""
+    return tuple(_get_msa_index().codes)
+
+def _get_msa_population_prior() -> Optional[Callable[[int], float]]:
+    """Internal function returning the population search prior for MSA/Micro areas, or None until a population index is built."""
+    # Rank indexes are keyed by the Census geo_type the ACS pulls use
+    return population_prior("metropolitan statistical area/micropolitan statistical area", _get_msa_geoids())
+
 def search_msa_fips(keyword: List[str], max_results: Optional[int] = 20) -> List[Tuple[str, str]]:
     """
     Search for Metropolitan Statistical Areas (MSAs) and Micropolitan Statistical Areas by keyword(s) and return their FIPS codes.
     
-    Supports flexible multi-word searches and multiple search terms. Results are prioritized by match quality:
-    1. Exact word matches (e.g., "atlanta" → "Atlanta-Sandy Springs-Roswell, GA Metro Area")
-    2. All words match (e.g., "atlanta metro area" → "Atlanta-Sandy Springs-Roswell, GA Metro Area") 
-    3. Partial matches (e.g., "atl" → "Atlanta-Sandy Springs-Roswell, GA Metro Area")
+    Supports flexible multi-word searches and multiple search terms. Results are ranked by
+    relevance (BM25): whole-word matches score above prefix matches (e.g., "atl" → "Atlanta-
+    Sandy Springs-Roswell, GA Metro Area") and misspellings, rarer words count for more than
+    common ones, and shorter names that match fully rank above longer ones. When a
+    population index has been built, more populous areas rank higher among equally good
+    matches.
     
     Args:
         keyword (Union[str, List[str]]): Single search term or list of search terms to match against MSA/Micro area names (case-insensitive)
@@ -977,7 +1008,8 @@ def search_msa_fips(keyword: List[str], max_results: Optional[int] = 20) -> List
     if not keywords:
         return []
     
-    msa_data = _get_msa_fips_data()
+    index = _get_msa_index()
+    prior = _get_msa_population_prior()
     all_results = []
     seen = set()
     
@@ -985,31 +1017,13 @@ def search_msa_fips(keyword: List[str], max_results: Optional[int] = 20) -> List
     for kw in keywords:
         kw = kw.lower()
         
-        # Split the search query into individual terms
-        search_terms = re.split(r'\W+', kw)
-        search_terms = [term for term in search_terms if term]  # Remove empty strings
-        
-        # Find matches with different priority levels
-        exact_matches = []
-        all_word_matches = []
-        partial_matches = []
+        # Expand nicknames, canonicalize abbreviations and make type words optional
+        search_terms, optional_terms = normalize_query(kw, expand_postal_codes=False)
         
-        for area_name, fips_code in msa_data.items():
-            area_lower = area_name.lower()
-            area_words = re.split(r'\W+', area_lower)
-            
-            # Priority 1: Single term that exactly matches a word in the area name
-            if len(search_terms) == 1 and search_terms[0] in area_words:
-                exact_matches.append((area_name, fips_code))
-            # Priority 2: All search terms appear as words in the area name
-            elif len(search_terms) > 1 and all(term in area_words for term in search_terms):
-                all_word_matches.append((area_name, fips_code))
-            # Priority 3: All search terms appear somewhere in the area name (substring match)
-            elif all(term in area_lower for term in search_terms):
-                partial_matches.append((area_name, fips_code))
+        keyword_results = index.search(search_terms, max_results, prior, optional_terms=optional_terms)
         
         # Add results from this keyword, avoiding duplicates
-        for result in exact_matches + all_word_matches + partial_matches:
+        for result in keyword_results:
             if result[1] not in seen:  # Check FIPS code for uniqueness
                 all_results.append(result)
                 seen.add(result[1])
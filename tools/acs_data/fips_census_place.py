@@ -1,5 +1,11 @@
-from typing import Dict, List, Tuple, Optional, Union
-import re
+from functools import lru_cache
+from typing import Callable, Dict, List, Tuple, Optional, Union
+
+from tools.common.lookup_index import LookupIndex
+from tools.common.lookup_tables import load_lookup_table
+from tools.common.name_normalization import WORD_ALIASES, normalize_query
+from tools.acs_data.fips_census_state import _get_state_fips_data
+from tools.acs_data.rank_acs_index import population_prior
 
 
 """
@@ -12,6 +18,10 @@ This is designed for use as an LLM tool to provide manageable result sets.
 
 def _get_place_fips_data() -> Dict[str, str]:
     """Internal function containing the complete place FIPS dictionary."""
+    # A built lookup-table artifact replaces the table below (python -m tools.common.lookup_tables)
+    table = load_lookup_table("place")
+    if table is not None:
+        return table.as_dict()
     return {
         "Aaronsburg CDP (Centre County), Pennsylvania": "00100",
         "Aaronsburg CDP (Washington County), Pennsylvania": "00104",
@@ -32048,14 +32058,40 @@ def _get_place_fips_data() -> Dict[str, str]:
         "Zwolle town, Louisiana": "83685",
     }
 
+
+@lru_cache(maxsize=1)
+def _get_place_index() -> LookupIndex:
+    """Internal function returning the typo-tolerant index over place names, built on first use."""
+    table = load_lookup_table("place")
+    if table is not None:
+        return table.lookup_index(max_edit_distance=1, qualifier_separator=", ", word_aliases=WORD_ALIASES)
+    return LookupIndex(_get_place_fips_data().items(), max_edit_distance=1, qualifier_separator=", ", word_aliases=WORD_ALIASES)
+
+
+@lru_cache(maxsize=1)
+def _get_place_geoids() -> Tuple[Optional[str], ...]:
+    """Internal function returning the GEOID (state + place FIPS) of each place index entry."""
+    index = _get_place_index()
+    state_fips = _get_state_fips_data()
+    geoids = []
+    for name, code in zip(index.names, index.codes):
+        state = state_fips.get(name.rsplit(", ", 1)[-1])
+        geoids.append(state + code if state else None)
+    return tuple(geoids)
+
+def _get_place_population_prior() -> Optional[Callable[[int], float]]:
+    """Internal function returning the population search prior for places, or None until a population index is built."""
+    return population_prior("place", _get_place_geoids())
+
 def search_place_fips(keyword: List[str], max_results: Optional[int] = 20) -> List[Tuple[str, str]]:
     """
     Search for places by keyword(s) and return their FIPS codes.
     
-    Supports flexible multi-word searches and multiple search terms. Results are prioritized by match quality:
-    1. Exact word matches (e.g., "birmingham" → "Birmingham city, Alabama")
-    2. All words match (e.g., "birmingham city alabama" → "Birmingham city, Alabama") 
-    3. Partial matches (e.g., "birm" → "Birmingham city, Alabama")
+    Supports flexible multi-word searches and multiple search terms. Results are ranked by
+    relevance (BM25): whole-word matches score above prefix matches (e.g., "birm" →
+    "Birmingham city, Alabama") and misspellings, rarer words count for more than common
+    ones, and shorter names that match fully rank above longer ones. When a population index
+    has been built, more populous areas rank higher among equally good matches.
     
     Args:
         keyword (Union[str, List[str]]): Search term(s) to match against place names (case-insensitive).
@@ -32089,72 +32125,21 @@ def search_place_fips(keyword: List[str], max_results: Optional[int] = 20) -> Li
     else:
         return []
     
-    place_data = _get_place_fips_data()
+    index = _get_place_index()
+    prior = _get_place_population_prior()
     all_results = []
     
     # Process each keyword separately
     for search_keyword in keywords:
-        # Split the search query into individual terms
-        search_terms = re.split(r'\W+', search_keyword)
-        search_terms = [term for term in search_terms if term]  # Remove empty strings
+        # Expand nicknames and postal codes, canonicalize abbreviations and make type words optional
+        search_terms, optional_terms = normalize_query(search_keyword)
         
         if not search_terms:
             continue
         
-        # Special case: Handle "new york city" and "new york" specifically to return NYC
-        if set(search_terms) == {'new', 'york', 'city'} or set(search_terms) == {'new', 'york'}:
-            all_results.append(("New York city, New York", "51000"))
-            continue
-        
-        # Find matches with different priority levels for this keyword
-        exact_matches = []
-        all_word_matches = []
-        partial_matches = []
-        
-        for place_name, fips_code in place_data.items():
-            place_lower = place_name.lower()
-            place_words = re.split(r'\W+', place_lower)
-            
-            # Priority 1: Single term that exactly matches a word in the place name
-            if len(search_terms) == 1 and search_terms[0] in place_words:
-                exact_matches.append((place_name, fips_code))
-            # Priority 2: All search terms appear as words in the place name
-            elif len(search_terms) > 1:
-                # Check if this would be a problematic match (all terms found in place words)
-                if all(term in place_words for term in search_terms):
-                    # For places with state info, check if it's a legitimate match or false positive
-                    if ', ' in place_name:
-                        place_part = place_name.split(', ')[0].lower()
-                        state_part = place_name.split(', ')[1].lower()
-                        place_part_words = re.split(r'\W+', place_part)
-                        state_words = re.split(r'\W+', state_part)
-                        
-                        # To avoid false positives like "new york city" matching "Albany city, New York",
-                        # require that at least one search term appears in the place part but not in the state part
-                        # Exclude common place type words that aren't meaningful for distinguishing places
-                        place_type_words = {'city', 'town', 'village', 'borough', 'township', 'cdp', 'county'}
-                        meaningful_place_terms = [term for term in search_terms if term in place_part_words and term not in state_words and term not in place_type_words]
-                        if len(meaningful_place_terms) > 0:
-                            all_word_matches.append((place_name, fips_code))
-                    else:
-                        # If no comma separator, use original logic
-                        all_word_matches.append((place_name, fips_code))
-            # Priority 3: All search terms appear somewhere in the place name (substring match)
-            # But exclude the state portion to avoid false matches like "new york city" matching "Albany city, New York"
-            else:
-                # Split place name into main part and state (format: "Place name, State")
-                if ', ' in place_name:
-                    place_part = place_name.split(', ')[0].lower()
-                    # Check if all terms match in the main place part (not including state)
-                    if all(term in place_part for term in search_terms):
-                        partial_matches.append((place_name, fips_code))
-                else:
-                    # If no comma separator, use original logic for substring matching
-                    if all(term in place_lower for term in search_terms):
-                        partial_matches.append((place_name, fips_code))
+        # Rank matching places by relevance, with prefix and typo-tolerant matching
+        keyword_results = index.search(search_terms, max_results, prior, optional_terms=optional_terms)
         
-        # Combine results for this keyword
-        keyword_results = exact_matches + all_word_matches + partial_matches
         all_results.extend(keyword_results)
     
     # Remove duplicates while preserving order
@@ -0,0 +1,246 @@
+import re
+from array import array
+from functools import lru_cache
+from typing import Dict, List, Optional, Any, Tuple
+
+from tools.acs_data.fips_census_county import _get_county_fips_data, search_county_fips
+from tools.acs_data.fips_census_place import _get_place_fips_data, search_place_fips
+from tools.acs_data.fips_census_state import _get_state_fips_data
+from tools.acs_data.rank_acs_index import get_population_by_geoid
+
+"""
+Place and County Gazetteer
+
+This module turns the flat "Name type, State" -> code lookup tables into a compact
+structured table with the state FIPS code, full GEOID, place type and county for every
+entry. Search results carry state_fips alongside place_fips/county_fips, so they can be
+passed straight to the get_acs_place_* / get_acs_county_* tools without a separate
+lookup_state_fips call.
+
+A place's county comes from its name when the name carries one ("Aaronsburg CDP (Centre
+County)"), and otherwise from the crosswalk's place-county relation file; without that
+file (see tools.common.crosswalk) the county of most places is None.
+"""
+
+# Place type suffixes as they appear in Census place names, longest first
+_PLACE_TYPES = [
+    "metropolitan government",
+    "consolidated government",
+    "unified government",
+    "metro government",
+    "city and borough",
+    "urban county",
+    "municipality",
+    "corporation",
+    "township",
+    "borough",
+    "village",
+    "county",
+    "town",
+    "city",
+    "CDP",
+]
+
+_COUNTY_PAREN = re.compile(r'\s*\(([^()]*Count(?:y|ies))\)')
+
+
+def _parse_place_name(place_part: str) -> Tuple[str, str, Optional[str]]:
+    """Split "Aaronsburg CDP (Centre County)" into ("Aaronsburg", "CDP", "Centre County")."""
+    county = None
+    county_match = _COUNTY_PAREN.search(place_part)
+    if county_match:
+        county = county_match.group(1)
+        place_part = (place_part[:county_match.start()] + place_part[county_match.end():]).strip()
+
+    balance = place_part.endswith("(balance)")
+    if balance:
+        place_part = place_part[:-len("(balance)")].strip()
+
+    place_type = ""
+    for suffix in _PLACE_TYPES:
+        if place_part.lower().endswith(" " + suffix.lower()):
+            place_type = place_part[-len(suffix):]
+            place_part = place_part[:-len(suffix)].strip()
+            break
+
+    if balance:
+        place_type = f"{place_type} (balance)".strip()
+    return place_part, place_type, county
+
+
+@lru_cache(maxsize=1)
+def _get_county_names_by_geoid() -> Dict[str, str]:
+    """Internal function returning county GEOID -> county name ("17031" -> "Cook County")."""
+    gazetteer = _get_county_gazetteer()
+    return {
+        gazetteer.states[gazetteer.state_ids[row_id]][1] + gazetteer.codes[row_id]: gazetteer.names[row_id]
+        for row_id in range(len(gazetteer))
+    }
+
+
+def _place_county(geoid: str) -> Optional[str]:
+    """County name(s) of a place from the place-county relation, "; "-joined, or None if not loaded."""
+    # Imported here because the crosswalk builds its relations from these gazetteers
+    from tools.common.crosswalk import translate_code
+    try:
+        counties = translate_code(geoid, "place", "county")
+    except ValueError:
+        return None
+    names = _get_county_names_by_geoid()
+    return "; ".join(names.get(county, county) for county, _ in counties) or None
+
+
+class Gazetteer:
+    """
+    Column-oriented table of places or counties.
+
+    Text columns are stored as tuples and small categorical columns (state, place type)
+    as array indexes into a list of distinct values, so the ~32k place rows stay compact.
+    """
+
+    def __init__(self, geo_type: str, rows: List[Dict[str, Any]]):
+        self.geo_type = geo_type
+        self.full_names = tuple(row["full_name"] for row in rows)
+        self.names = tuple(row["name"] for row in rows)
+        self.codes = tuple(row["code"] for row in rows)
+        self.counties = tuple(row.get("county") for row in rows)
+
+        self.states: List[Tuple[str, str]] = sorted({(row["state"], row["state_fips"]) for row in rows})
+        state_ids = {state: i for i, state in enumerate(self.states)}
+        self.state_ids = array("B", (state_ids[(row["state"], row["state_fips"])] for row in rows))
+
+        self.types: List[str] = sorted({row.get("type", "") for row in rows})
+        type_ids = {place_type: i for i, place_type in enumerate(self.types)}
+        self.type_ids = array("B", (type_ids[row.get("type", "")] for row in rows))
+
+        self.row_by_full_name = {full_name: i for i, full_name in enumerate(self.full_names)}
+
+    def __len__(self) -> int:
+        return len(self.full_names)
+
+    def record(self, row_id: int, population: Optional[Dict[str, float]] = None) -> Dict[str, Any]:
+        """Return one row as a dict ready to feed into the ACS pull tools."""
+        state, state_fips = self.states[self.state_ids[row_id]]
+        code = self.codes[row_id]
+        geoid = state_fips + code
+        record = {"name": self.full_names[row_id]}
+        if self.geo_type == "place":
+            record.update({
+                "place_name": self.names[row_id],
+                "place_type": self.types[self.type_ids[row_id]],
+                "county": self.counties[row_id] or _place_county(geoid),
+                "state": state,
+                "state_fips": state_fips,
+                "place_fips": code,
+            })
+        else:
+            record.update({
+                "county_name": self.names[row_id],
+                "state": state,
+                "state_fips": state_fips,
+                "county_fips": code,
+            })
+        record["geoid"] = geoid
+        record["population"] = population.get(geoid) if population else None
+        return record
+
+
+@lru_cache(maxsize=1)
+def _get_place_gazetteer() -> Gazetteer:
+    """Internal function returning the structured place table, built on first use."""
+    state_fips = _get_state_fips_data()
+    rows = []
+    for full_name, place_fips in _get_place_fips_data().items():
+        place_part, state = full_name.rsplit(", ", 1)
+        name, place_type, county = _parse_place_name(place_part)
+        rows.append({
+            "full_name": full_name,
+            "name": name,
+            "type": place_type,
+            "county": county,
+            "state": state,
+            "state_fips": state_fips.get(state, ""),
+            "code": place_fips,
+        })
+    return Gazetteer("place", rows)
+
+
+@lru_cache(maxsize=1)
+def _get_county_gazetteer() -> Gazetteer:
+    """Internal function returning the structured county table, built on first use."""
+    state_fips = _get_state_fips_data()
+    rows = []
+    for full_name, county_fips in _get_county_fips_data().items():
+        county_name, state = full_name.rsplit(", ", 1)
+        rows.append({
+            "full_name": full_name,
+            "name": county_name,
+            "state": state,
+            "state_fips": state_fips.get(state, ""),
+            "code": county_fips,
+        })
+    return Gazetteer("county", rows)
+
+
+def search_place_gazetteer(keyword: List[str], max_results: Optional[int] = 20) -> List[Dict[str, Any]]:
+    """
+    Search for places by keyword(s) and return structured records ready for ACS place pulls.
+
+    Matching uses the same search as search_place_fips (including typo tolerance), but each
+    result also carries the state FIPS code, full GEOID, place type and county, so the caller
+    does not need a separate state lookup before calling get_acs_place_* tools. County is
+    None for places whose name does not carry one unless the crosswalk's place-county
+    relation file is built; places in several counties list them all ("Cook County; DuPage County").
+
+    Args:
+        keyword (List[str]): Search term(s) to match against place names (case-insensitive)
+        max_results (Optional[int]): Maximum number of results to return (default: 20)
+
+    Returns:
+        List[Dict[str, Any]]: Records with name, place_name, place_type, county, state,
+                              state_fips, place_fips, geoid and population (when known)
+
+    Examples:
+        >>> search_place_gazetteer(["waupaca"])
+        [{"name": "Waupaca city, Wisconsin", "place_name": "Waupaca", "place_type": "city",
+          "county": "Waupaca County", "state": "Wisconsin", "state_fips": "55", "place_fips": "84375",
+          "geoid": "5584375", "population": 6282.0}]
+    """
+    gazetteer = _get_place_gazetteer()
+    population = get_population_by_geoid("place")
+    return [
+        gazetteer.record(gazetteer.row_by_full_name[name], population)
+        for name, _ in search_place_fips(keyword, max_results)
+        if name in gazetteer.row_by_full_name
+    ]
+
+
+def search_county_gazetteer(keyword: List[str], max_results: Optional[int] = 20) -> List[Dict[str, Any]]:
+    """
+    Search for counties by keyword(s) and return structured records ready for ACS county pulls.
+
+    Args:
+        keyword (List[str]): Search term(s) to match against county names (case-insensitive)
+        max_results (Optional[int]): Maximum number of results to return (default: 20)
+
+    Returns:
+        List[Dict[str, Any]]: Records with name, county_name, state, state_fips, county_fips,
+                              geoid and population (when known)
+
+    Examples:
+        >>> search_county_gazetteer(["dupage"])
+        [{"name": "DuPage County, Illinois", "county_name": "DuPage County", "state": "Illinois",
+          "state_fips": "17", "county_fips": "043", "geoid": "17043", "population": 930559.0}]
+    """
+    gazetteer = _get_county_gazetteer()
+    population = get_population_by_geoid("county")
+    return [
+        gazetteer.record(gazetteer.row_by_full_name[name], population)
+        for name, _ in search_county_fips(keyword, max_results)
+        if name in gazetteer.row_by_full_name
+    ]
+
+
+if __name__ == "__main__":
+    print(search_place_gazetteer(["waupaca"]))
+    print(search_county_gazetteer(["dupage"]))
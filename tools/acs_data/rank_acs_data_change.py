@@ -0,0 +1,152 @@
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Optional, Any
+import numpy as np
+
+from tools.acs_data.acs_variable_pull import acs_variable_pull, GEO_TYPES
+
+
+def rank_acs_data_change(
+    data_point: str,
+    geo_type: str,
+    start_year: str,
+    end_year: str,
+    state_fips: Optional[str] = None,
+    sort_by: Optional[str] = "percent_change",
+    direction: Optional[str] = "high",
+    limit: Optional[int] = 20,
+    min_start_value: Optional[float] = None
+) -> Dict[str, Any]:
+    """
+    Finds the geographic areas with the largest change in an ACS data point between two years.
+
+    Both vintages are pulled concurrently (or served from the in-memory pull cache), joined
+    on GEOID, and the absolute and percent change is computed for every matched area at once.
+
+    Args:
+        data_point (str): The ACS data point/variable to compare (e.g., "DP04_0089E" for median home value)
+        geo_type (str): The geographic type to query ("place", "county", "state", "metropolitan statistical area/micropolitan statistical area")
+        start_year (str): The earlier ACS year (e.g., "2017"). Must be 2010 or later.
+        end_year (str): The later ACS year (e.g., "2022")
+        state_fips (Optional[str]): The FIPS code for the state to limit results to. If None, queries all areas. Not applicable for MSA queries.
+        sort_by (Optional[str]): "percent_change" or "absolute_change". Defaults to "percent_change".
+        direction (Optional[str]): "high" for the biggest gains, "low" for the biggest declines. Defaults to "high".
+        limit (Optional[int]): Number of results to return. Defaults to 20.
+        min_start_value (Optional[float]): Skip areas whose start year value is below this, to keep small bases
+                                           from dominating percent change rankings.
+
+    Returns:
+        Dict[str, Any]: Response containing:
+            - status: "success" or "error"
+            - data: List of areas with start value, end value, absolute and percent change (if successful)
+            - error_message: Error details (if unsuccessful)
+    """
+    try:
+        def _error_response(message: str) -> Dict[str, str]:
+            return {"status": "error", "error_message": message}
+
+        # Validate inputs
+        if not isinstance(geo_type, str) or geo_type.lower() not in GEO_TYPES:
+            return _error_response("geo_type must be one of: 'place', 'county', 'state', 'metropolitan statistical area/micropolitan statistical area'.")
+
+        try:
+            if int(start_year) >= int(end_year):
+                return _error_response("start_year must be earlier than end_year.")
+        except (ValueError, TypeError):
+            return _error_response("start_year and end_year must be valid integer strings.")
+
+        sort_by = sort_by or "percent_change"
+        if sort_by not in ["percent_change", "absolute_change"]:
+            return _error_response("sort_by must be 'percent_change' or 'absolute_change'.")
+
+        direction = (direction or "high").lower()
+        if direction not in ["high", "low"]:
+            return _error_response("direction must be 'high' or 'low'.")
+
+        if limit is not None and (not isinstance(limit, int) or limit < 1 or limit > 100):
+            return _error_response("limit must be an integer between 1 and 100.")
+        limit = limit or 20
+
+        # Pull both vintages concurrently
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            start_future = executor.submit(acs_variable_pull, data_point, geo_type, state_fips, str(start_year))
+            end_future = executor.submit(acs_variable_pull, data_point, geo_type, state_fips, str(end_year))
+            start_result = start_future.result()
+            end_result = end_future.result()
+
+        for label, result in (("start_year", start_result), ("end_year", end_result)):
+            if result.get("status") != "success":
+                return _error_response(f"Failed to pull {label} data: {result.get('error_message')}")
+
+        # Hash join on GEOID: build on the start year, probe with the end year
+        start_values = {row["geoid"]: row["value"] for row in start_result["data"]}
+        matched_rows = []
+        matched_start = []
+        for row in end_result["data"]:
+            start_value = start_values.get(row["geoid"])
+            if start_value is not None:
+                matched_rows.append(row)
+                matched_start.append(start_value)
+
+        if not matched_rows:
+            return _error_response("No areas matched between the two years.")
+
+        start_array = np.asarray(matched_start, dtype=np.float64)
+        end_array = np.fromiter((row["value"] for row in matched_rows), dtype=np.float64, count=len(matched_rows))
+        absolute_change = end_array - start_array
+        with np.errstate(divide="ignore", invalid="ignore"):
+            percent_change = np.where(start_array != 0, absolute_change / np.abs(start_array) * 100.0, np.nan)
+
+        metric = percent_change if sort_by == "percent_change" else absolute_change
+        eligible = ~np.isnan(metric)
+        if min_start_value is not None:
+            eligible &= start_array >= float(min_start_value)
+        candidate_indices = np.flatnonzero(eligible)
+
+        # Select the top-k without sorting every area
+        ranked_metric = metric[candidate_indices] if direction == "low" else -metric[candidate_indices]
+        k = min(limit, len(candidate_indices))
+        if k > 0:
+            top = np.argpartition(ranked_metric, k - 1)[:k]
+            top = top[np.argsort(ranked_metric[top], kind="stable")]
+            selected = candidate_indices[top]
+        else:
+            selected = candidate_indices[:0]
+
+        results = []
+        for index in selected:
+            row = matched_rows[index]
+            entry = {key: value for key, value in row.items() if key != "value"}
+            entry["start_value"] = float(start_array[index])
+            entry["end_value"] = float(end_array[index])
+            entry["absolute_change"] = round(float(absolute_change[index]), 2)
+            entry["percent_change"] = None if np.isnan(percent_change[index]) else round(float(percent_change[index]), 2)
+            results.append(entry)
+
+        return {
+            "status": "success",
+            "data": results,
+            "total_matched": len(matched_rows),
+            "total_ranked": int(len(candidate_indices)),
+            "unmatched_start": len(start_values) - len(matched_rows),
+            "unmatched_end": len(end_result["data"]) - len(matched_rows),
+            "returned_count": len(results),
+            "query_info": {
+                "data_point": data_point,
+                "geo_type": geo_type.lower(),
+                "state_fips": state_fips,
+                "start_year": start_result["year"],
+                "end_year": end_result["year"],
+                "sort_by": sort_by,
+                "direction": direction
+            }
+        }
+
+    except Exception as e:
+        return {"status": "error", "error_message": f"Unexpected error: {str(e)}"}
+
+
+if __name__ == "__main__":
+    print("Top 5 Illinois counties by median home value growth, 2017 to 2022:")
+    print(rank_acs_data_change("DP04_0089E", "county", "2017", "2022", "17", limit=5))
+    print("\nBottom 5 states by population change, 2017 to 2022:")
+    print(rank_acs_data_change("DP05_0001E", "state", "2017", "2022", direction="low", limit=5))
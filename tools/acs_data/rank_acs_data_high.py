@@ -2,6 +2,10 @@ from datetime import datetime
 from typing import Dict, Optional, Any, List
 import requests
 
+from tools.acs_data.acs_variable_pull import ACS_MISSING_VALUES
+from tools.acs_data.rank_acs_index import get_rank_index
+from tools.common.upstream import upstream_get
+
 def rank_acs_data_high(
     data_point: str,
     geo_type: str,
@@ -73,6 +77,24 @@ def rank_acs_data_high(
         else:
             return _error_response("data_point must start with DP02_, DP03_, DP04_, or DP05_.")
         
+        # Answer hot variables from the precomputed rank index without calling the Census API
+        rank_index = get_rank_index(data_point, geo_type, target_year)
+        if rank_index is not None:
+            top_results, total_found = rank_index.ranked(limit if limit else 20, highest=True, state_fips=state_fips)
+            return {
+                "status": "success",
+                "data": top_results,
+                "total_found": total_found,
+                "returned_count": len(top_results),
+                "query_info": {
+                    "data_point": data_point,
+                    "geo_type": geo_type,
+                    "state_fips": state_fips,
+                    "year": target_year,
+                    "source": "precomputed_index"
+                }
+            }
+
         # Build parameters based on geo_type and state_fips
         params = {
             "get": f"NAME,{data_point}",
@@ -95,7 +117,7 @@ def rank_acs_data_high(
         # For MSA queries, we don't use state filtering at all
 
         url = f"https://api.census.gov/data/{target_year}/acs/acs5/profile"
-        response = requests.get(url, params=params, timeout=30)
+        response = upstream_get(url, params=params, timeout=30)
 
         if response.status_code != 200:
             return _error_response(
@@ -138,6 +160,9 @@ def rank_acs_data_high(
                     continue
                 
                 value = float(row[data_point_index])
+                # Skip annotation values standing in for missing estimates, as the rank index does
+                if value in ACS_MISSING_VALUES:
+                    continue
                 name = row[name_index] if len(row) > name_index else "Unknown"
                 
                 # Include additional geographic identifiers if available
@@ -179,7 +204,8 @@ def rank_acs_data_high(
                 "data_point": data_point,
                 "geo_type": geo_type,
                 "state_fips": state_fips,
-                "year": target_year
+                "year": target_year,
+                "source": "census_api"
             }
         }
 
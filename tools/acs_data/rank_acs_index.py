@@ -0,0 +1,205 @@
+import logging
+import threading
+from array import array
+from datetime import datetime
+from typing import Callable, Dict, Optional, Any, List, Sequence, Tuple
+
+from tools.acs_data.acs_variable_pull import acs_variable_pull
+
+"""
+Precomputed ACS Rank Indexes
+
+This module keeps nationwide rankings for a configurable set of hot (variable, geo_type)
+pairs in memory. Each index stores the values in sorted order in a compact array next to
+the matching area identifiers, so rank_acs_data_high/low can answer those queries without
+calling the Census API. Only the newest ACS vintage of each pair is kept: building a newer
+year drops the index for the year it supersedes.
+"""
+
+logger = logging.getLogger(__name__)
+
+_INDEXES: Dict[Tuple[str, str, str], "RankIndex"] = {}
+_INDEX_LOCK = threading.Lock()
+_REFRESHER: Optional[threading.Thread] = None
+_STOP_REFRESHER = threading.Event()
+
+
+class RankIndex:
+    """Sorted, compact ranking of one ACS variable across every area of a geographic type."""
+
+    def __init__(self, data_point: str, geo_type: str, year: str, rows: List[Dict[str, Any]]):
+        ordered = sorted(rows, key=lambda row: row["value"])
+        self.data_point = data_point
+        self.geo_type = geo_type
+        self.year = year
+        self.built_at = datetime.now().isoformat()
+        self.values = array("d", (row["value"] for row in ordered))
+        self.names = tuple(row["name"] for row in ordered)
+        self.state_fips = tuple(row.get("state_fips") for row in ordered)
+        # Geography columns other than name/value (state_fips, county_fips, place_fips, msa_fips)
+        self.geo_columns = [key for key in (ordered[0].keys() if ordered else []) if key.endswith("_fips")]
+        self.geo_values = {column: tuple(row.get(column) for row in ordered) for column in self.geo_columns}
+        self._values_by_geoid: Optional[Dict[str, float]] = None
+
+    def __len__(self) -> int:
+        return len(self.values)
+
+    def values_by_geoid(self) -> Dict[str, float]:
+        """Map of GEOID (concatenated geography codes) to value, built on first use."""
+        if self._values_by_geoid is None:
+            columns = [self.geo_values[column] for column in self.geo_columns]
+            self._values_by_geoid = {
+                "".join(codes): value for codes, value in zip(zip(*columns), self.values)
+            }
+        return self._values_by_geoid
+
+    def _row(self, position: int) -> Dict[str, Any]:
+        row = {
+            "name": self.names[position],
+            "value": self.values[position],
+            "data_point": self.data_point,
+        }
+        for column in self.geo_columns:
+            row[column] = self.geo_values[column][position]
+        row["national_percentile"] = round((position + 1) / len(self.values) * 100, 1)
+        return row
+
+    def ranked(self, limit: int, highest: bool = True, state_fips: Optional[str] = None) -> Tuple[List[Dict[str, Any]], int]:
+        """
+        Return up to limit rows from the top (highest=True) or bottom of the ranking.
+
+        Args:
+            limit: Number of rows to return
+            highest: Walk the ranking from the highest value down when True
+            state_fips: Only include areas in this state (ignored for MSAs, which have no state)
+
+        Returns:
+            Tuple of (rows, total number of areas matching the state filter)
+        """
+        positions = range(len(self.values) - 1, -1, -1) if highest else range(len(self.values))
+        if state_fips and "state_fips" in self.geo_columns:
+            total = self.state_fips.count(state_fips)
+            positions = (position for position in positions if self.state_fips[position] == state_fips)
+        else:
+            total = len(self.values)
+
+        rows = []
+        for position in positions:
+            if len(rows) >= limit:
+                break
+            rows.append(self._row(position))
+        return rows, total
+
+
+def build_rank_index(data_point: str, geo_type: str, year: Optional[str] = None) -> Optional[RankIndex]:
+    """
+    Pull a variable nationwide and store its rank index. Returns None if the pull fails.
+
+    The index is kept only if no newer year of the same variable and geo_type is held.
+    """
+    # Skip the pull cache so only the compact index is kept in memory
+    result = acs_variable_pull(data_point, geo_type, None, year, use_cache=False)
+    if result.get("status") != "success":
+        logger.warning(f"Could not build rank index for {data_point}/{geo_type}: {result.get('error_message')}")
+        return None
+
+    index = RankIndex(data_point, geo_type.lower(), result["year"], result["data"])
+    _store_index(index)
+    return index
+
+
+def _store_index(index: RankIndex) -> None:
+    """Keep an index unless a newer vintage of it is held, dropping any older vintages."""
+    with _INDEX_LOCK:
+        years = [year for (data_point, geo_type, year) in _INDEXES
+                 if (data_point, geo_type) == (index.data_point, index.geo_type)]
+        if any(int(year) > int(index.year) for year in years):
+            logger.info(f"Not keeping {index.year} rank index for {index.data_point}/{index.geo_type}: a newer year is held")
+            return
+        for year in years:
+            if year != index.year:
+                del _INDEXES[(index.data_point, index.geo_type, year)]
+        _INDEXES[(index.data_point, index.geo_type, index.year)] = index
+
+
+def get_rank_index(data_point: str, geo_type: str, year: str) -> Optional[RankIndex]:
+    """Return the precomputed index for (data_point, geo_type, year) if one has been built."""
+    with _INDEX_LOCK:
+        return _INDEXES.get((data_point, geo_type.lower(), str(year)))
+
+
+def get_population_by_geoid(geo_type: str) -> Optional[Dict[str, float]]:
+    """Return GEOID -> total population (DP05_0001E) from the newest population index for geo_type, if built."""
+    with _INDEX_LOCK:
+        years = [year for (data_point, index_geo_type, year) in _INDEXES
+                 if data_point == "DP05_0001E" and index_geo_type == geo_type]
+        index = _INDEXES[("DP05_0001E", geo_type, max(years))] if years else None
+    return index.values_by_geoid() if index is not None else None
+
+
+def population_prior(geo_type: str, geoids: Sequence[Optional[str]]) -> Optional[Callable[[int], float]]:
+    """
+    Return a search prior giving the population of the area at each lookup-index position.
+
+    geoids holds the GEOID for each entry of the lookup index, in index order. Returns None
+    when no population index has been built for geo_type, so searches rank on text alone.
+    """
+    population = get_population_by_geoid(geo_type)
+    if not population:
+        return None
+    return lambda entry_id: population.get(geoids[entry_id]) or 0.0
+
+
+def refresh_hot_rank_indexes(hot_variables: List[Tuple[str, str]], year: Optional[str] = None) -> int:
+    """Rebuild the rank index for every hot (data_point, geo_type) pair. Returns the number built."""
+    built = 0
+    for data_point, geo_type in hot_variables:
+        try:
+            if build_rank_index(data_point, geo_type, year) is not None:
+                built += 1
+        except Exception as e:
+            logger.warning(f"Rank index refresh failed for {data_point}/{geo_type}: {e}")
+    logger.info(f"Refreshed {built}/{len(hot_variables)} hot ACS rank indexes")
+    return built
+
+
+def start_rank_index_refresher(hot_variables: List[Tuple[str, str]], interval_seconds: int) -> threading.Thread:
+    """Build the hot rank indexes in a background thread and rebuild them every interval_seconds."""
+    global _REFRESHER
+    if _REFRESHER is not None and _REFRESHER.is_alive():
+        return _REFRESHER
+
+    _STOP_REFRESHER.clear()
+
+    def _run():
+        while not _STOP_REFRESHER.is_set():
+            refresh_hot_rank_indexes(hot_variables)
+            _STOP_REFRESHER.wait(interval_seconds)
+
+    _REFRESHER = threading.Thread(target=_run, name="acs-rank-index-refresher", daemon=True)
+    _REFRESHER.start()
+    return _REFRESHER
+
+
+def stop_rank_index_refresher() -> None:
+    """Ask the background refresher to exit after its current pass."""
+    _STOP_REFRESHER.set()
+
+
+def rank_index_status() -> List[Dict[str, Any]]:
+    """Describe the rank indexes currently held in memory."""
+    with _INDEX_LOCK:
+        indexes = list(_INDEXES.values())
+    return [{
+        "data_point": index.data_point,
+        "geo_type": index.geo_type,
+        "year": index.year,
+        "areas": len(index),
+        "built_at": index.built_at
+    } for index in indexes]
+
+
+if __name__ == "__main__":
+    index = build_rank_index("DP05_0001E", "state")
+    if index:
+        print(index.ranked(5)[0])
@@ -0,0 +1,185 @@
+from functools import lru_cache
+from typing import Dict, List, Optional, Any, Tuple
+
+from tools.common.lookup_index import tokenize
+from tools.common.name_normalization import PLACE_TYPE_WORDS, normalize_words, normalize_query
+from tools.acs_data.fips_census_county import _get_county_index
+from tools.acs_data.fips_census_place import _get_place_index
+from tools.acs_data.fips_census_state import _get_state_fips_data, _get_state_abbreviation_data
+from tools.acs_data.gazetteer import _get_county_gazetteer, _get_place_gazetteer
+from tools.acs_data.rank_acs_index import get_population_by_geoid
+
+"""
+Batch Geography Resolver
+
+This module resolves long lists of free-text place or county names (as pasted from a
+spreadsheet) against the in-memory lookup indexes in a single call. Each name gets a best
+match with a confidence score and an ambiguity flag, returned as a compact table.
+"""
+
+# Candidates scoring within this margin of the best match make a name ambiguous
+_AMBIGUITY_MARGIN = 0.05
+
+RESOLVE_COLUMNS = ["input", "name", "geo_type", "state_fips", "code", "geoid", "confidence", "ambiguous", "alternatives"]
+
+
+@lru_cache(maxsize=1)
+def _get_state_lookups() -> Tuple[Dict[str, str], Dict[str, str]]:
+    """Internal function returning lowercased state name -> FIPS and postal code -> FIPS, built on first use."""
+    state_fips = _get_state_fips_data()
+    state_names = {name.lower(): fips for name, fips in state_fips.items()}
+    postal_codes = {code.lower(): state_fips[name] for code, name in _get_state_abbreviation_data().items()}
+    return state_names, postal_codes
+
+
+def _split_state(text: str) -> Tuple[str, Optional[str]]:
+    """Split a trailing state name or postal code off a name ("Springfield, IL" -> ("Springfield", "17"))."""
+    state_names, postal_codes = _get_state_lookups()
+
+    if "," in text:
+        head, tail = text.rsplit(",", 1)
+        tail = tail.strip().lower()
+        if tail in state_names:
+            return head.strip(), state_names[tail]
+        if tail in postal_codes:
+            return head.strip(), postal_codes[tail]
+
+    words = text.split()
+    for size in (3, 2, 1):
+        if len(words) > size:
+            tail = " ".join(words[-size:]).lower().strip(".")
+            if tail in state_names:
+                return " ".join(words[:-size]), state_names[tail]
+            if size == 1 and tail in postal_codes and words[-1].isupper():
+                return " ".join(words[:-size]), postal_codes[tail]
+    return text, None
+
+
+def _resolve_one(text: str, geo_type: str, state_hint: Optional[str]) -> List[Any]:
+    """Resolve a single name to one row of RESOLVE_COLUMNS."""
+    name_part, state_fips = _split_state(text)
+    state_fips = state_fips or state_hint
+
+    if geo_type == "auto":
+        geo_type = "county" if any(word in ("county", "parish", "borough") for word in tokenize(name_part)) else "place"
+
+    index = _get_county_index() if geo_type == "county" else _get_place_index()
+    gazetteer = _get_county_gazetteer() if geo_type == "county" else _get_place_gazetteer()
+    population = get_population_by_geoid(geo_type) or {}
+
+    # The state was split off above, so postal codes are not expanded again here
+    required, optional = normalize_query(name_part, expand_postal_codes=False)
+    terms = required + optional
+    if not terms:
+        return [text, None, geo_type, None, None, None, 0.0, False, []]
+
+    similar = {term: dict(index.similar_terms(term)) for term in terms}
+    recognized = [term for term in terms if similar[term]]
+    term_coverage = len(recognized) / len(terms)
+    query_core = [term for term in recognized if term not in PLACE_TYPE_WORDS]
+
+    candidates = []
+    for entry_id, distance in index.fuzzy_matches(recognized, None):
+        row_id = gazetteer.row_by_full_name.get(index.names[entry_id])
+        if row_id is None:
+            continue
+        record = gazetteer.record(row_id, population)
+        if state_fips and record["state_fips"] != state_fips:
+            continue
+
+        # Compare against the name itself, not the state or county words, so "new york city"
+        # does not match every city in New York State
+        name_core = {word for word in normalize_words(tokenize(gazetteer.names[row_id])) if word not in PLACE_TYPE_WORDS}
+        matched_terms = [term for term in query_core if name_core.intersection(similar[term])]
+        matched_words = {word for word in name_core if any(word in similar[term] for term in query_core)}
+        query_share = len(matched_terms) / len(query_core) if query_core else 1.0
+        name_share = len(matched_words) / len(name_core) if name_core else 1.0
+        confidence = term_coverage * query_share * name_share * max(0.0, 1.0 - 0.15 * distance)
+        if confidence <= 0:
+            continue
+        candidates.append((round(confidence, 2), record["population"] or 0, record))
+
+    if not candidates:
+        return [text, None, geo_type, state_fips, None, None, 0.0, False, []]
+
+    # Highest confidence first, larger population breaks ties
+    candidates.sort(key=lambda candidate: (-candidate[0], -candidate[1]))
+    best_confidence, _, best = candidates[0]
+    close = [record for confidence, _, record in candidates[1:] if confidence >= best_confidence - _AMBIGUITY_MARGIN]
+    code = best["place_fips"] if geo_type == "place" else best["county_fips"]
+    return [
+        text,
+        best["name"],
+        geo_type,
+        best["state_fips"],
+        code,
+        best["geoid"],
+        best_confidence,
+        bool(close),
+        [record["name"] for record in close[:3]],
+    ]
+
+
+def resolve_geographies(
+    names: List[str],
+    geo_type: Optional[str] = "auto",
+    state_fips: Optional[str] = None
+) -> Dict[str, Any]:
+    """
+    Resolves a list of free-text place or county names to FIPS codes in one call.
+
+    Names may carry a trailing state name or postal code ("Springfield, IL", "Waupaca
+    Wisconsin") and may be misspelled. Each name is matched against the in-memory place
+    or county index and gets a confidence score between 0 and 1 and an ambiguity flag
+    when other candidates score almost as well.
+
+    Args:
+        names (List[str]): Up to 1000 free-text names (e.g., ["Milwaukee, WI", "Cook County, IL"])
+        geo_type (Optional[str]): "place", "county", or "auto" to pick per name (names containing
+                                  "county" or "parish" resolve as counties). Defaults to "auto".
+        state_fips (Optional[str]): Restrict matches to one state when names carry no state.
+
+    Returns:
+        Dict[str, Any]: Response containing:
+            - status: "success" or "error"
+            - columns: Column names for each row
+            - rows: One row per input name, in input order
+            - resolved_count / unresolved_count / ambiguous_count: Summary counts
+            - error_message: Error details (if unsuccessful)
+    """
+    try:
+        def _error_response(message: str) -> Dict[str, str]:
+            return {"status": "error", "error_message": message}
+
+        if not isinstance(names, list) or not names:
+            return _error_response("names must be a non-empty list of strings.")
+        if len(names) > 1000:
+            return _error_response("names can contain at most 1000 entries.")
+
+        geo_type = (geo_type or "auto").lower()
+        if geo_type not in ["place", "county", "auto"]:
+            return _error_response("geo_type must be one of: 'place', 'county', 'auto'.")
+
+        if state_fips is not None and (not isinstance(state_fips, str) or not state_fips.isdigit()):
+            return _error_response("state_fips must be a string of digits or None.")
+
+        rows = [_resolve_one(str(name).strip(), geo_type, state_fips) for name in names]
+        ambiguous_index = RESOLVE_COLUMNS.index("ambiguous")
+        geoid_index = RESOLVE_COLUMNS.index("geoid")
+
+        resolved = sum(1 for row in rows if row[geoid_index])
+        return {
+            "status": "success",
+            "columns": RESOLVE_COLUMNS,
+            "rows": rows,
+            "resolved_count": resolved,
+            "unresolved_count": len(rows) - resolved,
+            "ambiguous_count": sum(1 for row in rows if row[ambiguous_index]),
+        }
+
+    except Exception as e:
+        return {"status": "error", "error_message": f"Unexpected error: {str(e)}"}
+
+
+if __name__ == "__main__":
+    print(resolve_geographies(["Milwakee, WI", "Waupaca", "Springfield", "Cook County, IL", "St. Louis, MO"]))
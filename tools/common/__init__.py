@@ -0,0 +1,60 @@
+"""
+Shared helpers used across the data tool packages
+
+This package holds infrastructure that more than one data source needs, such as
+in-memory caching. The individual tool modules stay responsible for talking to
+their upstream APIs and shaping results.
+
+Modules:
+- cache: Thread-safe in-memory TTL cache
+- lookup_index: Typo-tolerant token index behind the search_* lookup tools
+- name_normalization: Abbreviation, nickname and postal code normalization for geography searches
+- autocomplete: Sorted-array prefix completion over place, county, MSA, SOC and NAICS names
+- code_index: Reverse code -> name lookups and hierarchy expansion and rollup for NAICS, SOC, area, CIP and award level codes
+- crosswalk: Translation between state, county, place, CBSA, ZIP, QCEW area and OEWS area codes
+- upstream: Per-host retry, jittered backoff, hedged GETs and circuit breakers for upstream HTTP requests
+- bls_api: Concurrent, quota-aware and cached requests to the BLS Public Data API
+- regional_metrics: Vectorized location quotient, Hachman, HHI and shift-share calculations on (area, code) matrices
+- lookup_tables: Build and load versioned lookup-table artifacts from Census and BLS source files
+"""
+
+from .cache import TTLCache
+from .lookup_index import LookupIndex
+from .name_normalization import WORD_ALIASES, normalize_words, normalize_query
+from .autocomplete import PrefixIndex, autocomplete_names
+from .code_index import CodeIndex, get_code_index, describe_codes, expand_codes, rollup_codes
+from .crosswalk import translate_code, translate_geographies
+from .upstream import upstream_get, upstream_post, configure_upstream, UpstreamUnavailableError
+from .bls_api import fetch_bls_series, BLSQuotaExceededError
+from .regional_metrics import location_quotients, herfindahl_index, hachman_index, shift_share
+from .lookup_tables import LookupTable, load_lookup_table, build_lookup_tables
+
+__all__ = [
+    'TTLCache',
+    'LookupIndex',
+    'WORD_ALIASES',
+    'normalize_words',
+    'normalize_query',
+    'PrefixIndex',
+    'autocomplete_names',
+    'CodeIndex',
+    'get_code_index',
+    'describe_codes',
+    'expand_codes',
+    'rollup_codes',
+    'translate_code',
+    'translate_geographies',
+    'upstream_get',
+    'upstream_post',
+    'configure_upstream',
+    'UpstreamUnavailableError',
+    'fetch_bls_series',
+    'BLSQuotaExceededError',
+    'location_quotients',
+    'herfindahl_index',
+    'hachman_index',
+    'shift_share',
+    'LookupTable',
+    'load_lookup_table',
+    'build_lookup_tables'
+]
@@ -0,0 +1,211 @@
+import heapq
+import math
+from array import array
+from bisect import bisect_left
+from functools import lru_cache
+from typing import Callable, Dict, List, Optional, Any, Iterable, Tuple
+
+from tools.common.lookup_index import tokenize
+from tools.common.name_normalization import WORD_ALIASES
+
+"""
+Prefix Autocomplete
+
+This module answers typeahead queries ("Sprin", "new yo", "registered nur") over place,
+county, MSA, SOC occupation and NAICS industry names. Every name is stored once per word
+it contains as a normalized key ("springfield city illinois", "city illinois", ...) in
+one sorted list, so the completions for a prefix are a contiguous slice found with two
+binary searches instead of a scan over every name on each keystroke.
+"""
+
+AUTOCOMPLETE_TYPES = ["place", "county", "msa", "soc", "naics"]
+
+# Keys past a qualifier (", Illinois") would make a state name complete to every place in it
+_QUALIFIER_SEPARATOR = ", "
+
+# Sorts after any normalized key that starts with the prefix
+_KEY_END = "\uffff"
+
+
+class PrefixIndex:
+    """
+    Sorted-array prefix index over (name, code) entries.
+
+    Args:
+        entries: (name, code) pairs
+        qualifier_separator: When set, words after the last occurrence of this separator
+                             (the state in "Albany city, New York") do not start a key
+        word_aliases: Optional word -> canonical word mapping (e.g., "st" -> "saint") applied
+                      to names and to the completed words of each prefix
+    """
+
+    def __init__(
+        self,
+        entries: Iterable[Tuple[str, str]],
+        qualifier_separator: Optional[str] = None,
+        word_aliases: Optional[Dict[str, str]] = None
+    ):
+        self.word_aliases: Dict[str, str] = word_aliases or {}
+        self.names: List[str] = []
+        self.codes: List[str] = []
+        keyed = []
+        for entry_id, (name, code) in enumerate(entries):
+            self.names.append(name)
+            self.codes.append(code)
+            words = [self.word_aliases.get(word, word) for word in tokenize(name)]
+            starts = len(words)
+            if qualifier_separator and qualifier_separator in name:
+                starts = max(1, len(tokenize(name.rsplit(qualifier_separator, 1)[0])))
+            for position in range(min(starts, len(words))):
+                keyed.append((" ".join(words[position:]), entry_id, position))
+
+        keyed.sort()
+        self.keys: List[str] = [key for key, _, _ in keyed]
+        self.key_entries = array("I", (entry_id for _, entry_id, _ in keyed))
+        self.key_positions = array("H", (min(position, 65535) for _, _, position in keyed))
+
+    def __len__(self) -> int:
+        return len(self.names)
+
+    def matches(self, prefix: str) -> Dict[int, int]:
+        """
+        Entries with a word sequence starting with prefix, mapped to the earliest word
+        position where it matches (0 when the name itself starts with the prefix).
+        """
+        words = tokenize(prefix)
+        if not words:
+            return {}
+        # A trailing space means the last word is complete ("new " should not match "newark");
+        # only complete words are canonicalized, so "st" can still grow into "stanford"
+        complete = prefix[-1:].isspace() or not prefix[-1:].isalnum()
+        completed_words = words if complete else words[:-1]
+        words = [self.word_aliases.get(word, word) for word in completed_words] + words[len(completed_words):]
+        key = " ".join(words)
+        if complete:
+            key += " "
+
+        low = bisect_left(self.keys, key)
+        high = bisect_left(self.keys, key + _KEY_END, low)
+        positions: Dict[int, int] = {}
+        for slot in range(low, high):
+            entry_id = self.key_entries[slot]
+            position = self.key_positions[slot]
+            if position < positions.get(entry_id, 65536):
+                positions[entry_id] = position
+        return positions
+
+    def complete(
+        self,
+        prefix: str,
+        max_results: int = 10,
+        prior: Optional[Callable[[int], float]] = None
+    ) -> List[Tuple[str, str]]:
+        """
+        Top completions for prefix: names starting with it first, then names with a later
+        word starting with it; within each group larger prior (e.g., population) and then
+        shorter names come first.
+        """
+        positions = self.matches(prefix)
+        ranked = heapq.nlargest(max_results, positions, key=lambda entry_id: self._rank_key(entry_id, positions[entry_id], prior))
+        return [(self.names[entry_id], self.codes[entry_id]) for entry_id in ranked]
+
+    def _rank_key(self, entry_id: int, position: int, prior: Optional[Callable[[int], float]]) -> Tuple[int, float, int, int]:
+        weight = math.log10(1 + max(0.0, prior(entry_id) or 0.0)) if prior is not None else 0.0
+        return (position == 0, weight, -len(self.names[entry_id]), -entry_id)
+
+
+def _source(name_type: str) -> Tuple[Any, Optional[Callable[[], Optional[Callable[[int], float]]]]]:
+    """Lookup index and population-prior factory behind one autocomplete type."""
+    # Imported here so tools.common does not depend on the data packages at import time
+    if name_type == "place":
+        from tools.acs_data.fips_census_place import _get_place_index, _get_place_population_prior
+        return _get_place_index(), _get_place_population_prior
+    if name_type == "county":
+        from tools.acs_data.fips_census_county import _get_county_index, _get_county_population_prior
+        return _get_county_index(), _get_county_population_prior
+    if name_type == "msa":
+        from tools.acs_data.fips_census_msa import _get_msa_index, _get_msa_population_prior
+        return _get_msa_index(), _get_msa_population_prior
+    if name_type == "soc":
+        from tools.oews_data.oews_soc import _get_soc_index
+        return _get_soc_index(), None
+    if name_type == "naics":
+        from tools.qcew_data.qcew_naics import _get_qcew_naics_index
+        return _get_qcew_naics_index(), None
+    raise ValueError(f"Unknown autocomplete type '{name_type}'. Must be one of: {', '.join(AUTOCOMPLETE_TYPES)}.")
+
+
+@lru_cache(maxsize=None)
+def get_prefix_index(name_type: str) -> PrefixIndex:
+    """
+    Return the prefix index for one name type, building it on first use.
+
+    Args:
+        name_type: One of AUTOCOMPLETE_TYPES
+
+    Raises:
+        ValueError: If name_type is not a known type
+    """
+    index, _ = _source(name_type)
+    if name_type in ("place", "county", "msa"):
+        return PrefixIndex(zip(index.names, index.codes), qualifier_separator=_QUALIFIER_SEPARATOR, word_aliases=WORD_ALIASES)
+    return PrefixIndex(zip(index.names, index.codes))
+
+
+def autocomplete_names(
+    prefix: str,
+    types: Optional[List[str]] = None,
+    max_results: Optional[int] = 10
+) -> Dict[str, Any]:
+    """
+    Complete a partial place, county, MSA, occupation or industry name.
+
+    Names whose first word starts with the prefix come first, followed by names with a
+    later word starting with it ("sprin" -> "Colorado Springs city, Colorado"). Places,
+    counties and MSAs with larger populations rank higher once a population index has
+    been built.
+
+    Args:
+        prefix (str): Partial input as typed (e.g., "Sprin", "new yo", "registered nur")
+        types (Optional[List[str]]): Name types to complete from: "place", "county", "msa",
+                                     "soc", "naics". Defaults to all of them.
+        max_results (Optional[int]): Maximum number of completions per type (default: 10, max: 50)
+
+    Returns:
+        Dict[str, Any]: Response containing:
+            - status: "success" or "error"
+            - prefix: The prefix searched
+            - completions: Dict of type -> list of {"name", "code"} in rank order
+            - error_message: Error details (if unsuccessful)
+    """
+    try:
+        if not isinstance(prefix, str) or not tokenize(prefix):
+            return {"status": "error", "error_message": "prefix must be a non-empty string containing letters or digits."}
+
+        types = types or AUTOCOMPLETE_TYPES
+        if not isinstance(types, list) or any(not isinstance(name_type, str) or name_type.lower() not in AUTOCOMPLETE_TYPES for name_type in types):
+            return {"status": "error", "error_message": f"types must be a list containing any of: {', '.join(AUTOCOMPLETE_TYPES)}."}
+
+        if max_results is None:
+            max_results = 10
+        if not isinstance(max_results, int) or not 1 <= max_results <= 50:
+            return {"status": "error", "error_message": "max_results must be an integer between 1 and 50."}
+
+        completions = {}
+        for name_type in dict.fromkeys(name_type.lower() for name_type in types):
+            _, prior_factory = _source(name_type)
+            prior = prior_factory() if prior_factory is not None else None
+            completions[name_type] = [
+                {"name": name, "code": code}
+                for name, code in get_prefix_index(name_type).complete(prefix, max_results, prior)
+            ]
+
+        return {"status": "success", "prefix": prefix, "completions": completions}
+
+    except Exception as e:
+        return {"status": "error", "error_message": f"Unexpected error: {str(e)}"}
+
+
+if __name__ == "__main__":
+    print(autocomplete_names("Sprin", ["place", "county"], 5))
+    print(autocomplete_names("registered nur", ["soc"]))
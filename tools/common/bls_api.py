@@ -0,0 +1,420 @@
+import json
+import logging
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, date
+from typing import Dict, List, Optional, Any, Iterable, Tuple
+
+from tools.common.cache import TTLCache
+from tools.common.upstream import upstream_post
+
+"""
+BLS API Client
+
+This module sends series requests to the BLS Public Data API v2 for the QCEW and OEWS
+tools. The API accepts at most 50 series per request, so larger requests are split into
+batches that are posted concurrently under a configurable parallelism cap. Results come
+back in batch order regardless of which request finishes first, and the timing of each
+batch is kept for the /health endpoint.
+
+Every registration key has a daily query limit, so each dispatch is checked against a
+per-key, per-day budget before anything is sent. Series already fetched are served from
+an in-memory cache first and never count against the budget; work that does not fit the
+remaining budget is rejected with BLSQuotaExceededError instead of failing halfway.
+Transient failures are retried under the shared upstream policy (tools.common.upstream),
+each retry charged to the key it used; batches that still fail are reported with the
+result rather than dropped silently.
+
+National baseline series (the U.S. totals every location quotient divides by) are kept
+in a separate cache whose TTL follows the release cadence of the program (quarterly for
+QCEW, annual for OEWS), so repeated LQ requests only fetch the local series. A cached
+baseline is reused as is only for a closed period (an explicit end year at least two years
+back); for the latest data it is refetched when the local series have a newer period, so
+LQs never divide a new quarter by the previous one.
+"""
+
+logger = logging.getLogger(__name__)
+
+BLS_API_URL = "https://api.bls.gov/publicAPI/v2/timeseries/data/"
+
+# Series per request allowed by the v2 API for registered users
+BATCH_SIZE = 50
+
+_SETTINGS: Dict[str, Any] = {
+    "max_parallel_batches": 4,
+    "timeout_seconds": 60,
+}
+
+# Most recent dispatches, newest last
+_RECENT_DISPATCHES: "deque[Dict[str, Any]]" = deque(maxlen=20)
+_DISPATCH_LOCK = threading.Lock()
+
+# Fetched series keyed by (series ID, request parameters)
+_SERIES_CACHE = TTLCache(ttl_seconds=6 * 60 * 60, max_entries=20000)
+
+# National baseline series, kept apart so local series cannot evict them
+_BASELINE_CACHE = TTLCache(ttl_seconds=7 * 24 * 60 * 60, max_entries=5000)
+
+# How long a baseline series is reused, by how often the program publishes new data
+_BASELINE_TTL_SECONDS: Dict[str, float] = {
+    "quarterly": 7 * 24 * 60 * 60,
+    "annual": 30 * 24 * 60 * 60,
+}
+
+
+class BLSQuotaExceededError(RuntimeError):
+    """Raised when a request needs more BLS queries or series than today's remaining budget."""
+
+
+class BLSSeriesBatches(list):
+    """
+    Result of fetch_bls_series: a list of series lists, plus the series IDs of batches that
+    failed after retries (failed_series_ids) and their error messages (errors).
+    """
+
+    def __init__(self, batches: Iterable[List[Dict[str, Any]]] = (), failed_series_ids: Optional[List[str]] = None, errors: Optional[List[str]] = None):
+        super().__init__(batches)
+        self.failed_series_ids = failed_series_ids or []
+        self.errors = errors or []
+
+    def partial_results(self) -> Optional[Dict[str, Any]]:
+        """Partial-result metadata for a tool response, or None when every batch succeeded."""
+        if not self.failed_series_ids:
+            return None
+        return {
+            "failed_series_count": len(self.failed_series_ids),
+            "failed_series_ids": self.failed_series_ids[:50],
+            "errors": list(dict.fromkeys(self.errors)),
+        }
+
+
+def _bls_day() -> date:
+    """Current day in U.S. Eastern time, when the BLS daily limits reset."""
+    try:
+        from zoneinfo import ZoneInfo
+        return datetime.now(ZoneInfo("America/New_York")).date()
+    except Exception:
+        return datetime.utcnow().date()
+
+
+class QuotaManager:
+    """
+    Per-key daily request and series budget for the BLS API.
+
+    Batches are spread across keys, each going to the key with the most requests left.
+    A dispatch is reserved all at once, so it either fits the remaining budget or is
+    rejected before any request is sent.
+
+    Args:
+        registration_keys: BLS API registration keys
+        daily_request_limit: Queries allowed per key per day
+        daily_series_limit: Series allowed per key per day
+    """
+
+    def __init__(self, registration_keys: List[str], daily_request_limit: int, daily_series_limit: int):
+        self.registration_keys = list(dict.fromkeys(key for key in registration_keys if key))
+        self.daily_request_limit = daily_request_limit
+        self.daily_series_limit = daily_series_limit
+        self._day = _bls_day()
+        self._used: Dict[str, List[int]] = {key: [0, 0] for key in self.registration_keys}
+        self._lock = threading.Lock()
+
+    def _roll_over(self) -> None:
+        today = _bls_day()
+        if today != self._day:
+            self._day = today
+            self._used = {key: [0, 0] for key in self.registration_keys}
+
+    def reserve(self, batch_sizes: List[int]) -> List[str]:
+        """
+        Reserve one request per batch and return the key to use for each batch.
+
+        Raises:
+            BLSQuotaExceededError: If the batches do not fit today's remaining budget
+        """
+        if not self.registration_keys:
+            raise BLSQuotaExceededError("No BLS API registration key is configured (set BLS_API_KEYS).")
+
+        with self._lock:
+            self._roll_over()
+            planned = {key: list(used) for key, used in self._used.items()}
+            assigned = []
+            for size in batch_sizes:
+                available = [
+                    key for key, (requests_used, series_used) in planned.items()
+                    if requests_used < self.daily_request_limit and series_used + size <= self.daily_series_limit
+                ]
+                if not available:
+                    remaining_requests, remaining_series = self._remaining(self._used)
+                    raise BLSQuotaExceededError(
+                        f"BLS API daily budget exceeded: this request needs {len(batch_sizes)} queries "
+                        f"({sum(batch_sizes)} series) but only {remaining_requests} queries "
+                        f"({remaining_series} series) remain today across {len(self.registration_keys)} key(s). "
+                        f"Request fewer areas or codes, or try again after midnight U.S. Eastern time."
+                    )
+                key = max(available, key=lambda candidate: self.daily_request_limit - planned[candidate][0])
+                planned[key][0] += 1
+                planned[key][1] += size
+                assigned.append(key)
+            self._used = planned
+            return assigned
+
+    def charge(self, key: str, series_count: int) -> None:
+        """Record one more request against key (e.g., a retry), even past the limit."""
+        with self._lock:
+            self._roll_over()
+            used = self._used.setdefault(key, [0, 0])
+            used[0] += 1
+            used[1] += series_count
+
+    def _remaining(self, used: Dict[str, List[int]]) -> Tuple[int, int]:
+        return (
+            sum(max(0, self.daily_request_limit - requests_used) for requests_used, _ in used.values()),
+            sum(max(0, self.daily_series_limit - series_used) for _, series_used in used.values()),
+        )
+
+    def status(self) -> Dict[str, Any]:
+        """Budget used and remaining today, per key (keys shown by their last four characters)."""
+        with self._lock:
+            self._roll_over()
+            remaining_requests, remaining_series = self._remaining(self._used)
+            return {
+                "day": self._day.isoformat(),
+                "daily_request_limit": self.daily_request_limit,
+                "daily_series_limit": self.daily_series_limit,
+                "remaining_requests": remaining_requests,
+                "remaining_series": remaining_series,
+                "keys": [
+                    {
+                        "key": f"...{key[-4:]}",
+                        "requests_used": requests_used,
+                        "series_used": series_used,
+                        "requests_remaining": max(0, self.daily_request_limit - requests_used),
+                    }
+                    for key, (requests_used, series_used) in self._used.items()
+                ],
+            }
+
+
+_QUOTA = QuotaManager(["243f61eeaa6c450db0a2ecb8dc08c44f"], daily_request_limit=500, daily_series_limit=25000)
+
+
+def configure_bls_api(
+    max_parallel_batches: Optional[int] = None,
+    timeout_seconds: Optional[float] = None,
+    registration_keys: Optional[List[str]] = None,
+    daily_request_limit: Optional[int] = None,
+    daily_series_limit: Optional[int] = None,
+    series_cache_ttl_seconds: Optional[float] = None,
+    baseline_ttl_seconds: Optional[Dict[str, float]] = None
+) -> None:
+    """Set batch parallelism, request timeout, registration keys, daily budgets and cache TTLs."""
+    global _QUOTA
+    if max_parallel_batches is not None:
+        _SETTINGS["max_parallel_batches"] = max(1, int(max_parallel_batches))
+    if timeout_seconds is not None:
+        _SETTINGS["timeout_seconds"] = timeout_seconds
+    if registration_keys is not None or daily_request_limit is not None or daily_series_limit is not None:
+        _QUOTA = QuotaManager(
+            registration_keys if registration_keys is not None else _QUOTA.registration_keys,
+            daily_request_limit if daily_request_limit is not None else _QUOTA.daily_request_limit,
+            daily_series_limit if daily_series_limit is not None else _QUOTA.daily_series_limit
+        )
+    if series_cache_ttl_seconds is not None:
+        _SERIES_CACHE.ttl_seconds = series_cache_ttl_seconds
+    if baseline_ttl_seconds:
+        _BASELINE_TTL_SECONDS.update(baseline_ttl_seconds)
+
+
+def _post_batch(batch_number: int, batch: List[str], params: Dict[str, Any], registration_key: str) -> Dict[str, Any]:
+    """Post one batch of series IDs and return its series with timing and status."""
+    started = time.perf_counter()
+    payload = dict(params, seriesid=batch, registrationkey=registration_key)
+    timing = {"batch": batch_number, "series_count": len(batch), "key": f"...{registration_key[-4:]}"}
+    try:
+        response = upstream_post(
+            BLS_API_URL,
+            data=json.dumps(payload),
+            headers={"Content-Type": "application/json"},
+            timeout=_SETTINGS["timeout_seconds"],
+            # Every attempt is a query against the key's daily limit
+            on_retry=lambda: _QUOTA.charge(registration_key, len(batch))
+        )
+        response.raise_for_status()
+        json_response = response.json()
+
+        if json_response.get("status") != "REQUEST_SUCCEEDED":
+            messages = json_response.get("message") or []
+            timing.update(status="error", error=f"{json_response.get('status')}: {'; '.join(messages)}")
+            return {"series": [], "timing": timing}
+
+        timing["status"] = "ok"
+        return {"series": json_response.get("Results", {}).get("series", []), "timing": timing}
+
+    except Exception as e:
+        logger.warning(f"BLS batch {batch_number} failed: {e}")
+        timing.update(status="error", error=str(e))
+        return {"series": [], "timing": timing}
+
+    finally:
+        timing["seconds"] = round(time.perf_counter() - started, 3)
+
+
+def _period_is_closed(params: Dict[str, Any]) -> bool:
+    """True when the request ends at a year no release can still add data to."""
+    try:
+        return int(params["endyear"]) <= datetime.now().year - 2
+    except (KeyError, TypeError, ValueError):
+        return False
+
+
+def _latest_period(series: Dict[str, Any]) -> Optional[Tuple[str, str]]:
+    """(year, period) of the newest observation in a series, or None for an empty series."""
+    periods = [(str(row.get("year")), str(row.get("period"))) for row in series.get("data") or []]
+    return max(periods) if periods else None
+
+
+def _dispatch(missing: List[str], params: Dict[str, Any], cached_count: int) -> Tuple[List[List[str]], List[Dict[str, Any]]]:
+    """
+    Post series in batches of 50, up to max_parallel_batches batches at once.
+
+    Returns:
+        The batches and their results, in the same order
+
+    Raises:
+        BLSQuotaExceededError: If the batches do not fit today's remaining budget
+    """
+    batches = [missing[i:i + BATCH_SIZE] for i in range(0, len(missing), BATCH_SIZE)]
+    keys = _QUOTA.reserve([len(batch) for batch in batches])
+
+    started = time.perf_counter()
+    workers = min(_SETTINGS["max_parallel_batches"], len(batches))
+    if workers == 1:
+        results = [_post_batch(number, batch, params, keys[number]) for number, batch in enumerate(batches)]
+    else:
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            # map returns results in submission order, so the merge is deterministic
+            results = list(executor.map(
+                lambda numbered: _post_batch(numbered[0], numbered[1], params, keys[numbered[0]]),
+                enumerate(batches)
+            ))
+
+    dispatch = {
+        "started_at": datetime.now().isoformat(),
+        "series_count": len(missing) + cached_count,
+        "cached_series_count": cached_count,
+        "batch_count": len(batches),
+        "parallelism": workers,
+        "seconds": round(time.perf_counter() - started, 3),
+        "batches": [result["timing"] for result in results],
+    }
+    with _DISPATCH_LOCK:
+        _RECENT_DISPATCHES.append(dispatch)
+    logger.info(f"BLS dispatch: {len(missing)} series in {len(batches)} batches ({workers} parallel), {cached_count} cached, took {dispatch['seconds']}s")
+    return batches, results
+
+
+def fetch_bls_series(
+    series_ids: List[str],
+    params: Dict[str, Any],
+    baseline_ids: Iterable[str] = (),
+    release_cadence: str = "quarterly"
+) -> BLSSeriesBatches:
+    """
+    Fetch BLS series, serving cached series first and posting the rest in batches of 50,
+    up to max_parallel_batches batches at once.
+
+    Args:
+        series_ids: Series IDs to fetch
+        params: Request parameters other than the series and key (e.g., {"latest": "true"}
+                or {"startyear": "2023", "endyear": "2023"})
+        baseline_ids: Series among series_ids that are national baselines, cached for the
+                      baseline TTL of release_cadence. Unless the period is closed, a cached
+                      baseline older than the newest local series is fetched again.
+        release_cadence: "quarterly" (QCEW) or "annual" (OEWS)
+
+    Returns:
+        A BLSSeriesBatches list: cached series followed by one list of series per fetched
+        batch, in the order of series_ids. Batches that failed after retries contribute an
+        empty list and their series IDs are listed in failed_series_ids.
+
+    Raises:
+        BLSQuotaExceededError: If the uncached series do not fit today's remaining budget
+    """
+    params_key = tuple(sorted(params.items()))
+    baseline_ids = set(baseline_ids)
+    closed = _period_is_closed(params)
+    cached, provisional, missing = [], [], []
+    for series_id in dict.fromkeys(series_ids):
+        if series_id in baseline_ids:
+            series = _BASELINE_CACHE.get((series_id, params_key))
+            if series is not None:
+                # Open periods are checked against the local series before being reused
+                (cached if closed else provisional).append(series)
+                continue
+        else:
+            series = _SERIES_CACHE.get((series_id, params_key))
+            if series is not None:
+                cached.append(series)
+                continue
+        missing.append(series_id)
+
+    batches, results = _dispatch(missing, params, len(cached) + len(provisional)) if missing else ([], [])
+    fetched = [series for result in results for series in result["series"]]
+
+    # Refetch cached baselines that predate the newest period of the local series
+    local_periods = [
+        _latest_period(series) for series in cached + fetched
+        if series.get("seriesID") not in baseline_ids
+    ]
+    local_latest = max((period for period in local_periods if period), default=None)
+    stale = [
+        series for series in provisional
+        if local_latest is not None and (_latest_period(series) or ("", "")) < local_latest
+    ]
+    cached.extend(series for series in provisional if not any(series is old for old in stale))
+    if stale:
+        try:
+            refetched_batches, refetched = _dispatch([series["seriesID"] for series in stale], params, len(cached))
+            for batch, result in zip(refetched_batches, refetched):
+                if result["timing"]["status"] == "ok":
+                    batches.append(batch)
+                    results.append(result)
+                    fetched += result["series"]
+            refetched_ids = {series.get("seriesID") for series in fetched}
+            cached.extend(series for series in stale if series["seriesID"] not in refetched_ids)
+        except BLSQuotaExceededError as e:
+            logger.warning(f"Serving {len(stale)} cached baseline series older than the local series: {e}")
+            cached.extend(stale)
+
+    baseline_ttl = _BASELINE_TTL_SECONDS.get(release_cadence, _BASELINE_CACHE.ttl_seconds)
+    for series in fetched:
+        series_id = series.get("seriesID")
+        if series_id in baseline_ids:
+            _BASELINE_CACHE.set((series_id, params_key), series, ttl_seconds=baseline_ttl)
+        else:
+            _SERIES_CACHE.set((series_id, params_key), series)
+
+    failed_series_ids, errors = [], []
+    for batch, result in zip(batches, results):
+        if result["timing"]["status"] != "ok":
+            failed_series_ids.extend(batch)
+            errors.append(result["timing"]["error"])
+    return BLSSeriesBatches([cached] + [result["series"] for result in results], failed_series_ids, errors)
+
+
+def bls_api_status() -> Dict[str, Any]:
+    """Settings, remaining daily budget and per-batch timings of the most recent BLS dispatches."""
+    with _DISPATCH_LOCK:
+        recent = list(_RECENT_DISPATCHES)
+    return {
+        "max_parallel_batches": _SETTINGS["max_parallel_batches"],
+        "timeout_seconds": _SETTINGS["timeout_seconds"],
+        "cached_series": len(_SERIES_CACHE),
+        "cached_baseline_series": len(_BASELINE_CACHE),
+        "baseline_ttl_seconds": dict(_BASELINE_TTL_SECONDS),
+        "quota": _QUOTA.status(),
+        "recent_dispatches": recent,
+    }
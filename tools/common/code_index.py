@@ -0,0 +1,474 @@
+import re
+from array import array
+from functools import lru_cache
+from typing import Dict, List, Optional, Any, Callable, Iterable, Tuple
+
+"""
+Code Index
+
+This module provides reverse (code -> name) lookups for the classification and area
+code systems used by the BLS and IPEDS tools: NAICS industries, SOC occupations, QCEW
+and OEWS area codes, CIP programs and IPEDS award levels. Each index is a plain dict
+built on first use, so labelling a result costs one hash lookup, and it also records
+each code's parent in its hierarchy (county -> state -> U.S., detailed occupation ->
+major group, and so on). Child lists, depths and a pre-order numbering are derived from
+the parents on first use, so expanding a code to its descendants at one level is a
+slice of one array, and fetched detail can be rolled up to parent codes locally.
+
+Some codes are groupings outside the hierarchy levels rather than nodes of it, such as the
+QCEW domains and supersectors (1013 Manufacturing = NAICS 31-33). They keep their names and
+parents for labelling, but expand to the codes they group and are never a rollup target.
+"""
+
+CODE_SYSTEMS = ["naics", "soc", "qcew_area", "oews_area", "cip", "award_level"]
+
+# SOC 2018 major groups; the OEWS code table only carries detailed occupations
+_SOC_MAJOR_GROUPS = {
+    "110000": "Management Occupations",
+    "130000": "Business and Financial Operations Occupations",
+    "150000": "Computer and Mathematical Occupations",
+    "170000": "Architecture and Engineering Occupations",
+    "190000": "Life, Physical, and Social Science Occupations",
+    "210000": "Community and Social Service Occupations",
+    "230000": "Legal Occupations",
+    "250000": "Educational Instruction and Library Occupations",
+    "270000": "Arts, Design, Entertainment, Sports, and Media Occupations",
+    "290000": "Healthcare Practitioners and Technical Occupations",
+    "310000": "Healthcare Support Occupations",
+    "330000": "Protective Service Occupations",
+    "350000": "Food Preparation and Serving Related Occupations",
+    "370000": "Building and Grounds Cleaning and Maintenance Occupations",
+    "390000": "Personal Care and Service Occupations",
+    "410000": "Sales and Related Occupations",
+    "430000": "Office and Administrative Support Occupations",
+    "450000": "Farming, Fishing, and Forestry Occupations",
+    "470000": "Construction and Extraction Occupations",
+    "490000": "Installation, Maintenance, and Repair Occupations",
+    "510000": "Production Occupations",
+    "530000": "Transportation and Material Moving Occupations",
+    "550000": "Military Specific Occupations",
+}
+
+# QCEW domains and supersectors -> the codes they group (BLS QCEW industry aggregation)
+_QCEW_AGGREGATES = {
+    "101": ["1011", "1012", "1013"],
+    "102": ["1021", "1022", "1023", "1024", "1025", "1026", "1027", "1028", "1029"],
+    "1011": ["11", "21"],
+    "1012": ["23"],
+    "1013": ["31-33"],
+    "1021": ["42", "44-45", "48-49", "22"],
+    "1022": ["51"],
+    "1023": ["52", "53"],
+    "1024": ["54", "55", "56"],
+    "1025": ["61", "62"],
+    "1026": ["71", "72"],
+    "1027": ["81"],
+    "1028": ["92"],
+    "1029": ["99"],
+}
+
+# "NAICS 111 Crop production", "NAICS12 21111 Oil and gas extraction", "10 Total, all industries"
+_NAICS_LABEL_PREFIX = re.compile(r'^(?:NAICS\d*\s+)?[\d-]+\s+')
+
+
+class CodeIndex:
+    """
+    Reverse index from codes to names and hierarchy parents for one code system.
+
+    Args:
+        system: Name of the code system (e.g., "naics")
+        entries: (code, name) pairs
+        parent_of: Function returning a code's parent code (or None) given the code
+                   and the code -> name mapping being built
+        groups: Codes that group other codes without being a level of the hierarchy
+                (grouping code -> grouped codes, which may themselves be groups)
+    """
+
+    def __init__(
+        self,
+        system: str,
+        entries: Iterable[Tuple[str, str]],
+        parent_of: Callable[[str, Dict[str, str]], Optional[str]],
+        groups: Optional[Dict[str, List[str]]] = None
+    ):
+        self.system = system
+        self.names: Dict[str, str] = dict(entries)
+        self.parents: Dict[str, Optional[str]] = {code: parent_of(code, self.names) for code in self.names}
+        self.groups: Dict[str, List[str]] = {code: members for code, members in (groups or {}).items() if code in self.names}
+        self._parent_of = parent_of
+        self._tree: Optional[Dict[str, Any]] = None
+
+    def __len__(self) -> int:
+        return len(self.names)
+
+    def __contains__(self, code: Any) -> bool:
+        return str(code) in self.names
+
+    def name(self, code: Any, default: Optional[str] = None) -> Optional[str]:
+        """Name for code, or default when the code is unknown."""
+        return self.names.get(str(code), default)
+
+    def parent(self, code: Any) -> Optional[str]:
+        """
+        Parent code one level up the hierarchy, or None at the top.
+
+        Codes missing from the table (e.g., a detailed CIP program) still get their
+        parent when the parent itself is a known code.
+        """
+        code = str(code)
+        if code in self.parents:
+            return self.parents[code]
+        parent = self._parent_of(code, self.names)
+        return parent if parent in self.names else None
+
+    def lineage(self, code: Any) -> List[str]:
+        """Codes from code up to the top of its hierarchy, code first."""
+        lineage = []
+        current = str(code)
+        while current is not None and current in self.names and current not in lineage:
+            lineage.append(current)
+            current = self.parents.get(current)
+        return lineage
+
+    def _hierarchy(self) -> Dict[str, Any]:
+        """
+        Parent, depth and pre-order arrays over all codes, built on first use.
+
+        Codes are numbered in pre-order (every code before its descendants), so the
+        descendants of a code are the contiguous slice order[position + 1:subtree_end].
+        Grouping codes are left out.
+        """
+        if self._tree is not None:
+            return self._tree
+        codes = [code for code in self.names if code not in self.groups]
+        ids = {code: code_id for code_id, code in enumerate(codes)}
+        parent_ids = array("i", (ids.get(self.parents[code], -1) for code in codes))
+        children: List[List[int]] = [[] for _ in codes]
+        roots = []
+        for code_id, parent_id in enumerate(parent_ids):
+            (children[parent_id] if parent_id >= 0 else roots).append(code_id)
+
+        depths = array("B", [0]) * len(codes)
+        order = array("i")
+        subtree_end = array("i", [0]) * len(codes)
+        positions = array("i", [0]) * len(codes)
+        # Iterative DFS; (code_id, False) enters a code and (code_id, True) closes its subtree
+        stack = [(code_id, False) for code_id in reversed(roots)]
+        while stack:
+            code_id, closing = stack.pop()
+            if closing:
+                subtree_end[code_id] = len(order)
+                continue
+            positions[code_id] = len(order)
+            order.append(code_id)
+            stack.append((code_id, True))
+            for child_id in reversed(children[code_id]):
+                depths[child_id] = min(depths[code_id] + 1, 255)
+                stack.append((child_id, False))
+
+        self._tree = {
+            "codes": codes, "ids": ids, "parent_ids": parent_ids, "children": children,
+            "depths": depths, "order": order, "positions": positions, "subtree_end": subtree_end,
+        }
+        return self._tree
+
+    def level(self, code: Any) -> Optional[int]:
+        """Depth of a known code in its hierarchy (0 at the top), or None for unknown and grouping codes."""
+        tree = self._hierarchy()
+        code_id = tree["ids"].get(str(code))
+        return tree["depths"][code_id] if code_id is not None else None
+
+    def _grouped(self, code: str) -> List[str]:
+        """Hierarchy codes a grouping code stands for, resolving nested groups."""
+        members = []
+        for member in self.groups[code]:
+            members.extend(self._grouped(member) if member in self.groups else [member])
+        return members
+
+    def children(self, code: Any) -> List[str]:
+        """Codes one level below code, in table order; for a grouping code, the codes it groups."""
+        code = str(code)
+        if code in self.groups:
+            return [member for member in self.groups[code] if member in self.names]
+        tree = self._hierarchy()
+        code_id = tree["ids"].get(code)
+        return [tree["codes"][child_id] for child_id in tree["children"][code_id]] if code_id is not None else []
+
+    def descendants(self, code: Any, level: Optional[int] = None) -> List[str]:
+        """
+        All codes below code (optionally only those at one absolute level), in pre-order.
+
+        Example: get_code_index("naics").descendants("31-33", level=2) lists the 3-digit
+        manufacturing subsectors. A grouping code expands through the codes it groups, so
+        descendants("1013", level=2) lists the same subsectors.
+        """
+        code = str(code)
+        tree = self._hierarchy()
+        if code in self.groups:
+            descendants = []
+            for member in self._grouped(code):
+                if member in tree["ids"] and (level is None or tree["depths"][tree["ids"][member]] == level):
+                    descendants.append(member)
+                descendants.extend(self.descendants(member, level))
+            return list(dict.fromkeys(descendants))
+        code_id = tree["ids"].get(code)
+        if code_id is None:
+            return []
+        start = tree["positions"][code_id] + 1
+        end = tree["subtree_end"][code_id]
+        ids = tree["order"][start:end]
+        if level is not None:
+            ids = [descendant_id for descendant_id in ids if tree["depths"][descendant_id] == level]
+        return [tree["codes"][descendant_id] for descendant_id in ids]
+
+    def ancestor(self, code: Any, level: int) -> Optional[str]:
+        """
+        The code's ancestor at an absolute level (the code itself at its own level), or None.
+
+        Grouping codes have no level and no ancestors.
+        """
+        if self.level(code) is None:
+            return None
+        lineage = self.lineage(code)
+        depth = len(lineage) - 1
+        return lineage[depth - level] if 0 <= level <= depth else None
+
+    def describe(self, code: Any) -> Dict[str, Optional[str]]:
+        """Code, name, parent code and parent name as a dict."""
+        code = str(code)
+        parent = self.parent(code)
+        return {
+            "code": code,
+            "name": self.names.get(code),
+            "parent_code": parent,
+            "parent_name": self.names.get(parent) if parent else None,
+        }
+
+
+def _naics_parent(code: str, names: Dict[str, str]) -> Optional[str]:
+    if code == "10":
+        return None
+    if code.startswith("10"):
+        # QCEW domains and supersectors: 1013 -> 101 -> 10
+        return code[:-1]
+    if len(code) == 2 or "-" in code:
+        return "10"
+    for length in range(len(code) - 1, 1, -1):
+        if code[:length] in names:
+            return code[:length]
+    # Sectors published as ranges (31-33, 44-45, 48-49)
+    for sector in ("31-33", "44-45", "48-49"):
+        low, high = sector.split("-")
+        if low <= code[:2] <= high:
+            return sector
+    return "10"
+
+
+def _soc_parent(code: str, names: Dict[str, str]) -> Optional[str]:
+    if code == "000000":
+        return None
+    if code.endswith("0000"):
+        return "000000"
+    return code[:2] + "0000"
+
+
+def _qcew_area_parent(code: str, names: Dict[str, str]) -> Optional[str]:
+    if code == "US000":
+        return None
+    if code.startswith("C") or code.endswith("000"):
+        return "US000"
+    return code[:2] + "000"
+
+
+def _oews_area_parent(code: str, names: Dict[str, str]) -> Optional[str]:
+    if code == "0000000":
+        return None
+    if code.startswith("00") or code.endswith("00000"):
+        return "0000000"
+    # Nonmetropolitan areas sit under their state
+    return code[:2] + "00000"
+
+
+def _cip_parent(code: str, names: Dict[str, str]) -> Optional[str]:
+    if code == "990000" or code.startswith("-"):
+        return None
+    if code.endswith("0000"):
+        return "990000"
+    return code[:-4] + "0000"
+
+
+def _no_parent(code: str, names: Dict[str, str]) -> Optional[str]:
+    return None
+
+
+@lru_cache(maxsize=None)
+def get_code_index(system: str) -> CodeIndex:
+    """
+    Return the code index for a code system, building it on first use.
+
+    Args:
+        system: One of CODE_SYSTEMS
+
+    Raises:
+        ValueError: If system is not a known code system
+    """
+    # Imported here so tools.common does not depend on the data packages at import time
+    if system == "naics":
+        from tools.qcew_data.qcew_naics import _get_qcew_naics_data
+        entries = ((code, _NAICS_LABEL_PREFIX.sub("", name)) for code, name in _get_qcew_naics_data().items())
+        return CodeIndex(system, entries, _naics_parent, groups=_QCEW_AGGREGATES)
+    if system == "soc":
+        from tools.oews_data.oews_soc import _get_soc_data
+        return CodeIndex(system, list(_get_soc_data().items()) + list(_SOC_MAJOR_GROUPS.items()), _soc_parent)
+    if system == "qcew_area":
+        from tools.qcew_data.qcew_fips import _get_qcew_fips_data
+        return CodeIndex(system, _get_qcew_fips_data().items(), _qcew_area_parent)
+    if system == "oews_area":
+        from tools.oews_data.oews_fips import _get_oews_fips_data
+        return CodeIndex(system, _get_oews_fips_data().items(), _oews_area_parent)
+    if system == "cip":
+        from tools.ipeds_data.get_cip_codes import CIP_CODES
+        return CodeIndex(system, CIP_CODES.items(), _cip_parent)
+    if system == "award_level":
+        from tools.ipeds_data.get_award_levels import AWARD_LEVELS
+        return CodeIndex(system, AWARD_LEVELS.items(), _no_parent)
+    raise ValueError(f"Unknown code system '{system}'. Must be one of: {', '.join(CODE_SYSTEMS)}.")
+
+
+def describe_codes(system: str, codes: List[str]) -> Dict[str, Any]:
+    """
+    Look up names and hierarchy parents for a list of codes.
+
+    Args:
+        system (str): One of "naics", "soc", "qcew_area", "oews_area", "cip", "award_level"
+        codes (List[str]): Codes to describe (e.g., ["1013", "336111"])
+
+    Returns:
+        Dict[str, Any]: Response containing:
+            - status: "success" or "error"
+            - system: Code system used
+            - codes: List of {"code", "name", "parent_code", "parent_name"} (name is None for unknown codes)
+            - error_message: Error details (if unsuccessful)
+    """
+    try:
+        if not isinstance(system, str) or system.lower() not in CODE_SYSTEMS:
+            return {"status": "error", "error_message": f"system must be one of: {', '.join(CODE_SYSTEMS)}."}
+        if not isinstance(codes, list) or not codes:
+            return {"status": "error", "error_message": "codes must be a non-empty list of strings."}
+
+        index = get_code_index(system.lower())
+        return {
+            "status": "success",
+            "system": system.lower(),
+            "codes": [index.describe(str(code).strip()) for code in codes],
+        }
+
+    except Exception as e:
+        return {"status": "error", "error_message": f"Unexpected error: {str(e)}"}
+
+
+def expand_codes(system: str, codes: List[str], level: Optional[int] = None) -> Dict[str, Any]:
+    """
+    Expand codes into their children or their descendants at one hierarchy level.
+
+    Levels count down from the top of each hierarchy. NAICS: 1 = sectors (e.g., "31-33"),
+    2 = 3-digit subsectors, 3 = 4-digit, 4 = 5-digit, 5 = 6-digit. QCEW domains and
+    supersectors are not levels: without a level they expand to the codes they group
+    (1013 -> ["31-33"]) and with one to those codes' descendants. SOC: 1 = major groups,
+    2 = detailed occupations. The expanded list can be passed straight to the QCEW or OEWS
+    tools as one batched request.
+
+    Args:
+        system (str): One of "naics", "soc", "qcew_area", "oews_area", "cip", "award_level"
+        codes (List[str]): Codes to expand (e.g., ["31-33"])
+        level (Optional[int]): Absolute level to expand to; defaults to the direct children
+
+    Returns:
+        Dict[str, Any]: Response containing:
+            - status: "success" or "error"
+            - system: Code system used
+            - expansions: Code -> list of {"code", "name", "level"}
+            - codes: All expanded codes in order, without duplicates
+            - error_message: Error details (if unsuccessful)
+    """
+    try:
+        if not isinstance(system, str) or system.lower() not in CODE_SYSTEMS:
+            return {"status": "error", "error_message": f"system must be one of: {', '.join(CODE_SYSTEMS)}."}
+        if not isinstance(codes, list) or not codes:
+            return {"status": "error", "error_message": "codes must be a non-empty list of strings."}
+
+        index = get_code_index(system.lower())
+        codes = [str(code).strip() for code in codes]
+        unknown = [code for code in codes if code not in index.names]
+        if unknown:
+            return {"status": "error", "error_message": f"Unknown {system.lower()} codes: {', '.join(unknown)}."}
+
+        expansions = {}
+        for code in codes:
+            expanded = index.children(code) if level is None else index.descendants(code, int(level))
+            expansions[code] = [{"code": child, "name": index.names[child], "level": index.level(child)} for child in expanded]
+        empty = [code for code, children in expansions.items() if not children]
+        if empty:
+            below = "children" if level is None else f"descendants at level {int(level)}"
+            return {"status": "error", "error_message": f"No {below} for {system.lower()} codes: {', '.join(empty)}."}
+        return {
+            "status": "success",
+            "system": system.lower(),
+            "expansions": expansions,
+            "codes": list(dict.fromkeys(child["code"] for children in expansions.values() for child in children)),
+        }
+
+    except Exception as e:
+        return {"status": "error", "error_message": f"Unexpected error: {str(e)}"}
+
+
+def rollup_codes(system: str, values: Dict[str, float], level: int) -> Dict[str, Any]:
+    """
+    Roll additive values for detailed codes up to their parents at one hierarchy level.
+
+    Use this to aggregate employment or establishment counts already fetched for detailed
+    industries or occupations without another BLS request. Suppressed or missing detail
+    makes the rolled-up totals lower bounds.
+
+    Args:
+        system (str): One of "naics", "soc", "qcew_area", "oews_area", "cip", "award_level"
+        values (Dict[str, float]): Code -> value at one level of detail (e.g., {"311111": 120, "311119": 40})
+        level (int): Absolute level to roll up to (see expand_codes)
+
+    Returns:
+        Dict[str, Any]: Response containing:
+            - status: "success" or "error"
+            - system, level
+            - totals: Parent code -> {"name", "value", "codes": contributing codes}
+            - unmatched: Codes that are unknown, already above the level or QCEW supersectors
+            - error_message: Error details (if unsuccessful)
+    """
+    try:
+        if not isinstance(system, str) or system.lower() not in CODE_SYSTEMS:
+            return {"status": "error", "error_message": f"system must be one of: {', '.join(CODE_SYSTEMS)}."}
+        if not isinstance(values, dict) or not values:
+            return {"status": "error", "error_message": "values must be a non-empty dict of code -> number."}
+
+        index = get_code_index(system.lower())
+        level = int(level)
+        totals: Dict[str, Dict[str, Any]] = {}
+        unmatched = []
+        for code, value in values.items():
+            target = index.ancestor(str(code).strip(), level)
+            if target is None or value is None:
+                unmatched.append(code)
+                continue
+            entry = totals.setdefault(target, {"name": index.names[target], "value": 0, "codes": []})
+            entry["value"] += value
+            entry["codes"].append(code)
+        return {"status": "success", "system": system.lower(), "level": level, "totals": totals, "unmatched": unmatched}
+
+    except Exception as e:
+        return {"status": "error", "error_message": f"Unexpected error: {str(e)}"}
+
+
+if __name__ == "__main__":
+    print(expand_codes("naics", ["31-33"], 2))
+    print(rollup_codes("naics", {"311111": 120, "311119": 40, "325412": 300}, 2))
+    print(describe_codes("naics", ["1013", "336111", "31-33"]))
+    print(describe_codes("qcew_area", ["17043", "C1954"]))
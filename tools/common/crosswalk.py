@@ -0,0 +1,498 @@
+import argparse
+import bisect
+import csv
+import math
+import os
+from array import array
+from collections import deque
+from functools import lru_cache
+from pathlib import Path
+from typing import Dict, List, Optional, Any, Iterable, Tuple
+
+"""
+Geography Crosswalk
+
+This module translates codes between the geography systems used by the data tools:
+ACS/Census state, county, place and CBSA (MSA) codes, ZIP codes (EIA), QCEW area codes
+("17043", "17000", "C1698") and OEWS area codes ("0016980", "1700000", "1700001").
+
+Relationships are held in memory as sorted integer arrays, so a translation is a few
+binary searches. State/county/place and the QCEW/OEWS/CBSA code conversions are built
+in. The county-CBSA, place-county, ZIP-county and OEWS area-county relationships come
+from the Census and BLS delineation files and are built into CSV files with:
+
+    python -m tools.common.crosswalk --delineation list1_2023.xlsx \\
+        --place-county national_place_by_county2020.txt \\
+        --zip-county tab20_zcta520_county20_natl.txt \\
+        --oews-areas area_definitions_m2023.xlsx
+"""
+
+CROSSWALK_SYSTEMS = ["state", "county", "place", "cbsa", "zip", "qcew_area", "oews_area"]
+
+# Fixed width of each stored (numeric) code system, used to restore leading zeros
+_CODE_WIDTHS = {"state": 2, "county": 5, "place": 7, "cbsa": 5, "zip": 5, "oews_area": 7}
+
+# Relation files written by the build command: file name -> (left system, right system)
+RELATION_FILES = {
+    "county_cbsa.csv": ("county", "cbsa"),
+    "place_county.csv": ("place", "county"),
+    "zip_county.csv": ("zip", "county"),
+    "oews_area_county.csv": ("oews_area", "county"),
+}
+
+# Containment level of each stored system, finest first. Chains may go up to coarser levels
+# or down to finer ones, but never up and then back down: place -> state -> county would
+# return every county in the state rather than the place's county.
+_LEVELS = {"zip": 0, "place": 0, "county": 1, "cbsa": 2, "oews_area": 2, "state": 3}
+
+# Canonical systems a composite target system can be written from, in order of preference
+_TARGET_SYSTEMS = {
+    "qcew_area": ["county", "cbsa", "state"],
+    "oews_area": ["oews_area", "cbsa", "state"],
+}
+
+_data_dir = Path(os.getenv("CROSSWALK_DATA_DIR", Path(__file__).resolve().parents[2] / "data" / "crosswalks"))
+
+
+class Relation:
+    """
+    Many-to-many relationship between two code systems held in sorted integer arrays.
+
+    Each pair carries two weights: the share of the left code that falls in the right
+    code and the share of the right code that falls in the left code. Unknown shares
+    are stored as NaN.
+    """
+
+    def __init__(self, left_system: str, right_system: str, rows: Iterable[Tuple[str, str, float, float]]):
+        self.left_system = left_system
+        self.right_system = right_system
+        pairs = sorted((int(left), int(right), left_weight, right_weight) for left, right, left_weight, right_weight in rows)
+        self.left = array("I", (pair[0] for pair in pairs))
+        self.right = array("I", (pair[1] for pair in pairs))
+        self.left_weights = array("f", (pair[2] for pair in pairs))
+        self.right_weights = array("f", (pair[3] for pair in pairs))
+
+        # Secondary order for lookups from the right-hand side
+        self.by_right = array("I", sorted(range(len(pairs)), key=lambda i: self.right[i]))
+        self.right_sorted = array("I", (self.right[i] for i in self.by_right))
+
+    def __len__(self) -> int:
+        return len(self.left)
+
+    def lookup(self, system: str, code: str) -> List[Tuple[str, Optional[float]]]:
+        """Codes related to code (a code of system), with the share of code falling in each."""
+        if not code.isdigit():
+            return []
+        key = int(code)
+        if system == self.left_system:
+            start = bisect.bisect_left(self.left, key)
+            end = bisect.bisect_right(self.left, key)
+            width = _CODE_WIDTHS[self.right_system]
+            return [(str(self.right[i]).zfill(width), _weight(self.left_weights[i])) for i in range(start, end)]
+
+        start = bisect.bisect_left(self.right_sorted, key)
+        end = bisect.bisect_right(self.right_sorted, key)
+        width = _CODE_WIDTHS[self.left_system]
+        return [
+            (str(self.left[i]).zfill(width), _weight(self.right_weights[i]))
+            for i in (self.by_right[j] for j in range(start, end))
+        ]
+
+
+def _weight(value: float) -> Optional[float]:
+    return None if math.isnan(value) else round(value, 4)
+
+
+def set_crosswalk_data_dir(data_dir: str) -> None:
+    """Point the crosswalk at a directory of relation files and drop any loaded relations."""
+    global _data_dir
+    _data_dir = Path(data_dir)
+    _get_relations.cache_clear()
+    _find_path.cache_clear()
+
+
+def _read_relation_file(path: Path) -> List[Tuple[str, str, float, float]]:
+    rows = []
+    with open(path, newline="") as handle:
+        for row in csv.DictReader(handle):
+            rows.append((
+                row["left"],
+                row["right"],
+                float(row["left_weight"]) if row["left_weight"] else math.nan,
+                float(row["right_weight"]) if row["right_weight"] else math.nan,
+            ))
+    return rows
+
+
+@lru_cache(maxsize=1)
+def _get_relations() -> Dict[Tuple[str, str], Relation]:
+    """Internal function returning every available relation, built on first use."""
+    # Imported here so tools.common does not depend on the data packages at import time
+    from tools.acs_data.gazetteer import _get_county_gazetteer, _get_place_gazetteer
+
+    relations = {}
+    for geo_type, gazetteer in (("county", _get_county_gazetteer()), ("place", _get_place_gazetteer())):
+        rows = []
+        for row_id in range(len(gazetteer)):
+            state_fips = gazetteer.states[gazetteer.state_ids[row_id]][1]
+            if state_fips:
+                rows.append((state_fips + gazetteer.codes[row_id], state_fips, 1.0, math.nan))
+        relations[(geo_type, "state")] = Relation(geo_type, "state", rows)
+
+    for file_name, (left_system, right_system) in RELATION_FILES.items():
+        path = _data_dir / file_name
+        if path.exists():
+            relations[(left_system, right_system)] = Relation(left_system, right_system, _read_relation_file(path))
+    return relations
+
+
+@lru_cache(maxsize=None)
+def _find_path(source: str, target: str) -> Optional[List[Tuple[str, Relation]]]:
+    """
+    Shortest chain of relations from source to target, as (system, relation) steps, that
+    never steps down to a finer level after stepping up to a coarser one.
+    """
+    neighbours: Dict[str, List[Tuple[str, Relation]]] = {}
+    for (left_system, right_system), relation in _get_relations().items():
+        neighbours.setdefault(left_system, []).append((right_system, relation))
+        neighbours.setdefault(right_system, []).append((left_system, relation))
+
+    # A system may be reached both before and after the chain has gone up a level
+    queue = deque([(source, False, [])])
+    seen = {(source, False)}
+    while queue:
+        system, went_up, path = queue.popleft()
+        if system == target:
+            return path
+        for next_system, relation in neighbours.get(system, []):
+            if went_up and _LEVELS[next_system] < _LEVELS[system]:
+                continue
+            state = (next_system, went_up or _LEVELS[next_system] > _LEVELS[system])
+            if state not in seen:
+                seen.add(state)
+                queue.append((next_system, state[1], path + [(next_system, relation)]))
+    return None
+
+
+def _follow(path: List[Tuple[str, Relation]], system: str, code: str) -> Dict[str, Optional[float]]:
+    """Apply a chain of relations to one code, multiplying shares along the way."""
+    current: Dict[str, Optional[float]] = {code: 1.0}
+    for next_system, relation in path:
+        translated: Dict[str, Optional[float]] = {}
+        for current_code, weight in current.items():
+            for next_code, share in relation.lookup(system, current_code):
+                combined = weight * share if weight is not None and share is not None else None
+                if next_code in translated:
+                    previous = translated[next_code]
+                    combined = previous + combined if previous is not None and combined is not None else None
+                translated[next_code] = combined
+        current = translated
+        system = next_system
+    return current
+
+
+@lru_cache(maxsize=1)
+def _get_msa_codes() -> frozenset:
+    from tools.acs_data.fips_census_msa import _get_msa_fips_data
+    return frozenset(_get_msa_fips_data().values())
+
+
+def _canonical(system: str, code: str) -> Optional[Tuple[str, str]]:
+    """Map a code to the stored system it belongs to ("C1698" -> ("cbsa", "16980"))."""
+    code = code.strip().upper()
+    if system == "qcew_area":
+        if code == "US000":
+            return None
+        if code.startswith("C"):
+            # CSA areas ("CS176") and other aggregates have no CBSA
+            if len(code) != 5 or not code[1:].isdigit():
+                raise ValueError(f"QCEW area {code} is not a county, state or MSA code; only CBSA-based areas (e.g., C1698) can be translated.")
+            return "cbsa", code[1:] + "0"
+        if code.endswith("000"):
+            return "state", code[:2]
+        return "county", code
+    if system == "oews_area":
+        code = code.zfill(7)
+        if code == "0000000":
+            return None
+        # New England OEWS areas use NECTA codes that are not CBSAs
+        if code.startswith("00") and code[2:] in _get_msa_codes():
+            return "cbsa", code[2:]
+        if code.endswith("00000"):
+            return "state", code[:2]
+        return "oews_area", code
+    return system, code.zfill(_CODE_WIDTHS[system]) if code.isdigit() else code
+
+
+def _from_canonical(target: str, system: str, code: str) -> str:
+    """Write a stored code in the target system's format ("16980" -> "C1698" for QCEW)."""
+    if target == "qcew_area":
+        if system == "cbsa":
+            return "C" + code[:4]
+        if system == "state":
+            return code + "000"
+    if target == "oews_area":
+        if system == "cbsa":
+            return "00" + code
+        if system == "state":
+            return code + "00000"
+    return code
+
+
+def translate_code(code: str, from_system: str, to_system: str) -> List[Tuple[str, Optional[float]]]:
+    """
+    Translate one code between geography systems.
+
+    Returns:
+        List of (code, weight) pairs, where weight is the share of the input area falling
+        in the target area when known (ZIP codes by land area, counties within CBSAs), else None.
+
+    Raises:
+        ValueError: If either system is unknown, the code is not one the crosswalk can place
+                    (e.g., a QCEW CSA area), or no crosswalk connects the systems
+    """
+    if from_system not in CROSSWALK_SYSTEMS or to_system not in CROSSWALK_SYSTEMS:
+        raise ValueError(f"Geography systems must be one of: {', '.join(CROSSWALK_SYSTEMS)}.")
+
+    canonical = _canonical(from_system, str(code))
+    if canonical is None:
+        return []
+    source_system, source_code = canonical
+
+    targets = _TARGET_SYSTEMS.get(to_system, [to_system])
+    if source_system in targets:
+        return [(_from_canonical(to_system, source_system, source_code), 1.0)]
+
+    # Try the finest target level first (a QCEW county before its MSA or state) and fall
+    # back to coarser ones when the code has no match there, e.g. a rural place outside any CBSA
+    paths = [(target, _find_path(source_system, target)) for target in targets]
+    if all(path is None for _, path in paths):
+        raise ValueError(
+            f"No crosswalk from {from_system} to {to_system} is loaded. "
+            f"Build the relation files with 'python -m tools.common.crosswalk' into {_data_dir}."
+        )
+
+    for target, path in paths:
+        if path is None:
+            continue
+        matches = _follow(path, source_system, source_code)
+        if matches:
+            return [(_from_canonical(to_system, target, target_code), weight) for target_code, weight in matches.items()]
+    return []
+
+
+@lru_cache(maxsize=None)
+def _get_names(system: str) -> Dict[str, str]:
+    """Internal function returning code -> name for a geography system."""
+    from tools.common.code_index import get_code_index
+    if system in ("qcew_area", "oews_area"):
+        return get_code_index(system).names
+    if system == "state":
+        from tools.acs_data.fips_census_state import _get_state_fips_data
+        return {fips: name for name, fips in _get_state_fips_data().items()}
+    if system == "cbsa":
+        from tools.acs_data.fips_census_msa import _get_msa_fips_data
+        return {fips: name for name, fips in _get_msa_fips_data().items()}
+    if system in ("county", "place"):
+        from tools.acs_data.gazetteer import _get_county_gazetteer, _get_place_gazetteer
+        gazetteer = _get_county_gazetteer() if system == "county" else _get_place_gazetteer()
+        return {
+            gazetteer.states[gazetteer.state_ids[row_id]][1] + gazetteer.codes[row_id]: gazetteer.full_names[row_id]
+            for row_id in range(len(gazetteer))
+        }
+    return {}
+
+
+def translate_geographies(codes: List[str], from_system: str, to_system: str) -> Dict[str, Any]:
+    """
+    Translates geography codes from one system to another in a single in-memory lookup.
+
+    County and place codes are full GEOIDs ("17043", "1714000"). Chains such as
+    ZIP -> county -> CBSA -> QCEW MSA are followed automatically.
+
+    Args:
+        codes (List[str]): Codes to translate (e.g., ["C1698"] or ["60067", "60622"])
+        from_system (str): One of "state", "county", "place", "cbsa", "zip", "qcew_area", "oews_area"
+        to_system (str): One of the same systems
+
+    Returns:
+        Dict[str, Any]: Response containing:
+            - status: "success" or "error"
+            - from_system / to_system: Systems used
+            - results: List of {"code", "matches": [{"code", "name", "weight"}]}, where weight is
+                       the share of the input area in each match when known
+            - error_message: Error details (if unsuccessful)
+    """
+    try:
+        def _error_response(message: str) -> Dict[str, str]:
+            return {"status": "error", "error_message": message}
+
+        if not isinstance(codes, list) or not codes:
+            return _error_response("codes must be a non-empty list of strings.")
+        from_system = (from_system or "").lower()
+        to_system = (to_system or "").lower()
+        if from_system not in CROSSWALK_SYSTEMS or to_system not in CROSSWALK_SYSTEMS:
+            return _error_response(f"from_system and to_system must be one of: {', '.join(CROSSWALK_SYSTEMS)}.")
+
+        names = _get_names(to_system)
+        results = []
+        for code in codes:
+            matches = translate_code(str(code), from_system, to_system)
+            results.append({
+                "code": str(code),
+                "matches": [
+                    {"code": match, "name": names.get(match), "weight": weight}
+                    for match, weight in sorted(matches, key=lambda item: (-(item[1] or 0), item[0]))
+                ],
+            })
+
+        return {"status": "success", "from_system": from_system, "to_system": to_system, "results": results}
+
+    except ValueError as e:
+        return {"status": "error", "error_message": str(e)}
+    except Exception as e:
+        return {"status": "error", "error_message": f"Unexpected error: {str(e)}"}
+
+
+def _read_table(path: str, is_header, sep: str = ","):
+    """
+    Read a CSV, pipe-delimited text or Excel file as strings with pandas.
+
+    Census and BLS files often start with title rows, so the header is the first row
+    accepted by is_header.
+    """
+    import pandas as pd
+    if path.lower().endswith((".xls", ".xlsx")):
+        table = pd.read_excel(path, header=None, dtype=str)
+        for row_number in range(min(len(table), 20)):
+            values = [str(value).strip() for value in table.iloc[row_number]]
+            if is_header(values):
+                body = table.iloc[row_number + 1:].copy()
+                body.columns = values
+                return body
+    else:
+        with open(path, newline="", encoding="utf-8-sig") as handle:
+            for row_number, values in enumerate(csv.reader(handle, delimiter=sep)):
+                if row_number >= 20:
+                    break
+                if is_header([value.strip() for value in values]):
+                    return pd.read_csv(path, skiprows=row_number, dtype=str, sep=sep, encoding="utf-8-sig")
+    raise ValueError(f"Header row not found in {path}")
+
+
+def _build_county_cbsa(path: str) -> List[Tuple[str, str, float, float]]:
+    table = _read_table(path, lambda values: "CBSA Code" in values).dropna(subset=["CBSA Code", "FIPS State Code", "FIPS County Code"])
+    return [
+        (state.zfill(2) + county.zfill(3), cbsa, 1.0, math.nan)
+        for cbsa, state, county in zip(table["CBSA Code"], table["FIPS State Code"], table["FIPS County Code"])
+    ]
+
+
+def _build_place_county(path: str) -> List[Tuple[str, str, float, float]]:
+    table = _read_table(path, lambda values: "PLACEFP" in values, sep="|")
+    pairs = [
+        (state + place, state + county)
+        for state, county, place in zip(table["STATEFP"], table["COUNTYFP"], table["PLACEFP"])
+    ]
+    county_counts: Dict[str, int] = {}
+    for place, _ in pairs:
+        county_counts[place] = county_counts.get(place, 0) + 1
+    # The file lists every county a place touches without the split, so only single-county places get a share
+    return [(place, county, 1.0 if county_counts[place] == 1 else math.nan, math.nan) for place, county in pairs]
+
+
+def _build_zip_county(path: str) -> List[Tuple[str, str, float, float]]:
+    table = _read_table(path, lambda values: "GEOID_ZCTA5_20" in values, sep="|").dropna(subset=["GEOID_ZCTA5_20", "GEOID_COUNTY_20"])
+    rows = []
+    for zcta, county, part, zcta_land, county_land in zip(
+        table["GEOID_ZCTA5_20"], table["GEOID_COUNTY_20"], table["AREALAND_PART"],
+        table["AREALAND_ZCTA5_20"], table["AREALAND_COUNTY_20"]
+    ):
+        part, zcta_land, county_land = float(part), float(zcta_land), float(county_land)
+        rows.append((
+            zcta,
+            county,
+            part / zcta_land if zcta_land else math.nan,
+            part / county_land if county_land else math.nan,
+        ))
+    return rows
+
+
+def _build_oews_area_county(path: str) -> List[Tuple[str, str, float, float]]:
+    table = _read_table(path, lambda values: any("county code" in value.lower() for value in values))
+
+    def _column(*fragments: str) -> str:
+        return next(column for column in table.columns if all(fragment in column.lower() for fragment in fragments))
+
+    state_column, area_column, county_column = _column("fips"), _column("msa", "code"), _column("county", "code")
+    rows = []
+    for state, area, county in zip(table[state_column], table[area_column], table[county_column]):
+        if not (isinstance(state, str) and isinstance(area, str) and isinstance(county, str)):
+            continue
+        # Metro areas are listed by CBSA code, nonmetropolitan areas by their 7-digit OEWS code
+        area = "00" + area.zfill(5) if len(area) <= 5 else area.zfill(7)
+        rows.append((area, state.zfill(2) + county.zfill(3), math.nan, 1.0))
+    return rows
+
+
+def build_crosswalk_files(
+    output_dir: str,
+    delineation: Optional[str] = None,
+    place_county: Optional[str] = None,
+    zip_county: Optional[str] = None,
+    oews_areas: Optional[str] = None
+) -> Dict[str, int]:
+    """
+    Build the relation CSV files from local copies of the Census and BLS source files.
+
+    Args:
+        output_dir: Directory to write the relation files to
+        delineation: Census CBSA delineation file (list1), .xlsx or .csv
+        place_county: Census place-by-county file (national_place_by_county2020.txt)
+        zip_county: Census ZCTA-to-county relationship file (tab20_zcta520_county20_natl.txt)
+        oews_areas: BLS OEWS area definitions file (area_definitions_m2023.xlsx)
+
+    Returns:
+        Dict mapping each written file name to its row count
+    """
+    builders = {
+        "county_cbsa.csv": (delineation, _build_county_cbsa),
+        "place_county.csv": (place_county, _build_place_county),
+        "zip_county.csv": (zip_county, _build_zip_county),
+        "oews_area_county.csv": (oews_areas, _build_oews_area_county),
+    }
+    output = Path(output_dir)
+    output.mkdir(parents=True, exist_ok=True)
+
+    written = {}
+    for file_name, (source, builder) in builders.items():
+        if not source:
+            continue
+        rows = builder(source)
+        with open(output / file_name, "w", newline="") as handle:
+            writer = csv.writer(handle)
+            writer.writerow(["left", "right", "left_weight", "right_weight"])
+            for left, right, left_weight, right_weight in rows:
+                writer.writerow([
+                    left,
+                    right,
+                    "" if math.isnan(left_weight) else round(left_weight, 6),
+                    "" if math.isnan(right_weight) else round(right_weight, 6),
+                ])
+        written[file_name] = len(rows)
+    return written
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Build geography crosswalk files from Census and BLS source files")
+    parser.add_argument("--delineation", help="Census CBSA delineation file (list1, .xlsx or .csv)")
+    parser.add_argument("--place-county", help="Census national place-by-county file (pipe-delimited)")
+    parser.add_argument("--zip-county", help="Census ZCTA-to-county relationship file (pipe-delimited)")
+    parser.add_argument("--oews-areas", help="BLS OEWS area definitions file (.xlsx)")
+    parser.add_argument("--output-dir", default=str(_data_dir), help="Directory to write relation files to")
+    args = parser.parse_args()
+
+    for name, count in build_crosswalk_files(
+        args.output_dir, args.delineation, args.place_county, args.zip_county, args.oews_areas
+    ).items():
+        print(f"{name}: {count} rows")
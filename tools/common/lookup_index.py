@@ -0,0 +1,444 @@
+import bisect
+import heapq
+import math
+import re
+import unicodedata
+from array import array
+from typing import Callable, Dict, List, Tuple, Optional, Iterable, Sequence, Set
+
+"""
+Lookup Index
+
+This module provides an in-memory token index over (name, code) lookup tables such as
+place, county, MSA, QCEW/OEWS area, SOC and NAICS names. It backs the search_* tools with
+typo-tolerant matching: a SymSpell-style deletion index maps misspelled query words
+("milwakee", "waupacca") to real vocabulary words in well under a millisecond. Results
+are ranked with BM25 (term frequency, inverse document frequency and name length),
+with boosts for whole-word and leading-word matches and an optional prior such as
+population, and the top k are selected with a heap. Fragments inside words ("page" ->
+"DuPage") still match: ahead of typo corrections when a term matches no word or prefix,
+and as a fallback that fills the places left after the ranked matches.
+"""
+
+_TOKEN_SPLIT = re.compile(r'\W+')
+
+# BM25 parameters
+_K1 = 1.2
+_B = 0.75
+
+# Score multipliers for how a query term matched an entry word
+_PREFIX_MATCH = 0.5
+_INFIX_MATCH = 0.4
+_EDIT_PENALTY = 0.35
+_QUALIFIER_WEIGHT = 0.3
+_LEADING_WORD_BOOST = 1.1
+
+# Prefixes this common ("s", "sa") would expand to most of the vocabulary
+_MIN_PREFIX_LENGTH = 2
+_MAX_PREFIX_WORDS = 500
+_MIN_INFIX_LENGTH = 3
+
+
+def fold_accents(text: str) -> str:
+    """Strip accents ("Cañon" -> "Canon"), so names and queries match however they are typed."""
+    if text.isascii():
+        return text
+    return "".join(char for char in unicodedata.normalize("NFKD", text) if not unicodedata.combining(char))
+
+
+def tokenize(text: str) -> List[str]:
+    """Lowercase text, strip accents and split it into word tokens, dropping empty strings."""
+    return [token for token in _TOKEN_SPLIT.split(fold_accents(text).lower()) if token]
+
+
+def edit_distance(source: str, target: str, max_distance: int) -> int:
+    """
+    Optimal string alignment (Damerau-Levenshtein) distance between two strings.
+
+    Returns max_distance + 1 as soon as the distance is known to exceed max_distance.
+    """
+    if source == target:
+        return 0
+    if abs(len(source) - len(target)) > max_distance:
+        return max_distance + 1
+
+    previous_previous = None
+    previous = list(range(len(target) + 1))
+    for i in range(1, len(source) + 1):
+        current = [i] + [0] * len(target)
+        row_min = current[0]
+        for j in range(1, len(target) + 1):
+            cost = 0 if source[i - 1] == target[j - 1] else 1
+            current[j] = min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + cost)
+            if (previous_previous is not None and i > 1 and j > 1
+                    and source[i - 1] == target[j - 2] and source[i - 2] == target[j - 1]):
+                current[j] = min(current[j], previous_previous[j - 2] + 1)
+            row_min = min(row_min, current[j])
+        if row_min > max_distance:
+            return max_distance + 1
+        previous_previous, previous = previous, current
+    return previous[-1]
+
+
+def _deletes(word: str, max_distance: int) -> Set[str]:
+    """All strings reachable from word by deleting up to max_distance characters."""
+    variants = {word}
+    frontier = {word}
+    for _ in range(max_distance):
+        next_frontier = set()
+        for variant in frontier:
+            for i in range(len(variant)):
+                next_frontier.add(variant[:i] + variant[i + 1:])
+        variants |= next_frontier
+        frontier = next_frontier
+    return variants
+
+
+class LookupIndex:
+    """
+    Token index over a list of (name, code) entries with typo-tolerant term matching.
+
+    Args:
+        entries: (name, code) pairs, in the order ties should be broken
+        max_edit_distance: Largest edit distance a misspelled word may be corrected by
+        prefix_length: Only the first prefix_length characters of each word are used to
+                       build the deletion index, which keeps it small (as in SymSpell)
+        tokens: Optional pre-tokenized words for each entry (e.g., from a built lookup-table
+                artifact); entry names are tokenized here when omitted
+        qualifier_separator: When set, words after the last occurrence of this separator
+                             (the state in "Albany city, New York") count for less in
+                             ranking, so "new york city" prefers New York city itself
+        word_aliases: Optional word -> canonical word mapping (e.g., "st" -> "saint") applied
+                      to entry words here and to every query term
+    """
+
+    def __init__(
+        self,
+        entries: Iterable[Tuple[str, str]],
+        max_edit_distance: int = 2,
+        prefix_length: int = 7,
+        tokens: Optional[Sequence[Sequence[str]]] = None,
+        qualifier_separator: Optional[str] = None,
+        word_aliases: Optional[Dict[str, str]] = None
+    ):
+        self.max_edit_distance = max_edit_distance
+        self.word_aliases: Dict[str, str] = word_aliases or {}
+        self.prefix_length = prefix_length
+        self.names: List[str] = []
+        self.codes: List[str] = []
+        self.entry_tokens: List[frozenset] = []
+        self.postings: Dict[str, List[int]] = {}
+        self.entry_lengths = array("H")
+        self.leading_words: List[str] = []
+        # Sparse term counts (only words repeated within a name) and qualifier-only words
+        self._repeats: Dict[Tuple[int, str], int] = {}
+        self._qualifier_words: Dict[int, frozenset] = {}
+        interned_qualifiers: Dict[frozenset, frozenset] = {}
+
+        for entry_id, (name, code) in enumerate(entries):
+            words = tokens[entry_id] if tokens is not None else tokenize(name)
+            if self.word_aliases:
+                words = [self.word_aliases.get(word, word) for word in words]
+            self.names.append(name)
+            self.codes.append(code)
+            self.entry_tokens.append(frozenset(words))
+            self.entry_lengths.append(min(len(words), 65535))
+            self.leading_words.append(words[0] if words else "")
+            for token in set(words):
+                self.postings.setdefault(token, []).append(entry_id)
+            if len(words) != len(self.entry_tokens[-1]):
+                for token in self.entry_tokens[-1]:
+                    count = words.count(token)
+                    if count > 1:
+                        self._repeats[(entry_id, token)] = count
+
+            if qualifier_separator and qualifier_separator in name:
+                head, tail = name.rsplit(qualifier_separator, 1)
+                qualifier = frozenset(self._canonical(tokenize(tail))) - frozenset(self._canonical(tokenize(head)))
+                if qualifier:
+                    self._qualifier_words[entry_id] = interned_qualifiers.setdefault(qualifier, qualifier)
+
+        entry_count = len(self.names)
+        self._average_length = (sum(self.entry_lengths) / entry_count) if entry_count else 1.0
+        self._idf = {
+            token: math.log(1 + (entry_count - len(entry_ids) + 0.5) / (len(entry_ids) + 0.5))
+            for token, entry_ids in self.postings.items()
+        }
+        self._vocabulary = sorted(self.postings)
+
+        # Deletion index: delete-variant of a word prefix -> vocabulary words producing it
+        self._deletion_index: Dict[str, List[str]] = {}
+        for token in self.postings:
+            for variant in _deletes(token[:prefix_length], max_edit_distance):
+                self._deletion_index.setdefault(variant, []).append(token)
+
+    def __len__(self) -> int:
+        return len(self.names)
+
+    def _canonical_term(self, term: str) -> str:
+        # Query terms are folded like the entry words, which tokenize() or the artifact build folded
+        term = fold_accents(term)
+        return self.word_aliases.get(term, term)
+
+    def _canonical(self, terms: Iterable[str]) -> List[str]:
+        return [self._canonical_term(term) for term in terms]
+
+    def _max_distance_for(self, term: str) -> int:
+        # Short words tolerate fewer edits, otherwise "ohio" would match "oslo"
+        if len(term) < 3:
+            return 0
+        if len(term) <= 5:
+            return min(1, self.max_edit_distance)
+        return self.max_edit_distance
+
+    def similar_terms(self, term: str) -> List[Tuple[str, int]]:
+        """
+        Vocabulary words within the allowed edit distance of term.
+
+        Returns:
+            List of (word, distance) pairs, closest and most common words first
+        """
+        term = self._canonical_term(term)
+        if term in self.postings:
+            return [(term, 0)]
+
+        max_distance = self._max_distance_for(term)
+        if max_distance == 0:
+            return []
+
+        candidates: Dict[str, int] = {}
+        for variant in _deletes(term[:self.prefix_length], max_distance):
+            for word in self._deletion_index.get(variant, ()):
+                if word in candidates:
+                    continue
+                distance = edit_distance(term, word, max_distance)
+                if distance <= max_distance:
+                    candidates[word] = distance
+
+        return sorted(candidates.items(), key=lambda item: (item[1], -len(self.postings[item[0]]), item[0]))
+
+    def fuzzy_search(self, terms: List[str], max_results: Optional[int] = 20) -> List[Tuple[str, str]]:
+        """
+        Find entries whose words match every search term, allowing misspellings.
+
+        Each term is mapped to its nearby vocabulary words; entries containing a match for
+        every term are ranked by total edit distance, then by name length. Terms with no
+        nearby vocabulary word are ignored so one unrecognized word does not empty the result.
+
+        Args:
+            terms: Lowercased search words
+            max_results: Maximum number of results to return
+
+        Returns:
+            List of (name, code) tuples, best match first
+        """
+        return [(self.names[entry_id], self.codes[entry_id]) for entry_id, _ in self.fuzzy_matches(terms, max_results)]
+
+    def fuzzy_matches(self, terms: List[str], max_results: Optional[int] = 20) -> List[Tuple[int, int]]:
+        """Same matching as fuzzy_search, returning (entry_id, total edit distance) pairs."""
+        term_matches = []
+        for term in terms:
+            similar = dict(self.similar_terms(term))
+            if similar:
+                term_matches.append(similar)
+        if not term_matches:
+            return []
+
+        # Start from the rarest term and check the remaining terms against each entry's words
+        term_matches.sort(key=lambda similar: sum(len(self.postings[word]) for word in similar))
+        scores: Dict[int, int] = {}
+        for word, distance in term_matches[0].items():
+            for entry_id in self.postings[word]:
+                if entry_id not in scores or distance < scores[entry_id]:
+                    scores[entry_id] = distance
+
+        for similar in term_matches[1:]:
+            next_scores = {}
+            for entry_id, score in scores.items():
+                matched = [distance for word, distance in similar.items() if word in self.entry_tokens[entry_id]]
+                if matched:
+                    next_scores[entry_id] = score + min(matched)
+            scores = next_scores
+
+        ranked = sorted(scores, key=lambda entry_id: (scores[entry_id], len(self.names[entry_id]), entry_id))
+        if max_results and max_results > 0:
+            ranked = ranked[:max_results]
+        return [(entry_id, scores[entry_id]) for entry_id in ranked]
+
+    def _prefix_words(self, term: str) -> List[str]:
+        """Vocabulary words that start with term and are longer than it."""
+        words = []
+        position = bisect.bisect_right(self._vocabulary, term)
+        while (position < len(self._vocabulary) and len(words) < _MAX_PREFIX_WORDS
+               and self._vocabulary[position].startswith(term)):
+            words.append(self._vocabulary[position])
+            position += 1
+        return words
+
+    def _infix_words(self, term: str) -> List[str]:
+        """Vocabulary words that contain term anywhere."""
+        return [word for word in self._vocabulary if term in word]
+
+    def _term_matches(self, term: str) -> Dict[str, float]:
+        """Vocabulary words a query term matches, with a multiplier for how well each matches."""
+        matches: Dict[str, float] = {}
+        if term in self.postings:
+            matches[term] = 1.0
+        if len(term) >= _MIN_PREFIX_LENGTH:
+            for word in self._prefix_words(term):
+                matches[word] = _PREFIX_MATCH * (1 + len(term) / len(word)) / 2
+        if not matches and len(term) >= _MIN_INFIX_LENGTH:
+            # A fragment of a real word ("ware" in "software") beats a typo correction ("care")
+            for word in self._infix_words(term)[:_MAX_PREFIX_WORDS]:
+                matches[word] = _INFIX_MATCH * (1 + len(term) / len(word)) / 2
+        if not matches:
+            # Only the closest corrections, so a rarer word one edit further away cannot
+            # outrank the intended word on IDF ("manufacturng" -> "manufacturing", not "manufactured")
+            similar = self.similar_terms(term)
+            closest = similar[0][1] if similar else 0
+            for word, distance in similar:
+                if distance == closest:
+                    matches[word] = max(0.0, 1.0 - _EDIT_PENALTY * distance)
+        return matches
+
+    def _score(self, entry_id: int, term_matches: List[Dict[str, float]], leading_matches: Dict[str, float]) -> float:
+        """BM25 score of one entry, using the best-matching entry word for each query term."""
+        words = self.entry_tokens[entry_id]
+        length_norm = _K1 * (1 - _B + _B * self.entry_lengths[entry_id] / self._average_length)
+        qualifier = self._qualifier_words.get(entry_id)
+
+        score = 0.0
+        for matches in term_matches:
+            best = 0.0
+            for word in words:
+                factor = matches.get(word)
+                if factor is None:
+                    continue
+                tf = self._repeats.get((entry_id, word), 1)
+                weight = factor * self._idf[word] * tf * (_K1 + 1) / (tf + length_norm)
+                if qualifier is not None and word in qualifier:
+                    weight *= _QUALIFIER_WEIGHT
+                best = max(best, weight)
+            score += best
+
+        if self.leading_words[entry_id] in leading_matches:
+            score *= _LEADING_WORD_BOOST
+        return score
+
+    def search(
+        self,
+        terms: List[str],
+        max_results: Optional[int] = 20,
+        prior: Optional[Callable[[int], float]] = None,
+        prior_weight: float = 0.3,
+        optional_terms: Sequence[str] = (),
+        substring_fallback: bool = True
+    ) -> List[Tuple[str, str]]:
+        """
+        Relevance-ranked search over the index.
+
+        Each term matches entry words exactly, as a prefix ("birm" -> "birmingham") or,
+        when neither applies, inside a word ("ware" -> "software") or within the allowed
+        edit distance. Entries must match every term that matched something; terms that
+        match nothing are ignored. Entries are scored with BM25 and the top max_results
+        are selected with a heap. With substring_fallback, places left after the ranked
+        matches are filled from substring_search ("page" -> Page County, then DuPage County).
+
+        Args:
+            terms: Lowercased search words
+            max_results: Maximum number of results to return (None or 0 for all)
+            prior: Optional function returning a non-negative prior (e.g., population) for an
+                   entry id; prior_weight * log10(1 + prior) is added to the score
+            prior_weight: Weight of the prior relative to the text score
+            optional_terms: Words that add to the score of entries containing them but are not
+                            required (e.g., "village" in "jefferson village" ranks "Jefferson
+                            village, Ohio" first and still returns "Jefferson city, Iowa")
+            substring_fallback: Fill the remaining places with entries containing every term
+                                inside their words
+
+        Returns:
+            List of (name, code) tuples, most relevant first
+        """
+        results = self._ranked_search(terms, max_results, prior, prior_weight, optional_terms)
+        if substring_fallback and (not max_results or max_results <= 0 or len(results) < max_results):
+            found = set(results)
+            for result in self.substring_search(terms, None):
+                if max_results and max_results > 0 and len(results) >= max_results:
+                    break
+                if result not in found:
+                    results.append(result)
+        return results
+
+    def _ranked_search(
+        self,
+        terms: List[str],
+        max_results: Optional[int],
+        prior: Optional[Callable[[int], float]],
+        prior_weight: float,
+        optional_terms: Sequence[str]
+    ) -> List[Tuple[str, str]]:
+        """BM25-ranked matches for search(), without the substring fallback."""
+        term_matches = [matches for matches in (self._term_matches(term) for term in self._canonical(terms)) if matches]
+        if not term_matches:
+            return []
+        leading_matches = term_matches[0]
+        optional_matches = [
+            {term: 1.0} for term in self._canonical(optional_terms) if term in self.postings
+        ]
+
+        # Start from the rarest term and keep entries that match each remaining term
+        term_matches.sort(key=lambda matches: sum(len(self.postings[word]) for word in matches))
+        candidates: Set[int] = set()
+        for word in term_matches[0]:
+            candidates.update(self.postings[word])
+        for matches in term_matches[1:]:
+            candidates = {entry_id for entry_id in candidates if not self.entry_tokens[entry_id].isdisjoint(matches)}
+
+        scores = {}
+        for entry_id in candidates:
+            score = self._score(entry_id, term_matches + optional_matches, leading_matches)
+            if prior is not None:
+                score += prior_weight * math.log10(1 + max(0.0, prior(entry_id) or 0.0))
+            scores[entry_id] = score
+
+        # Ties go to shorter names, then to the original table order
+        def rank_key(entry_id: int) -> Tuple[float, int, int]:
+            return scores[entry_id], -len(self.names[entry_id]), -entry_id
+
+        if max_results and max_results > 0:
+            ranked = heapq.nlargest(max_results, scores, key=rank_key)
+        else:
+            ranked = sorted(scores, key=rank_key, reverse=True)
+        return [(self.names[entry_id], self.codes[entry_id]) for entry_id in ranked]
+
+    def substring_search(self, terms: List[str], max_results: Optional[int] = 20) -> List[Tuple[str, str]]:
+        """
+        Find entries whose words contain every search term anywhere ("ware" -> "software").
+
+        Fills the places search() leaves with names containing a fragment further inside
+        ("page" -> "DuPage"). Results are ordered by name length, then table order.
+
+        Args:
+            terms: Lowercased search words
+            max_results: Maximum number of results to return (None or 0 for all)
+
+        Returns:
+            List of (name, code) tuples, shortest name first
+        """
+        words_by_term = sorted(
+            (self._infix_words(term) for term in self._canonical(terms)),
+            key=lambda words: sum(len(self.postings[word]) for word in words)
+        )
+        if not words_by_term or not words_by_term[0]:
+            return []
+
+        # Start from the rarest term and keep entries that contain each remaining term
+        candidates: Set[int] = set()
+        for word in words_by_term[0]:
+            candidates.update(self.postings[word])
+        for words in words_by_term[1:]:
+            candidates = {entry_id for entry_id in candidates if not self.entry_tokens[entry_id].isdisjoint(words)}
+        ranked = sorted(candidates, key=lambda entry_id: (len(self.names[entry_id]), entry_id))
+        if max_results and max_results > 0:
+            ranked = ranked[:max_results]
+        return [(self.names[entry_id], self.codes[entry_id]) for entry_id in ranked]
@@ -0,0 +1,326 @@
+import argparse
+import csv
+import gzip
+import hashlib
+import json
+import os
+from array import array
+from datetime import datetime, timezone
+from functools import lru_cache
+from pathlib import Path
+from typing import Dict, List, Optional, Any, Tuple
+
+from tools.common.lookup_index import LookupIndex, tokenize
+
+"""
+Lookup Table Artifacts
+
+This module builds and loads versioned lookup-table artifacts for the search tools:
+Census places, counties and CBSAs, QCEW areas and industries, and OEWS areas and
+occupations. The build reads local copies of the official source files and writes one
+gzipped, column-oriented file per table with codes, names, normalized names and
+pre-tokenized words, plus a manifest naming the current vintage of each table:
+
+    python -m tools.common.lookup_tables --vintage 2023 \\
+        --place-gazetteer 2023_Gaz_place_national.txt \\
+        --county-gazetteer 2023_Gaz_counties_national.txt \\
+        --cbsa-gazetteer 2023_Gaz_cbsa_national.txt \\
+        --qcew-areas area-titles-csv.csv --qcew-industries industry-titles-csv.csv \\
+        --oews-areas oe.area --oews-occupations oe.occupation
+
+When a table has an artifact, the _get_*_data() functions in the search modules return
+it instead of their built-in literal, and the lookup indexes reuse its tokens.
+"""
+
+# Table name -> whether the search module's dict is keyed by name (Census tables) or by code (BLS tables)
+LOOKUP_TABLES = {
+    "place": "name",
+    "county": "name",
+    "msa": "name",
+    "qcew_area": "code",
+    "naics": "code",
+    "oews_area": "code",
+    "soc": "code",
+}
+
+ARTIFACT_FORMAT = 1
+
+_data_dir = Path(os.getenv("LOOKUP_TABLE_DATA_DIR", Path(__file__).resolve().parents[2] / "data" / "lookup"))
+
+
+def normalize_name(name: str) -> str:
+    """Lowercase, strip accents and collapse punctuation ("Cañon City city" -> "canon city city")."""
+    # tokenize() folds accents, as the lookup index does for query terms
+    return " ".join(tokenize(name))
+
+
+class LookupTable:
+    """
+    One loaded lookup-table artifact.
+
+    Tokens are stored once in a vocabulary with each row's words as an offset range into
+    a flat array of vocabulary ids.
+    """
+
+    def __init__(self, table: str, payload: Dict[str, Any]):
+        self.table = table
+        self.vintage: str = payload["vintage"]
+        self.codes: Tuple[str, ...] = tuple(payload["codes"])
+        self.names: Tuple[str, ...] = tuple(payload["names"])
+        self.normalized_names: Tuple[str, ...] = tuple(payload["normalized_names"])
+        self.vocabulary: Tuple[str, ...] = tuple(payload["vocabulary"])
+        self.token_ids = array("I", payload["token_ids"])
+        self.token_offsets = array("I", payload["token_offsets"])
+        self._as_dict: Optional[Dict[str, str]] = None
+
+    def __len__(self) -> int:
+        return len(self.codes)
+
+    def tokens(self, row_id: int) -> List[str]:
+        """Pre-tokenized words of one row's name."""
+        start, end = self.token_offsets[row_id], self.token_offsets[row_id + 1]
+        return [self.vocabulary[token_id] for token_id in self.token_ids[start:end]]
+
+    def as_dict(self) -> Dict[str, str]:
+        """The table in the shape the search module's _get_*_data() returns, built on first use."""
+        if self._as_dict is None:
+            if LOOKUP_TABLES[self.table] == "name":
+                self._as_dict = dict(zip(self.names, self.codes))
+            else:
+                self._as_dict = dict(zip(self.codes, self.names))
+        return self._as_dict
+
+    def lookup_index(self, **kwargs) -> LookupIndex:
+        """Build a LookupIndex over (name, code) entries from the stored tokens."""
+        return LookupIndex(
+            zip(self.names, self.codes),
+            tokens=[self.tokens(row_id) for row_id in range(len(self))],
+            **kwargs
+        )
+
+
+def set_lookup_data_dir(data_dir: str) -> None:
+    """Point the loaders at a directory of artifacts and drop any loaded tables."""
+    global _data_dir
+    _data_dir = Path(data_dir)
+    _read_manifest.cache_clear()
+    load_lookup_table.cache_clear()
+
+
+@lru_cache(maxsize=1)
+def _read_manifest() -> Dict[str, Any]:
+    path = _data_dir / "manifest.json"
+    if not path.exists():
+        return {"tables": {}}
+    with open(path) as handle:
+        return json.load(handle)
+
+
+@lru_cache(maxsize=None)
+def load_lookup_table(table: str) -> Optional[LookupTable]:
+    """
+    Load the current artifact for a table, or None when no artifact has been built.
+
+    The search modules fall back to their built-in tables when this returns None.
+    """
+    entry = _read_manifest().get("tables", {}).get(table)
+    if not entry:
+        return None
+    with gzip.open(_data_dir / entry["file"], "rt", encoding="utf-8") as handle:
+        payload = json.load(handle)
+    if payload.get("format") != ARTIFACT_FORMAT:
+        return None
+    return LookupTable(table, payload)
+
+
+def lookup_table_status() -> Dict[str, Any]:
+    """Vintage and row count of each built table, for health reporting."""
+    return {
+        table: {"vintage": entry["vintage"], "rows": entry["rows"]}
+        for table, entry in _read_manifest().get("tables", {}).items()
+    }
+
+
+def _read_delimited(path: str, delimiter: str) -> List[Dict[str, str]]:
+    with open(path, newline="", encoding="utf-8-sig") as handle:
+        return [
+            {key.strip(): (value or "").strip() for key, value in row.items() if key}
+            for row in csv.DictReader(handle, delimiter=delimiter)
+        ]
+
+
+def _state_names() -> Dict[str, str]:
+    from tools.acs_data.fips_census_state import _get_state_abbreviation_data
+    return _get_state_abbreviation_data()
+
+
+def _place_counties(path: Optional[str]) -> Dict[str, str]:
+    """Place GEOID -> first county name, from the Census place-by-county file."""
+    if not path:
+        return {}
+    counties = {}
+    for row in _read_delimited(path, "|"):
+        counties.setdefault(row["STATEFP"] + row["PLACEFP"], row["COUNTYNAME"])
+    return counties
+
+
+def _build_places(path: str, place_county: Optional[str] = None) -> List[Tuple[str, str]]:
+    states = _state_names()
+    counties = _place_counties(place_county)
+    rows = [row for row in _read_delimited(path, "\t") if row["USPS"] in states]
+
+    # Census names repeat within a state (two "Oak Grove CDP"s); qualify those by county
+    seen: Dict[str, int] = {}
+    for row in rows:
+        key = f"{row['NAME']}, {states[row['USPS']]}"
+        seen[key] = seen.get(key, 0) + 1
+
+    entries = []
+    for row in rows:
+        name = row["NAME"]
+        if seen[f"{name}, {states[row['USPS']]}"] > 1:
+            name = f"{name} ({counties.get(row['GEOID'], row['GEOID'])})"
+        entries.append((row["GEOID"][2:], f"{name}, {states[row['USPS']]}"))
+    return entries
+
+
+def _build_counties(path: str) -> List[Tuple[str, str]]:
+    states = _state_names()
+    return [
+        (row["GEOID"][2:], f"{row['NAME']}, {states[row['USPS']]}")
+        for row in _read_delimited(path, "\t")
+        if row["USPS"] in states
+    ]
+
+
+def _build_cbsas(path: str) -> List[Tuple[str, str]]:
+    return [(row["GEOID"], row["NAME"]) for row in _read_delimited(path, "\t")]
+
+
+def _build_qcew_areas(path: str) -> List[Tuple[str, str]]:
+    return [(row["area_fips"], row["area_title"]) for row in _read_delimited(path, ",")]
+
+
+def _build_qcew_industries(path: str) -> List[Tuple[str, str]]:
+    return [(row["industry_code"], row["industry_title"]) for row in _read_delimited(path, ",")]
+
+
+def _build_oews_areas(path: str) -> List[Tuple[str, str]]:
+    return [(row["area_code"], row["area_name"]) for row in _read_delimited(path, "\t")]
+
+
+def _build_oews_occupations(path: str) -> List[Tuple[str, str]]:
+    return [(row["occupation_code"], row["occupation_name"]) for row in _read_delimited(path, "\t")]
+
+
+def _artifact_payload(table: str, vintage: str, entries: List[Tuple[str, str]]) -> Dict[str, Any]:
+    # County and place codes are state-relative ("031" is a county in many states), so rows are
+    # deduplicated on (code, name) rather than keyed by code. Sorting keeps the artifact
+    # byte-identical across rebuilds of the same sources.
+    entries = sorted(set(entries))
+    normalized_names = [normalize_name(name) for _, name in entries]
+
+    vocabulary: Dict[str, int] = {}
+    token_ids: List[int] = []
+    token_offsets = [0]
+    for normalized in normalized_names:
+        for token in normalized.split():
+            token_ids.append(vocabulary.setdefault(token, len(vocabulary)))
+        token_offsets.append(len(token_ids))
+
+    return {
+        "format": ARTIFACT_FORMAT,
+        "table": table,
+        "vintage": vintage,
+        "codes": [code for code, _ in entries],
+        "names": [name for _, name in entries],
+        "normalized_names": normalized_names,
+        "vocabulary": list(vocabulary),
+        "token_ids": token_ids,
+        "token_offsets": token_offsets,
+    }
+
+
+def _file_digest(path: str) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as handle:
+        for chunk in iter(lambda: handle.read(1 << 20), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def build_lookup_tables(output_dir: str, vintage: str, sources: Dict[str, str], place_county: Optional[str] = None) -> Dict[str, int]:
+    """
+    Build lookup-table artifacts from local source files and update the manifest.
+
+    Args:
+        output_dir: Directory to write artifacts and manifest.json to
+        vintage: Label for this build (e.g., "2023"); part of each artifact's file name
+        sources: Table name -> source file path (see LOOKUP_TABLES for table names)
+        place_county: Optional Census place-by-county file used to qualify duplicate place names
+
+    Returns:
+        Dict mapping each built table to its row count
+    """
+    builders = {
+        "place": lambda path: _build_places(path, place_county),
+        "county": _build_counties,
+        "msa": _build_cbsas,
+        "qcew_area": _build_qcew_areas,
+        "naics": _build_qcew_industries,
+        "oews_area": _build_oews_areas,
+        "soc": _build_oews_occupations,
+    }
+    output = Path(output_dir)
+    output.mkdir(parents=True, exist_ok=True)
+    manifest_path = output / "manifest.json"
+    manifest = json.loads(manifest_path.read_text()) if manifest_path.exists() else {"tables": {}}
+
+    built = {}
+    for table, source in sources.items():
+        if table not in builders or not source:
+            continue
+        payload = _artifact_payload(table, vintage, builders[table](source))
+        file_name = f"{table}-{vintage}.json.gz"
+        with open(output / file_name, "wb") as raw, gzip.GzipFile(fileobj=raw, mode="wb", mtime=0) as handle:
+            handle.write(json.dumps(payload, separators=(",", ":"), ensure_ascii=False).encode("utf-8"))
+
+        manifest["tables"][table] = {
+            "vintage": vintage,
+            "file": file_name,
+            "rows": len(payload["codes"]),
+            "source": os.path.basename(source),
+            "source_sha256": _file_digest(source),
+            "built_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        }
+        built[table] = len(payload["codes"])
+
+    manifest_path.write_text(json.dumps(manifest, indent=2, sort_keys=True) + "\n")
+    return built
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Build lookup-table artifacts from Census and BLS source files")
+    parser.add_argument("--vintage", required=True, help="Label for this build, e.g. 2023")
+    parser.add_argument("--place-gazetteer", help="Census places gazetteer file (tab-delimited)")
+    parser.add_argument("--place-county", help="Census place-by-county file, used to qualify duplicate place names")
+    parser.add_argument("--county-gazetteer", help="Census counties gazetteer file (tab-delimited)")
+    parser.add_argument("--cbsa-gazetteer", help="Census CBSA gazetteer file (tab-delimited)")
+    parser.add_argument("--qcew-areas", help="BLS QCEW area titles CSV")
+    parser.add_argument("--qcew-industries", help="BLS QCEW industry titles CSV")
+    parser.add_argument("--oews-areas", help="BLS OEWS oe.area file (tab-delimited)")
+    parser.add_argument("--oews-occupations", help="BLS OEWS oe.occupation file (tab-delimited)")
+    parser.add_argument("--output-dir", default=str(_data_dir), help="Directory to write artifacts to")
+    args = parser.parse_args()
+
+    table_sources = {
+        "place": args.place_gazetteer,
+        "county": args.county_gazetteer,
+        "msa": args.cbsa_gazetteer,
+        "qcew_area": args.qcew_areas,
+        "naics": args.qcew_industries,
+        "oews_area": args.oews_areas,
+        "soc": args.oews_occupations,
+    }
+    for table_name, count in build_lookup_tables(args.output_dir, args.vintage, table_sources, args.place_county).items():
+        print(f"{table_name}: {count} rows")
@@ -0,0 +1,100 @@
+from functools import lru_cache
+from typing import Dict, List, Tuple, Iterable
+
+from tools.common.lookup_index import tokenize
+
+"""
+Name Normalization
+
+This module holds the alias and abbreviation tables behind the geography lookups. Word
+abbreviations ("St." -> "saint", "Ft." -> "fort") are canonicalized on both sides: once
+per name when a LookupIndex is built (via its word_aliases) and once per query. Query-only
+rules expand common nicknames ("nyc"), trailing state postal codes ("springfield il") and
+mark place-type words ("city", "county") as optional so they rank matches without being
+required in the name.
+"""
+
+# Abbreviated words -> the canonical word used in every geography index
+WORD_ALIASES: Dict[str, str] = {
+    "st": "saint",
+    "ste": "sainte",
+    "ft": "fort",
+    "mt": "mount",
+    "mtn": "mountain",
+    "pt": "point",
+    "hts": "heights",
+    "spgs": "springs",
+    "jct": "junction",
+    "twp": "township",
+}
+
+# Whole-query nicknames -> the words of the official name
+PHRASE_ALIASES: Dict[str, List[str]] = {
+    "nyc": ["new", "york", "city"],
+    "dc": ["washington", "district", "of", "columbia"],
+    "philly": ["philadelphia"],
+    "vegas": ["las", "vegas"],
+    "slc": ["salt", "lake", "city"],
+    "okc": ["oklahoma", "city"],
+    "nola": ["new", "orleans"],
+}
+
+# Words naming the kind of geography rather than the geography itself
+PLACE_TYPE_WORDS = frozenset({
+    "city", "town", "village", "borough", "township", "cdp", "county", "parish",
+    "municipality", "metro", "micro", "area", "msa",
+})
+
+
+def normalize_words(words: Iterable[str]) -> List[str]:
+    """Canonicalize abbreviated words in a list of lowercased tokens ("st", "louis" -> "saint", "louis")."""
+    return [WORD_ALIASES.get(word, word) for word in words]
+
+
+@lru_cache(maxsize=1)
+def _postal_code_words() -> Dict[str, List[str]]:
+    """Lowercased state postal code -> lowercased words of the state name."""
+    # Imported here so tools.common does not depend on the data packages at import time
+    from tools.acs_data.fips_census_state import _get_state_abbreviation_data
+    return {code.lower(): tokenize(name) for code, name in _get_state_abbreviation_data().items()}
+
+
+def normalize_query(text: str, expand_postal_codes: bool = True) -> Tuple[List[str], List[str]]:
+    """
+    Normalize one geography search query.
+
+    Nicknames are expanded to the official name, a trailing state postal code is spelled
+    out when expand_postal_codes is set (for names that carry full state names), and
+    abbreviations are canonicalized. Place-type words are returned separately as optional
+    terms unless the query consists only of them.
+
+    Args:
+        text: Query as typed (e.g., "St. Louis city MO", "nyc")
+        expand_postal_codes: Replace a trailing postal code with the state name
+
+    Returns:
+        Tuple of (required terms, optional terms)
+    """
+    words = tokenize(text)
+    expanded = []
+    for word in words:
+        # "washington dc" only gains the words it lacks; "las vegas" stays as it is
+        others = set(words) - {word}
+        expanded.extend(alias for alias in PHRASE_ALIASES.get(word, [word]) if alias not in others)
+    words = expanded
+
+    if expand_postal_codes and len(words) > 1 and words[-1] in _postal_code_words():
+        words = words[:-1] + _postal_code_words()[words[-1]]
+
+    words = normalize_words(words)
+    required = [word for word in words if word not in PLACE_TYPE_WORDS]
+    optional = [word for word in words if word in PLACE_TYPE_WORDS]
+    if not required:
+        return optional, []
+    return required, optional
+
+
+if __name__ == "__main__":
+    print(normalize_query("St. Louis city MO"))
+    print(normalize_query("nyc"))
+    print(normalize_query("Atlanta GA Metro Area", expand_postal_codes=False))
@@ -0,0 +1,206 @@
+from typing import Dict, List, Optional, Any
+
+import numpy as np
+
+"""
+Regional Metrics
+
+This module computes location quotients, Hachman and Herfindahl-Hirschman (HHI)
+concentration indexes and shift-share components on numeric matrices indexed by
+(area, code), where codes are industries or occupations. Every metric is computed for the
+whole matrix with array operations, so hundreds of areas by hundreds of codes read from a
+bulk store cost a few vector passes instead of nested dict loops.
+
+Missing cells are NaN: they stay NaN in per-cell results and count as zero in per-area
+totals. Divisions by zero yield 0, matching the LQ conventions of the QCEW and OEWS tools.
+"""
+
+
+def _safe_divide(numerator: np.ndarray, denominator: Any) -> np.ndarray:
+    """numerator / denominator, with 0 wherever the denominator is not positive."""
+    numerator, denominator = np.broadcast_arrays(np.asarray(numerator, dtype=float), np.asarray(denominator, dtype=float))
+    result = np.zeros(numerator.shape)
+    np.divide(numerator, denominator, out=result, where=denominator > 0)
+    # Keep missing cells missing rather than silently zero
+    result[np.isnan(numerator)] = np.nan
+    return result
+
+
+def matrix_from_nested(
+    data: Dict[str, Dict[str, Dict[str, Any]]],
+    areas: List[str],
+    codes: List[str],
+    field: str
+) -> np.ndarray:
+    """
+    Build an (area, code) matrix from nested area -> code -> record dicts.
+
+    Args:
+        data: e.g., {"17043": {"1013": {"employees": 1200, ...}}}
+        areas: Row order
+        codes: Column order
+        field: Record key to read (e.g., "employees")
+
+    Returns:
+        float array of shape (len(areas), len(codes)) with NaN for missing cells
+    """
+    matrix = np.full((len(areas), len(codes)), np.nan)
+    columns = {code: column for column, code in enumerate(codes)}
+    for row, area in enumerate(areas):
+        for code, record in data.get(area, {}).items():
+            column = columns.get(code)
+            if column is not None and record.get(field) is not None:
+                matrix[row, column] = record[field]
+    return matrix
+
+
+def fill_nested(
+    data: Dict[str, Dict[str, Dict[str, Any]]],
+    areas: List[str],
+    codes: List[str],
+    field: str,
+    matrix: np.ndarray,
+    digits: Optional[int] = 2
+) -> None:
+    """Write matrix values into the records that exist in nested area -> code -> record dicts."""
+    for row, area in enumerate(areas):
+        records = data.get(area, {})
+        for column, code in enumerate(codes):
+            record = records.get(code)
+            value = matrix[row, column]
+            if record is not None and not np.isnan(value):
+                record[field] = round(float(value), digits) if digits is not None else float(value)
+
+
+def location_quotients(
+    local: np.ndarray,
+    local_totals: np.ndarray,
+    national: np.ndarray,
+    national_total: float
+) -> np.ndarray:
+    """
+    Location quotients for every (area, code) cell.
+
+    LQ = (local value / local total) / (national value / national total)
+
+    Args:
+        local: (areas, codes) values
+        local_totals: (areas,) all-industry or all-occupation totals per area
+        national: (codes,) national values
+        national_total: National all-industry or all-occupation total
+
+    Returns:
+        (areas, codes) LQs; 0 where a share is undefined, NaN where local is missing
+    """
+    local_shares = _safe_divide(local, np.asarray(local_totals, dtype=float)[:, None])
+    national_shares = _safe_divide(national, national_total)
+    return _safe_divide(local_shares, np.nan_to_num(national_shares)[None, :])
+
+
+def herfindahl_index(local: np.ndarray) -> np.ndarray:
+    """
+    Herfindahl-Hirschman index per area: the sum of squared code shares of the area's
+    total across the given codes, from 1/len(codes) (even) to 1 (a single code).
+    """
+    values = np.nan_to_num(local)
+    shares = _safe_divide(values, values.sum(axis=1)[:, None])
+    return (shares ** 2).sum(axis=1)
+
+
+def hachman_index(local: np.ndarray, national: np.ndarray) -> np.ndarray:
+    """
+    Hachman index per area: 1 / sum(local share * LQ) across the given codes, from near
+    0 (specialized) to 1 (the area's mix matches the nation's). 0 for areas with no values.
+    """
+    values = np.nan_to_num(local)
+    national = np.nan_to_num(np.asarray(national, dtype=float))
+    local_shares = _safe_divide(values, values.sum(axis=1)[:, None])
+    lqs = _safe_divide(local_shares, _safe_divide(national, national.sum())[None, :])
+    return _safe_divide(np.ones(len(values)), (local_shares * lqs).sum(axis=1))
+
+
+def shift_share(
+    base: np.ndarray,
+    current: np.ndarray,
+    national_base: np.ndarray,
+    national_current: np.ndarray,
+    national_total_base: Optional[float] = None,
+    national_total_current: Optional[float] = None
+) -> Dict[str, np.ndarray]:
+    """
+    Classic three-part shift-share decomposition of the change in every (area, code) cell.
+
+    national_share = base * G; industry_mix = base * (g_code - G); regional_shift =
+    base * (r - g_code), where G is total national growth, g_code national growth in the
+    code and r local growth in the cell. The three parts sum to current - base. A cell
+    missing either period (NaN: suppressed or unpublished) has NaN change and components;
+    a cell with a real zero base puts all of its change in the regional shift.
+
+    Args:
+        base, current: (areas, codes) values in the base and current periods
+        national_base, national_current: (codes,) national values in both periods
+        national_total_base, national_total_current: National all-code totals; default to
+                                                     the sums over the given codes
+
+    Returns:
+        Dict of (areas, codes) arrays: "change", "national_share", "industry_mix", "regional_shift"
+    """
+    base = np.asarray(base, dtype=float)
+    current = np.asarray(current, dtype=float)
+    missing = np.isnan(base) | np.isnan(current)
+    national_base = np.nan_to_num(np.asarray(national_base, dtype=float))
+    national_current = np.nan_to_num(np.asarray(national_current, dtype=float))
+    total_base = national_base.sum() if national_total_base is None else national_total_base
+    total_current = national_current.sum() if national_total_current is None else national_total_current
+
+    overall_growth = total_current / total_base - 1 if total_base > 0 else 0.0
+    code_growth = np.where(national_base > 0, _safe_divide(national_current, national_base) - 1, 0.0)
+    local_growth = np.where(base > 0, _safe_divide(current, base) - 1, 0.0)
+
+    national_share = base * overall_growth
+    industry_mix = base * (code_growth[None, :] - overall_growth)
+    # Cells with a zero base-period value put all of their change in the regional shift
+    regional_shift = np.where(base > 0, base * (local_growth - code_growth[None, :]), current)
+    components = {
+        "change": current - base,
+        "national_share": national_share,
+        "industry_mix": industry_mix,
+        "regional_shift": regional_shift,
+    }
+    for values in components.values():
+        values[missing] = np.nan
+    return components
+
+
+def period_growth(values: np.ndarray, lag: int) -> np.ndarray:
+    """
+    Growth over lag columns for every row of a (series, periods) matrix, e.g. lag=4 for
+    year-over-year growth of quarterly values. NaN where either value is missing or the
+    earlier value is not positive.
+    """
+    values = np.asarray(values, dtype=float)
+    growth = np.full(values.shape, np.nan)
+    if lag < values.shape[1]:
+        earlier, later = values[:, :-lag], values[:, lag:]
+        valid = (earlier > 0) & ~np.isnan(later)
+        np.divide(later, earlier, out=growth[:, lag:], where=valid)
+        growth[:, lag:][valid] -= 1
+    return growth
+
+
+def compound_annual_growth(values: np.ndarray, periods_per_year: int) -> np.ndarray:
+    """
+    CAGR per row of a (series, periods) matrix, from the latest value back to the earliest
+    value in the same period of the year (so quarterly rows compare like quarters). NaN
+    when a row spans less than a year or starts at a non-positive value.
+    """
+    values = np.asarray(values, dtype=float)
+    result = np.full(len(values), np.nan)
+    present = ~np.isnan(values)
+    for row in np.flatnonzero(present.any(axis=1)):
+        last = np.flatnonzero(present[row])[-1]
+        first = np.flatnonzero(present[row, last % periods_per_year::periods_per_year])[0] * periods_per_year + last % periods_per_year
+        years = (last - first) / periods_per_year
+        if years >= 1 and values[row, first] > 0:
+            result[row] = (values[row, last] / values[row, first]) ** (1 / years) - 1
+    return result
@@ -0,0 +1,416 @@
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from typing import Callable, Dict, Optional, Any
+from urllib.parse import urlparse
+
+import requests
+
+from tools.common.cache import TTLCache
+
+"""
+Upstream Request Policy
+
+This module is the one place that decides how the data tools talk to their upstream APIs
+(Census, BLS, Urban Institute IPEDS, OpenEI). Each host has a policy: how many attempts
+a request gets, which HTTP statuses are worth retrying, the backoff between attempts
+(exponential with full jitter, honoring Retry-After), the default timeout and, for
+idempotent GETs, an optional hedge delay after which a duplicate request is sent and the
+first good response wins. Hedging trims tail latency on hosts with occasional slow
+responses; it is off for POSTs and for hosts that meter every request.
+
+Each host also has a circuit breaker. After breaker_failure_threshold consecutive failed
+attempts (connection errors, timeouts or 5xx) the circuit opens: requests fail fast with
+UpstreamUnavailableError, or get the last good response for the same GET when one is
+cached (marked with a "Warning: 110" header), instead of tying up a worker on a sick host.
+While open, a background thread re-sends the last failed GET every breaker_open_seconds
+(doubling up to breaker_max_open_seconds) and closes the circuit once it succeeds; hosts
+with no GET to probe let one live request through after the wait.
+
+Per-host counters (attempts, retries, hedges, failures, fast failures, stale responses) and
+circuit states are kept for the /health endpoint.
+"""
+
+# Statuses that usually clear on their own, including Cloudflare's origin timeouts (522, 524)
+RETRYABLE_STATUSES = frozenset({429, 500, 502, 503, 504, 522, 524})
+
+_DEFAULT_POLICY: Dict[str, Any] = {
+    "max_attempts": 3,
+    "backoff_base_seconds": 0.5,
+    "backoff_max_seconds": 8.0,
+    "timeout_seconds": 30,
+    "hedge_after_seconds": None,
+    # Cap on the whole call, across attempts and backoff (None: attempts x timeout)
+    "deadline_seconds": None,
+    "breaker_failure_threshold": 5,
+    "breaker_open_seconds": 30.0,
+    "breaker_max_open_seconds": 300.0,
+    # How long a good GET response is kept to serve while the circuit is open (0 disables)
+    "stale_ttl_seconds": 24 * 60 * 60,
+}
+
+# Per-host overrides of the default policy
+_HOST_POLICIES: Dict[str, Dict[str, Any]] = {
+    "api.census.gov": {"max_attempts": 3, "timeout_seconds": 30, "hedge_after_seconds": 3.0},
+    # Every BLS API query counts against the daily key budget, so no hedging
+    "api.bls.gov": {"max_attempts": 2, "timeout_seconds": 60},
+    "data.bls.gov": {"max_attempts": 3, "timeout_seconds": 120},
+    # The IPEDS API has spells of Cloudflare 524s (Cloudflare gives up on the origin after 100
+    # seconds), so one attempt never needs longer, the call is capped and the circuit opens early
+    "educationdata.urban.org": {
+        "max_attempts": 4, "timeout_seconds": 100, "deadline_seconds": 120, "backoff_base_seconds": 1.0,
+        "breaker_failure_threshold": 3, "breaker_open_seconds": 60.0,
+    },
+    "api.eia.gov": {"max_attempts": 3, "timeout_seconds": 30},
+}
+
+_STATS: Dict[str, Dict[str, int]] = {}
+_STATS_LOCK = threading.Lock()
+
+# Last good GET responses by (url, params), served while a host's circuit is open
+_STALE_RESPONSES = TTLCache(ttl_seconds=_DEFAULT_POLICY["stale_ttl_seconds"], max_entries=512)
+
+# Larger bodies are not kept for stale fallback
+_STALE_MAX_BYTES = 2 * 1024 * 1024
+
+# Shared pool for hedged GETs: each hedged call uses at most two workers
+_HEDGE_EXECUTOR = ThreadPoolExecutor(max_workers=16, thread_name_prefix="upstream-hedge")
+
+
+class UpstreamUnavailableError(requests.ConnectionError):
+    """Raised without contacting the host while its circuit is open."""
+
+
+class CircuitBreaker:
+    """
+    Consecutive-failure circuit breaker for one host.
+
+    Closed: requests flow and failures are counted. Open: requests are refused until a
+    background probe succeeds (or, with nothing to probe, until the open period ends and
+    one trial request is let through in the half-open state).
+    """
+
+    def __init__(self, host: str):
+        self.host = host
+        self.state = "closed"
+        self.consecutive_failures = 0
+        self.opened_at: Optional[float] = None
+        self.open_seconds = 0.0
+        self.last_error: Optional[str] = None
+        self._probe: Optional[Dict[str, Any]] = None
+        self._probing = False
+        self._lock = threading.Lock()
+
+    def allow(self) -> bool:
+        """Whether a request may be sent now."""
+        with self._lock:
+            if self.state == "closed":
+                return True
+            if self.state == "open" and not self._probing and time.monotonic() - self.opened_at >= self.open_seconds:
+                # No background probe: let this one request test the host
+                self.state = "half_open"
+                return True
+            return False
+
+    def record_success(self) -> None:
+        with self._lock:
+            self.state = "closed"
+            self.consecutive_failures = 0
+            self.opened_at = None
+            self.last_error = None
+
+    def record_failure(self, error: str, policy: Dict[str, Any], probe: Optional[Dict[str, Any]] = None) -> None:
+        with self._lock:
+            self.consecutive_failures += 1
+            self.last_error = error
+            if probe is not None:
+                self._probe = probe
+            if self.state == "half_open":
+                self._open(min(self.open_seconds * 2, policy["breaker_max_open_seconds"]))
+            elif self.state == "closed" and self.consecutive_failures >= policy["breaker_failure_threshold"]:
+                self._open(policy["breaker_open_seconds"])
+            else:
+                return
+            start_probe = self._probe is not None and not self._probing
+            if start_probe:
+                self._probing = True
+        if start_probe:
+            threading.Thread(target=self._probe_until_closed, args=(policy,), name=f"upstream-probe-{self.host}", daemon=True).start()
+
+    def _open(self, open_seconds: float) -> None:
+        self.state = "open"
+        self.opened_at = time.monotonic()
+        self.open_seconds = open_seconds
+        _count(self.host, "circuit_opens")
+
+    def _probe_until_closed(self, policy: Dict[str, Any]) -> None:
+        """Re-send the last failed GET after each open period until the host answers."""
+        while True:
+            with self._lock:
+                wait_seconds = self.opened_at + self.open_seconds - time.monotonic()
+            if wait_seconds > 0:
+                time.sleep(wait_seconds)
+            _count(self.host, "probes")
+            healthy = False
+            try:
+                response = requests.request(**self._probe)
+                healthy = response.status_code < 500
+                response.close()
+            except Exception:
+                # Any probe error keeps the circuit open; the thread must not die while open
+                pass
+            with self._lock:
+                if healthy:
+                    self.state = "closed"
+                    self.consecutive_failures = 0
+                    self.opened_at = None
+                    self.last_error = None
+                    self._probing = False
+                    return
+                self._open(min(self.open_seconds * 2, policy["breaker_max_open_seconds"]))
+
+    def status(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "state": self.state,
+                "consecutive_failures": self.consecutive_failures,
+                "open_seconds": self.open_seconds if self.state != "closed" else None,
+                "retry_in_seconds": round(max(0.0, self.opened_at + self.open_seconds - time.monotonic()), 1) if self.opened_at else None,
+                "probing": self._probing,
+                "last_error": self.last_error,
+            }
+
+
+_BREAKERS: Dict[str, CircuitBreaker] = {}
+_BREAKERS_LOCK = threading.Lock()
+
+
+def _breaker(host: str) -> CircuitBreaker:
+    with _BREAKERS_LOCK:
+        if host not in _BREAKERS:
+            _BREAKERS[host] = CircuitBreaker(host)
+        return _BREAKERS[host]
+
+
+def _stale_key(method: str, url: str, kwargs: Dict[str, Any]) -> Optional[tuple]:
+    if method.upper() != "GET" or kwargs.get("stream"):
+        return None
+    params = kwargs.get("params")
+    return (url, repr(sorted(params.items())) if isinstance(params, dict) else repr(params))
+
+
+def _remember(key: Optional[tuple], response: requests.Response, policy: Dict[str, Any]) -> None:
+    if key is None or not policy["stale_ttl_seconds"] or response.status_code != 200:
+        return
+    if len(response.content) <= _STALE_MAX_BYTES:
+        _STALE_RESPONSES.set(key, (response.status_code, dict(response.headers), response.content, response.encoding, response.url), ttl_seconds=policy["stale_ttl_seconds"])
+
+
+def _stale_response(key: Optional[tuple], host: str) -> Optional[requests.Response]:
+    """A fresh Response rebuilt from the last good answer for key, marked stale."""
+    entry = _STALE_RESPONSES.get(key) if key is not None else None
+    if entry is None:
+        return None
+    status_code, headers, content, encoding, url = entry
+    response = requests.Response()
+    response.status_code = status_code
+    response.headers.update(headers)
+    response.headers["Warning"] = '110 - "Response is Stale"'
+    response._content = content
+    response.encoding = encoding
+    response.url = url
+    _count(host, "stale_served")
+    return response
+
+
+def configure_upstream(policies: Optional[Dict[str, Dict[str, Any]]] = None, default: Optional[Dict[str, Any]] = None) -> None:
+    """Override per-host policies (host -> settings) and the default policy for other hosts."""
+    if default:
+        _DEFAULT_POLICY.update(default)
+    for host, settings in (policies or {}).items():
+        _HOST_POLICIES.setdefault(host, {}).update(settings)
+
+
+def get_policy(url: str) -> Dict[str, Any]:
+    """Effective policy for the host of url."""
+    return dict(_DEFAULT_POLICY, **_HOST_POLICIES.get(urlparse(url).hostname or "", {}))
+
+
+def _count(host: str, counter: str) -> None:
+    with _STATS_LOCK:
+        stats = _STATS.setdefault(host, {
+            "requests": 0, "attempts": 0, "retries": 0, "hedges": 0, "hedge_wins": 0, "failures": 0,
+            "fast_failures": 0, "stale_served": 0, "circuit_opens": 0, "probes": 0,
+        })
+        stats[counter] += 1
+
+
+def _backoff_seconds(policy: Dict[str, Any], attempt: int, response: Optional[requests.Response]) -> float:
+    """Full-jitter exponential backoff, or the server's Retry-After when it asks for longer."""
+    delay = random.uniform(0, min(policy["backoff_max_seconds"], policy["backoff_base_seconds"] * 2 ** attempt))
+    retry_after = response.headers.get("Retry-After") if response is not None else None
+    if retry_after and retry_after.isdigit():
+        delay = max(delay, min(float(retry_after), policy["backoff_max_seconds"]))
+    return delay
+
+
+def _past_deadline(deadline: Optional[float], backoff: float) -> bool:
+    """Whether too little time is left before deadline to back off and try again."""
+    return deadline is not None and time.monotonic() + backoff + 1.0 >= deadline
+
+
+def _hedged(send: Callable[[], requests.Response], host: str, hedge_after: float) -> requests.Response:
+    """Send once, send a duplicate if no answer within hedge_after, return the first good answer."""
+    primary = _HEDGE_EXECUTOR.submit(send)
+    done, _ = wait([primary], timeout=hedge_after)
+    if done:
+        return primary.result()
+
+    _count(host, "hedges")
+    hedge = _HEDGE_EXECUTOR.submit(send)
+    pending = {primary, hedge}
+    outcome: Optional[Any] = None
+    while pending:
+        done, pending = wait(pending, return_when=FIRST_COMPLETED)
+        for future in done:
+            try:
+                response = future.result()
+            except requests.RequestException as e:
+                if outcome is None:
+                    outcome = e
+                continue
+            if response.status_code not in RETRYABLE_STATUSES:
+                if future is hedge:
+                    _count(host, "hedge_wins")
+                # The slower request is left to finish in the background and is ignored
+                return response
+            outcome = response
+    if isinstance(outcome, Exception):
+        raise outcome
+    return outcome
+
+
+def upstream_request(
+    method: str,
+    url: str,
+    on_retry: Optional[Callable[[], None]] = None,
+    **kwargs: Any
+) -> requests.Response:
+    """
+    Send an HTTP request under the host's policy.
+
+    Connection errors, timeouts and retryable statuses (429, 5xx) are retried with
+    jittered backoff up to max_attempts, within the host's deadline_seconds for the
+    whole call when one is set. GETs are hedged when the host policy sets
+    hedge_after_seconds. Other statuses are returned as-is for the caller to handle.
+    While the host's circuit is open, or once every attempt has failed, a GET is answered
+    from the last good response for the same URL and params when one is cached.
+
+    Args:
+        method: "GET" or "POST"
+        url: Request URL
+        on_retry: Called before each retry (e.g., to charge a metered API budget)
+        **kwargs: Passed to requests.request; timeout defaults to the host policy
+
+    Returns:
+        The final response (possibly a retryable status once attempts are used up)
+
+    Raises:
+        UpstreamUnavailableError: If the host's circuit is open and nothing stale is cached
+        requests.RequestException: If the last attempt failed without a response
+    """
+    policy = get_policy(url)
+    host = urlparse(url).hostname or ""
+    kwargs.setdefault("timeout", policy["timeout_seconds"])
+    attempt_timeout = kwargs["timeout"]
+    deadline = time.monotonic() + policy["deadline_seconds"] if policy["deadline_seconds"] else None
+    hedge_after = policy["hedge_after_seconds"] if method.upper() == "GET" and not kwargs.get("stream") else None
+    attempts = max(1, int(policy["max_attempts"]))
+    breaker = _breaker(host)
+    stale_key = _stale_key(method, url, kwargs)
+    # Only idempotent GETs are re-sent by the background probe
+    probe = dict(kwargs, method=method, url=url) if stale_key is not None else None
+    _count(host, "requests")
+
+    def send() -> requests.Response:
+        _count(host, "attempts")
+        return requests.request(method, url, **dict(kwargs, timeout=attempt_timeout))
+
+    def unavailable() -> requests.Response:
+        stale = _stale_response(stale_key, host)
+        if stale is not None:
+            return stale
+        _count(host, "fast_failures")
+        status = breaker.status()
+        raise UpstreamUnavailableError(
+            f"{host} is unavailable after repeated failures ({status['last_error']}); "
+            f"retrying in {status['retry_in_seconds'] or 0:.0f}s"
+        )
+
+    for attempt in range(attempts):
+        if not breaker.allow():
+            return unavailable()
+        if deadline is not None:
+            # No attempt may run past the deadline for the whole call
+            attempt_timeout = min(kwargs["timeout"], max(1.0, deadline - time.monotonic()))
+        response: Optional[requests.Response] = None
+        backoff = _backoff_seconds(policy, attempt, None)
+        last_attempt = attempt == attempts - 1
+        try:
+            response = _hedged(send, host, hedge_after) if hedge_after else send()
+            if response.status_code < 500:
+                breaker.record_success()
+            else:
+                breaker.record_failure(f"HTTP {response.status_code}", policy, probe)
+            if response.status_code not in RETRYABLE_STATUSES:
+                _remember(stale_key, response, policy)
+                return response
+        except (requests.ConnectionError, requests.Timeout) as e:
+            breaker.record_failure(type(e).__name__, policy, probe)
+            last_attempt = last_attempt or _past_deadline(deadline, backoff)
+            if last_attempt:
+                _count(host, "failures")
+                stale = _stale_response(stale_key, host)
+                if stale is not None:
+                    return stale
+                raise
+        if response is not None:
+            backoff = _backoff_seconds(policy, attempt, response)
+        if last_attempt or _past_deadline(deadline, backoff):
+            _count(host, "failures")
+            return _stale_response(stale_key, host) or response
+
+        _count(host, "retries")
+        if response is not None:
+            # Release the connection (streamed responses hold it open)
+            response.close()
+        if on_retry is not None:
+            on_retry()
+        time.sleep(backoff)
+
+
+def upstream_get(url: str, **kwargs: Any) -> requests.Response:
+    """GET under the host's retry and hedging policy (see upstream_request)."""
+    return upstream_request("GET", url, **kwargs)
+
+
+def upstream_post(url: str, **kwargs: Any) -> requests.Response:
+    """POST under the host's retry policy; POSTs are never hedged (see upstream_request)."""
+    return upstream_request("POST", url, **kwargs)
+
+
+def upstream_status() -> Dict[str, Any]:
+    """Default and per-host policies, circuit states and request, retry, hedge and failure counts."""
+    with _STATS_LOCK:
+        stats = {host: dict(counters) for host, counters in _STATS.items()}
+    with _BREAKERS_LOCK:
+        breakers = dict(_BREAKERS)
+    for host, breaker in breakers.items():
+        stats.setdefault(host, {})["circuit"] = breaker.status()
+    return {
+        "default_policy": dict(_DEFAULT_POLICY),
+        "host_policies": {host: get_policy(f"https://{host}/") for host in _HOST_POLICIES},
+        "stale_responses": len(_STALE_RESPONSES),
+        "hosts": stats,
+    }
@@ -0,0 +1,232 @@
+import csv
+import json
+import logging
+import os
+import threading
+import time
+from typing import Dict, List, Optional, Any
+
+from tools.common.upstream import upstream_get
+
+"""
+EIA Electricity Rate Store
+
+This module keeps local copies of the OpenEI utility rate by ZIP code files (investor-owned
+and non-investor-owned utilities) and an in-memory index of their rows keyed by ZIP code,
+so get_electricity_rates answers with dictionary lookups instead of downloading and
+scanning both CSVs on every call.
+
+A file is downloaded the first time it is needed. After refresh_interval_seconds it is
+revalidated with a conditional GET (If-None-Match / If-Modified-Since); a 304 keeps the
+local copy and index as they are, and a changed file is downloaded again and re-indexed.
+If revalidation fails, the local copy keeps being served. Each file is refreshed under its
+own lock while the current index keeps answering lookups; only a lookup with no index yet
+waits for the download.
+"""
+
+logger = logging.getLogger(__name__)
+
+RATE_FILES = {
+    "iou": "https://data.openei.org/files/6225/iou_zipcodes_2023.csv",
+    "non_iou": "https://data.openei.org/files/6225/non_iou_zipcodes_2023.csv",
+}
+
+_SETTINGS: Dict[str, Any] = {
+    "data_dir": os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "..", "data", "eia_rates"),
+    # The rate files are republished about once a year
+    "refresh_interval_seconds": 7 * 24 * 60 * 60,
+}
+
+# utility type -> {"zips": zip -> rows, "rows": row count, "checked_at": monotonic time of last validation}
+_INDEXES: Dict[str, Dict[str, Any]] = {}
+_LOCK = threading.Lock()
+# One refresh at a time per file
+_REFRESH_LOCKS = {utility_type: threading.Lock() for utility_type in RATE_FILES}
+
+
+def set_eia_rate_store(data_dir: str, refresh_interval_seconds: Optional[float] = None) -> None:
+    """Set the directory holding the rate files and how often they are revalidated."""
+    with _LOCK:
+        _SETTINGS["data_dir"] = data_dir
+        if refresh_interval_seconds is not None:
+            _SETTINGS["refresh_interval_seconds"] = refresh_interval_seconds
+        _INDEXES.clear()
+
+
+def _paths(utility_type: str) -> Dict[str, str]:
+    base = os.path.join(_SETTINGS["data_dir"], utility_type)
+    return {"csv": f"{base}.csv", "meta": f"{base}_meta.json"}
+
+
+def _read_meta(path: str) -> Dict[str, Any]:
+    try:
+        with open(path, encoding="utf-8") as handle:
+            return json.load(handle)
+    except (OSError, ValueError):
+        return {}
+
+
+def _download(utility_type: str) -> bool:
+    """
+    Fetch the file unless the server says the local copy is current.
+
+    Returns:
+        True if a new copy was written, False if the local copy was confirmed current
+
+    Raises:
+        requests.RequestException: If the download failed
+    """
+    paths = _paths(utility_type)
+    meta = _read_meta(paths["meta"]) if os.path.exists(paths["csv"]) else {}
+    headers = {}
+    if meta.get("etag"):
+        headers["If-None-Match"] = meta["etag"]
+    if meta.get("last_modified"):
+        headers["If-Modified-Since"] = meta["last_modified"]
+
+    response = upstream_get(RATE_FILES[utility_type], headers=headers, stream=True)
+    try:
+        if response.status_code == 304:
+            meta["checked_at"] = time.time()
+        else:
+            response.raise_for_status()
+            os.makedirs(_SETTINGS["data_dir"], exist_ok=True)
+            # Write beside the old copy and swap, so readers never see a partial file
+            temporary = f"{paths['csv']}.part"
+            with open(temporary, "wb") as handle:
+                for chunk in response.iter_content(chunk_size=1 << 20):
+                    handle.write(chunk)
+            os.replace(temporary, paths["csv"])
+            meta = {
+                "url": RATE_FILES[utility_type],
+                "etag": response.headers.get("ETag"),
+                "last_modified": response.headers.get("Last-Modified"),
+                "downloaded_at": time.time(),
+                "checked_at": time.time(),
+            }
+    finally:
+        response.close()
+
+    with open(paths["meta"], "w", encoding="utf-8") as handle:
+        json.dump(meta, handle, indent=2)
+    return response.status_code != 304
+
+
+def _build_index(utility_type: str) -> Dict[str, Any]:
+    """Read the local file once into ZIP code -> rows, each row tagged with its utility type."""
+    zips: Dict[str, List[Dict[str, str]]] = {}
+    rows = 0
+    with open(_paths(utility_type)["csv"], encoding="utf-8-sig", newline="") as handle:
+        for row in csv.DictReader(handle):
+            row["utility_type"] = utility_type
+            zips.setdefault(row.get("zip"), []).append(row)
+            rows += 1
+    return {"zips": zips, "rows": rows, "checked_at": time.monotonic()}
+
+
+def _refresh_index(utility_type: str) -> Dict[str, Any]:
+    """
+    Download or revalidate one file and return its index. Called under the file's refresh lock.
+
+    Raises:
+        requests.RequestException: If there is no local copy and the download failed
+    """
+    with _LOCK:
+        index = _INDEXES.get(utility_type)
+    paths = _paths(utility_type)
+    has_local_copy = os.path.exists(paths["csv"])
+    meta = _read_meta(paths["meta"])
+    fresh_on_disk = has_local_copy and time.time() - meta.get("checked_at", 0) < _SETTINGS["refresh_interval_seconds"]
+    changed = False
+    if not fresh_on_disk:
+        try:
+            changed = _download(utility_type)
+        except Exception as e:
+            if not has_local_copy:
+                raise
+            logger.warning(f"Error revalidating {utility_type} rate file, serving the local copy: {e}")
+
+    if index is None or changed:
+        index = _build_index(utility_type)
+    else:
+        index = dict(index, checked_at=time.monotonic())
+    with _LOCK:
+        _INDEXES[utility_type] = index
+    return index
+
+
+def _get_index(utility_type: str) -> Dict[str, Any]:
+    """
+    The ZIP index for one utility type, downloading or revalidating the file when due.
+
+    A due revalidation runs in the background while the current index is returned; only the
+    first lookup for a file, with no index yet, waits for it.
+
+    Raises:
+        requests.RequestException: If there is no local copy and the download failed
+    """
+    with _LOCK:
+        index = _INDEXES.get(utility_type)
+    if index is not None and time.monotonic() - index["checked_at"] < _SETTINGS["refresh_interval_seconds"]:
+        return index
+
+    refresh_lock = _REFRESH_LOCKS[utility_type]
+    if index is not None:
+        # Serve the current index; start a refresh unless one is already running
+        if refresh_lock.acquire(blocking=False):
+            threading.Thread(target=_refresh_in_background, args=(utility_type,), name=f"eia-rate-refresh-{utility_type}", daemon=True).start()
+        return index
+
+    with refresh_lock:
+        with _LOCK:
+            index = _INDEXES.get(utility_type)
+        if index is not None:
+            # Built by the lookup that held the lock before us
+            return index
+        return _refresh_index(utility_type)
+
+
+def _refresh_in_background(utility_type: str) -> None:
+    """Refresh one file's index, then release its refresh lock (acquired by the caller)."""
+    try:
+        _refresh_index(utility_type)
+    except Exception as e:
+        logger.warning(f"Error refreshing {utility_type} rate file: {e}")
+    finally:
+        _REFRESH_LOCKS[utility_type].release()
+
+
+def lookup_rates(zipcodes: List[str], utility_type: str) -> List[Dict[str, str]]:
+    """
+    Rate rows for the ZIP codes from one file, in the order of zipcodes.
+
+    Rows are copies, so callers may modify them.
+
+    Raises:
+        requests.RequestException: If there is no local copy and the download failed
+    """
+    zips = _get_index(utility_type)["zips"]
+    return [dict(row) for zipcode in dict.fromkeys(zipcodes) for row in zips.get(zipcode, ())]
+
+
+def eia_rate_store_status() -> Dict[str, Any]:
+    """Store directory, refresh interval and the local copy and index of each rate file."""
+    files = {}
+    for utility_type in RATE_FILES:
+        paths = _paths(utility_type)
+        meta = _read_meta(paths["meta"])
+        index = _INDEXES.get(utility_type)
+        files[utility_type] = {
+            "downloaded": os.path.exists(paths["csv"]),
+            "bytes": os.path.getsize(paths["csv"]) if os.path.exists(paths["csv"]) else None,
+            "etag": meta.get("etag"),
+            "last_modified": meta.get("last_modified"),
+            "checked_at": meta.get("checked_at"),
+            "indexed_rows": index["rows"] if index else None,
+            "indexed_zipcodes": len(index["zips"]) if index else None,
+        }
+    return {
+        "data_dir": os.path.abspath(_SETTINGS["data_dir"]),
+        "refresh_interval_seconds": _SETTINGS["refresh_interval_seconds"],
+        "files": files,
+    }
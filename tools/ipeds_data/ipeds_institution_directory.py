@@ -5,6 +5,23 @@ import requests
 from typing import List, Dict, Optional, Any
 from datetime import datetime
 
+from tools.common.crosswalk import translate_code
+from tools.common.upstream import upstream_get, UpstreamUnavailableError
+
+
+def _to_cbsa(code: str) -> str:
+    """Accept QCEW ("C1698") and OEWS ("0016980") metro area codes alongside 5-digit CBSA codes."""
+    if code.upper().startswith("C") or len(code) == 7:
+        try:
+            matches = translate_code(code, "qcew_area" if code.upper().startswith("C") else "oews_area", "cbsa")
+        except ValueError:
+            # e.g. a nonmetropolitan OEWS area with no area-county file loaded
+            return code
+        if matches:
+            return matches[0][0]
+    return code
+
+
 def get_postsecondary_institutions(
     state_fips: Optional[List[str]] = None,
     county_fips: Optional[List[str]] = None,
@@ -24,7 +41,8 @@ def get_postsecondary_institutions(
     Args:
         state_fips: State FIPS code(s) - list of strings (e.g. ["17"] for Illinois)
         county_fips: County FIPS code(s) - can be 3-digit (e.g. ["031"]) or full 5-digit codes (e.g. ["17031"]). If 5-digit, will extract county part automatically.
-        cbsa: Core Based Statistical Area code(s) (otherwise known as Metropolitan/Micropolitan Statistical Area or MSA/Micro Area) - list of strings (e.g. ["16980"] for Chicago-Naperville-Joliet, IL-IN-WI)
+        cbsa: Core Based Statistical Area code(s) (otherwise known as Metropolitan/Micropolitan Statistical Area or MSA/Micro Area) - list of strings (e.g. ["16980"] for Chicago-Naperville-Joliet, IL-IN-WI).
+              QCEW ("C1698") and OEWS ("0016980") metro area codes are translated automatically.
         year: Year(s) of data - list of strings (defaults to [current year - 2]) (e.g. ["2022"] or ["2021", "2022"])
         inst_category: Institution category code(s) - list of strings
                       "1"=Graduate only, "2"=Primarily bachelor's+, "3"=Not primarily bachelor's+, 
@@ -47,6 +65,9 @@ def get_postsecondary_institutions(
     # Default to current year minus 2 if not specified
     if year is None:
         year = [str(datetime.now().year - 2)]
+
+    if cbsa:
+        cbsa = [_to_cbsa(code) for code in cbsa]
         
     # For single year, use original efficient approach; for multiple years, aggregate
     if len(year) == 1:
@@ -90,10 +111,12 @@ def get_postsecondary_institutions(
             params["inst_category"] = ",".join(inst_category)
         
         try:
-            response = requests.get(url, params=params, timeout=30)  # Back to original timeout
+            response = upstream_get(url, params=params)
             response.raise_for_status()
             data = response.json()
             results = data.get('results', [])
+        except UpstreamUnavailableError as e:
+            return [{"error": f"IPEDS directory API is temporarily unavailable: {str(e)}"}]
         except requests.exceptions.Timeout:
             return [{"error": "Request timed out - try filtering your search"}]
         except requests.exceptions.RequestException as e:
@@ -138,12 +161,14 @@ def get_postsecondary_institutions(
                 if inst_category:
                     params["inst_category"] = ",".join(inst_category)
                 
-                response = requests.get(url, params=params, timeout=60)
+                response = upstream_get(url, params=params)
                 response.raise_for_status()
                 data = response.json()
                 year_results = data.get('results', [])
                 all_results.extend(year_results)
                 
+        except UpstreamUnavailableError as e:
+            return [{"error": f"IPEDS directory API is temporarily unavailable: {str(e)}"}]
         except requests.exceptions.Timeout:
             return [{"error": "Request timed out - try filtering your search"}]
         except requests.exceptions.RequestException as e:
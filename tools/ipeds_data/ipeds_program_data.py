@@ -4,6 +4,9 @@
 import requests
 from typing import List, Dict, Optional, Any
 from datetime import datetime
+
+from tools.common.code_index import get_code_index
+from tools.common.upstream import upstream_get, UpstreamUnavailableError
 try:
     from .get_cip_codes import CIP_CODES
     from .get_award_levels import AWARD_LEVELS
@@ -199,7 +202,7 @@ def get_programs(
         
         try:
             while current_url:
-                response = requests.get(current_url, params=params if current_url == url else None, timeout=120)
+                response = upstream_get(current_url, params=params if current_url == url else None)
                 response.raise_for_status()
                 data = response.json()
                 
@@ -216,6 +219,8 @@ def get_programs(
             
             results = all_results
             
+        except UpstreamUnavailableError as e:
+            return {"error": f"IPEDS programs API is temporarily unavailable: {str(e)}"}
         except requests.exceptions.Timeout:
             return {"error": "Request timed out - the IPEDS programs API is currently slow or unavailable. Try again later or contact support."}
         except requests.exceptions.RequestException as e:
@@ -250,7 +255,7 @@ def get_programs(
                 current_url = url
                 
                 while current_url:
-                    response = requests.get(current_url, params=params if current_url == url else None, timeout=60)
+                    response = upstream_get(current_url, params=params if current_url == url else None)
                     response.raise_for_status()
                     data = response.json()
                     
@@ -269,6 +274,8 @@ def get_programs(
             
             results = all_results
             
+        except UpstreamUnavailableError as e:
+            return {"error": f"IPEDS programs API is temporarily unavailable: {str(e)}"}
         except requests.exceptions.Timeout:
             return {"error": "Request timed out - the IPEDS programs API is currently slow or unavailable. Try again later or contact support."}
         except requests.exceptions.RequestException as e:
@@ -296,6 +303,8 @@ def get_programs(
     
     # Process results - aggregate by CIP code
     cip_aggregates = {}
+    cip_index = get_code_index("cip")
+    award_level_index = get_code_index("award_level")
     
     for inst in filtered_results:
         try:
@@ -307,7 +316,8 @@ def get_programs(
             if cipcode not in cip_aggregates:
                 cip_aggregates[cipcode] = {
                     'cipcode': cipcode,
-                    'cip_name': CIP_CODES.get(str(cipcode), 'Unknown CIP Code'),
+                    # Detailed programs missing from the code table fall back to their 2-digit family
+                    'cip_name': cip_index.name(cipcode) or cip_index.name(cip_index.parent(cipcode), 'Unknown CIP Code'),
                     'total_awards': 0,
                     'unique_institutions': set()
                 }
@@ -340,7 +350,7 @@ def get_programs(
             'year': year,
             'state_fips': state_fips,
             'award_levels': award_levels,
-            'award_level_names': [AWARD_LEVELS.get(str(level), f'Unknown ({level})') for level in (award_levels or [])],
+            'award_level_names': [award_level_index.name(level, f'Unknown ({level})') for level in (award_levels or [])],
             'cip_keywords': cip_keywords,
             'unitid': unitid
         },
@@ -1,23 +1,132 @@
-import requests
 import json
+import logging
 from typing import Dict, Any, List
 
+import numpy as np
 
-def get_oews_data(geo_codes: List[str], occ_codes: List[str]) -> Dict[str, Any]:
+from tools.common.bls_api import fetch_bls_series, BLSQuotaExceededError
+from tools.common.code_index import get_code_index
+from tools.common.crosswalk import translate_code
+from tools.common.regional_metrics import matrix_from_nested, fill_nested, location_quotients, herfindahl_index, hachman_index
+from tools.oews_data.oews_store import query_oews_store
+
+logger = logging.getLogger(__name__)
+
+
+def _to_oews_area(code: str) -> str:
+    """Accept 2-digit state FIPS and 5-digit CBSA codes alongside 7-digit OEWS area codes."""
+    if code.isdigit() and len(code) in (2, 5):
+        try:
+            matches = translate_code(code, "state" if len(code) == 2 else "cbsa", "oews_area")
+        except ValueError:
+            return code
+        if matches:
+            return matches[0][0]
+    return code
+
+
+def _add_location_quotients(result: Dict[str, Any]) -> None:
+    """Add employment and wage location quotients against the national (0000000) totals to every occupation."""
+    # One (area, occupation) matrix per measure; the all occupations total (000000) is the denominator
+    areas = list(result["locations"])
+    occupations = {geo_code: result["locations"][geo_code]["occupations"] for geo_code in areas}
+    codes = list(dict.fromkeys(code for geo_code in areas for code in occupations[geo_code] if code != "000000"))
+    if not areas or not codes:
+        return
+    national_occupations = occupations.get("0000000", {})
+    
+    for measure, total_field, lq_field in (("employment", "total_employment", "employment_lq"), ("hourly_wage", "total_wage", "wage_lq")):
+        local = matrix_from_nested(occupations, areas, codes, measure)
+        local_totals = np.array([result["locations"][geo_code][total_field] for geo_code in areas], dtype=float)
+        national = np.array([national_occupations.get(code, {}).get(measure, 0) for code in codes], dtype=float)
+        national_total = national_occupations.get("000000", {}).get(measure, 0)
+        fill_nested(occupations, areas, codes, lq_field, location_quotients(local, local_totals, national, national_total))
+        
+        # Concentration across the requested occupations, from employment only
+        if measure == "employment":
+            for geo_code, hhi, hachman in zip(areas, herfindahl_index(local), hachman_index(local, national)):
+                result["locations"][geo_code]["employment_hhi"] = round(float(hhi), 4)
+                result["locations"][geo_code]["employment_hachman_index"] = round(float(hachman), 4)
+
+
+def _get_oews_data_from_store(all_geo_codes: List[str], all_occ_codes: List[str], year: str = None) -> Dict[str, Any]:
+    """Build the get_oews_data result, with full wage distributions, from the local OEWS store."""
+    try:
+        rows = query_oews_store(all_geo_codes, all_occ_codes, year)
+    except ImportError:
+        return {"status": "error", "error_message": "The OEWS store backend requires pyarrow (pip install pyarrow)."}
+    if rows is None:
+        return {"status": "error", "error_message": "No OEWS release in the local store. Ingest the all-data file with python -m tools.oews_data.oews_store."}
+    
+    result = {
+        "locations": {},
+        "national_totals": {
+            "employment": {},
+            "wage": {}
+        }
+    }
+    occupation_index = get_code_index("soc")
+    area_index = get_code_index("oews_area")
+    found = {(row["area_code"], row["occ_code"]): row for row in rows}
+    
+    for geo_code in all_geo_codes:
+        for occ_code in all_occ_codes:
+            row = found.get((geo_code, occ_code))
+            if row is None:
+                continue
+            if geo_code not in result["locations"]:
+                result["locations"][geo_code] = {
+                    "area_name": area_index.name(geo_code) or row["area_title"] or geo_code,
+                    "occupations": {},
+                    "total_employment": 0,
+                    "total_wage": 0
+                }
+            employment = int(row["employment"] or 0)
+            hourly_wage = row["hourly_median"] or 0
+            result["locations"][geo_code]["occupations"][occ_code] = {
+                "occupation_name": occupation_index.name(occ_code) or row["occ_title"] or occ_code,
+                "occupation_group": occupation_index.name(occupation_index.parent(occ_code)),
+                "employment": employment,
+                "hourly_wage": hourly_wage,
+                "jobs_per_1000": row["jobs_per_1000"],
+                "wages": {
+                    "hourly": {statistic: row[f"hourly_{statistic}"] for statistic in ("mean", "pct10", "pct25", "median", "pct75", "pct90")},
+                    "annual": {statistic: row[f"annual_{statistic}"] for statistic in ("mean", "pct10", "pct25", "median", "pct75", "pct90")},
+                    # Top-coded wages (at or above the release's cap) are reported as null
+                    "top_coded": row["top_coded"]
+                },
+                "periodName": "Annual",
+                "year": str(row["year"])
+            }
+            # Only update totals from the "all occupations" code
+            if occ_code == "000000":
+                result["locations"][geo_code]["total_employment"] = employment
+                result["locations"][geo_code]["total_wage"] = hourly_wage
+    
+    _add_location_quotients(result)
+    return result
+
+
+def get_oews_data(geo_codes: List[str], occ_codes: List[str], backend: str = "api", year: str = None) -> Dict[str, Any]:
     """
     Get simplified OEWS occupation and wage data for multiple locations and occupations.
     Calculate location quotients for employment and wage data.
     
     Args:
-        geo_codes (list): List of geographic area codes (e.g., ["0000000", "0011500"])
+        geo_codes (list): List of geographic area codes (e.g., ["0000000", "0011500"]). State FIPS ("17") and
+                          CBSA ("16980") codes are translated to OEWS area codes.
         occ_codes (list): List of occupation codes (e.g., ["111011", "111021"])
+        backend (str, optional): "api" (default) fetches employment and median hourly wage series from the BLS
+                                 API; "store" reads the local store built from the OEWS all-data release, which
+                                 adds hourly and annual means and 10th-90th percentile wages with no API calls.
+        year (str, optional): Release year for the "store" backend (defaults to the newest ingested release).
+                              The API always returns the latest release.
     
     Returns:
-        dict: JSON data containing employment and wage data with location quotients
+        dict: JSON data containing employment and wage data with location quotients, or
+              {"status": "error", "error_message": ...} when the BLS API daily budget is exhausted.
+              When some BLS batches fail after retries, "partial_results" lists the missing series.
     """
-    base_url = "https://api.bls.gov/publicAPI/v2/timeseries/data/"
-    headers = {"Content-Type": "application/json"}
-
     # Define data types for series ID construction
     oews_data_types = {
         "01": "Employment",
@@ -25,9 +134,14 @@ def get_oews_data(geo_codes: List[str], occ_codes: List[str]) -> Dict[str, Any]:
     }
 
     # Always include US total and all occupations total
-    all_geo_codes = ["0000000"] + geo_codes
+    all_geo_codes = ["0000000"] + [_to_oews_area(geo_code) for geo_code in geo_codes]
     all_occ_codes = ["000000"] + occ_codes
     
+    if backend == "store":
+        return _get_oews_data_from_store(all_geo_codes, all_occ_codes, year)
+    if backend != "api":
+        return {"status": "error", "error_message": "backend must be 'api' or 'store'."}
+    
     # Generate series IDs for all combinations
     series_ids = []
     for geo_code in all_geo_codes:
@@ -54,27 +168,23 @@ def get_oews_data(geo_codes: List[str], occ_codes: List[str]) -> Dict[str, Any]:
             "wage": {}
         }
     }
+    occupation_index = get_code_index("soc")
+    area_index = get_code_index("oews_area")
     
-    # Process in batches of 50 series IDs
-    for i in range(0, len(series_ids), 50):
-        batch = series_ids[i:i + 50]
-        
-        # OEWS only provides latest data, so always use latest=true regardless of year parameter
-        params = {
-            "seriesid": batch,
-            "latest": "true",
-            "registrationkey": "243f61eeaa6c450db0a2ecb8dc08c44f",
-        }
-        
-        try:
-            response = requests.post(base_url, data=json.dumps(params), headers=headers)
-            response.raise_for_status()
-            json_response = response.json()
-            
-            if json_response.get("status") != "REQUEST_SUCCEEDED":
-                continue
-                
-            for series in json_response.get("Results", {}).get("series", []):
+    # OEWS only provides latest data, so always use latest=true regardless of year parameter
+    params = {"latest": "true"}
+    
+    # Cached series come first; batches of 50 series IDs are fetched concurrently and returned in order
+    try:
+        # National series are the LQ baseline and are reused across requests until the next annual release
+        baseline_ids = [series_id for series_id in series_ids if series_id[4:11] == "0000000"]
+        batch_results = fetch_bls_series(series_ids, params, baseline_ids, "annual")
+    except BLSQuotaExceededError as e:
+        return {"status": "error", "error_message": str(e)}
+    
+    for batch_series in batch_results:
+        for series in batch_series:
+            try:
                 series_id = series["seriesID"]
                 geo_code = series_id[4:11]
                 occ_code = series_id[17:23]
@@ -83,6 +193,7 @@ def get_oews_data(geo_codes: List[str], occ_codes: List[str]) -> Dict[str, Any]:
                 # Initialize location if not exists
                 if geo_code not in result["locations"]:
                     result["locations"][geo_code] = {
+                        "area_name": area_index.name(geo_code, geo_code),
                         "occupations": {},
                         "total_employment": 0,
                         "total_wage": 0
@@ -91,7 +202,8 @@ def get_oews_data(geo_codes: List[str], occ_codes: List[str]) -> Dict[str, Any]:
                 # Initialize occupation if not exists
                 if occ_code not in result["locations"][geo_code]["occupations"]:
                     result["locations"][geo_code]["occupations"][occ_code] = {
-                        "occupation_name": occ_code,
+                        "occupation_name": occupation_index.name(occ_code, occ_code),
+                        "occupation_group": occupation_index.name(occupation_index.parent(occ_code)),
                         "employment": 0,
                         "hourly_wage": 0,
                         "periodName": None,
@@ -121,36 +233,17 @@ def get_oews_data(geo_codes: List[str], occ_codes: List[str]) -> Dict[str, Any]:
                         if occ_code == "000000":
                             result["locations"][geo_code]["total_wage"] = hourly_wage
                         
-        except Exception as e:
-            print(f"Error processing batch: {str(e)}")
-            continue
-    
-    # Get national totals from the "all occupations" data
-    national_data = result["locations"].get("0000000", {}).get("occupations", {}).get("000000", {})
-    total_national_employment = national_data.get("employment", 0)
-    total_national_wage = national_data.get("hourly_wage", 0)
-    
-    # Calculate Location Quotients using the all occupations totals
-    for location in result["locations"].values():
-        total_location_employment = location["total_employment"]
-        total_location_wage = location["total_wage"]
-        
-        for occ_code, occ_data in location["occupations"].items():
-            if occ_code != "000000":  # Skip LQ calculation for all occupations total
-                # Calculate Employment LQ
-                local_employment_share = occ_data["employment"] / total_location_employment if total_location_employment > 0 else 0
-                national_employment_share = result["locations"]["0000000"]["occupations"][occ_code]["employment"] / total_national_employment if total_national_employment > 0 else 0
-                employment_lq = local_employment_share / national_employment_share if national_employment_share > 0 else 0
-                
-                # Calculate Wage LQ
-                local_wage = occ_data["hourly_wage"]
-                national_wage = result["locations"]["0000000"]["occupations"][occ_code]["hourly_wage"]
-                wage_lq = (local_wage / total_location_wage) / (national_wage / total_national_wage) if total_location_wage > 0 and total_national_wage > 0 and national_wage > 0 else 0
-                
-                # Add LQs to occupation data
-                occ_data["employment_lq"] = round(employment_lq, 2)
-                occ_data["wage_lq"] = round(wage_lq, 2)
+            except Exception as e:
+                logger.warning(f"Error processing BLS series {series.get('seriesID')}: {e}")
+                # Reported with the series whose batches failed to download
+                batch_results.failed_series_ids.append(series.get("seriesID"))
+                batch_results.errors.append(f"Error processing series: {e}")
     
+    _add_location_quotients(result)
+    # Series whose batches failed after retries, or could not be read, are reported rather than silently missing
+    partial_results = batch_results.partial_results()
+    if partial_results:
+        result["partial_results"] = partial_results
     return result
 
 if __name__ == "__main__":
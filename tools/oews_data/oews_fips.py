@@ -1,5 +1,9 @@
+from functools import lru_cache
 from typing import Dict, List, Tuple, Optional, Union
-import re
+
+from tools.common.lookup_index import LookupIndex
+from tools.common.lookup_tables import load_lookup_table
+from tools.common.name_normalization import WORD_ALIASES, normalize_query
 
 """
 OEWS FIPS Search Tool
@@ -11,6 +15,10 @@ This is designed for use as an LLM tool to provide manageable result sets.
 
 def _get_oews_fips_data() -> Dict[str, str]:
     """Internal function containing the complete OEWS FIPS dictionary."""
+    # A built lookup-table artifact replaces the table below (python -m tools.common.lookup_tables)
+    table = load_lookup_table("oews_area")
+    if table is not None:
+        return table.as_dict()
     fips_dictionary: Dict[str, str] = {
         "0000000": "National",
         "0011500": "Anniston-Oxford-Jacksonville, AL",
@@ -589,14 +597,23 @@ def _get_oews_fips_data() -> Dict[str, str]:
     }
     return fips_dictionary
 
+
+@lru_cache(maxsize=1)
+def _get_oews_fips_index() -> LookupIndex:
+    """Internal function returning the typo-tolerant index over OEWS area names, built on first use."""
+    table = load_lookup_table("oews_area")
+    if table is not None:
+        return table.lookup_index(qualifier_separator=", ", word_aliases=WORD_ALIASES)
+    return LookupIndex(((name, code) for code, name in _get_oews_fips_data().items()), qualifier_separator=", ", word_aliases=WORD_ALIASES)
+
 def search_oews_fips(keyword: List[str], max_results: Optional[int] = 20) -> List[Tuple[str, str]]:
     """
     Search for OEWS areas by keyword(s) and return their FIPS codes.
     
-    Supports flexible multi-word searches and multiple search terms. Results are prioritized by match quality:
-    1. Exact word matches (e.g., "chicago" → "Chicago-Naperville-Elgin, IL-IN-WI")
-    2. All words match (e.g., "chicago illinois" → "Chicago-Naperville-Elgin, IL-IN-WI") 
-    3. Partial matches (e.g., "chic" → "Chicago-Naperville-Elgin, IL-IN-WI")
+    Supports flexible multi-word searches and multiple search terms. Results are ranked by
+    relevance (BM25): whole-word matches score above prefix matches (e.g., "chic" →
+    "Chicago-Naperville-Elgin, IL-IN-WI") and misspellings, rarer words count for more than
+    common ones, and shorter names that match fully rank above longer ones.
     
     Args:
         keyword (List[str]): Search term(s) to match against area names (case-insensitive).
@@ -623,39 +640,20 @@ def search_oews_fips(keyword: List[str], max_results: Optional[int] = 20) -> Lis
     if not keywords:
         return []
     
-    oews_data = _get_oews_fips_data()
+    index = _get_oews_fips_index()
     all_results = []
     
     # Process each keyword separately
     for search_keyword in keywords:
-        # Split the search query into individual terms
-        search_terms = re.split(r'\W+', search_keyword)
-        search_terms = [term for term in search_terms if term]  # Remove empty strings
+        # Expand nicknames, canonicalize abbreviations and make type words optional
+        search_terms, optional_terms = normalize_query(search_keyword, expand_postal_codes=False)
         
         if not search_terms:
             continue
         
-        # Find matches with different priority levels for this keyword
-        exact_matches = []
-        all_word_matches = []
-        partial_matches = []
-        
-        for fips_code, area_name in oews_data.items():
-            area_lower = area_name.lower()
-            area_words = re.split(r'\W+', area_lower)
-            
-            # Priority 1: Single term that exactly matches a word in the area name
-            if len(search_terms) == 1 and search_terms[0] in area_words:
-                exact_matches.append((area_name, fips_code))
-            # Priority 2: All search terms appear as words in the area name
-            elif len(search_terms) > 1 and all(term in area_words for term in search_terms):
-                all_word_matches.append((area_name, fips_code))
-            # Priority 3: Partial matches - search term appears anywhere in area name
-            elif any(term in area_lower for term in search_terms):
-                partial_matches.append((area_name, fips_code))
+        # Rank matching areas by relevance, with prefix and typo-tolerant matching
+        keyword_results = index.search(search_terms, max_results, optional_terms=optional_terms)
         
-        # Combine results for this keyword, prioritizing by match quality
-        keyword_results = exact_matches + all_word_matches + partial_matches
         all_results.extend(keyword_results)
     
     # Remove duplicates while preserving order
@@ -1,6 +1,10 @@
+from functools import lru_cache
 from typing import Dict, List, Tuple, Optional, Union
 import re
 
+from tools.common.lookup_index import LookupIndex
+from tools.common.lookup_tables import load_lookup_table
+
 """
 OEWS SOC Search Tool
 
@@ -10,6 +14,10 @@ This is designed for use as an LLM tool to provide manageable result sets.
 """
 
 def _get_soc_data() -> Dict[str, str]:
+    # A built lookup-table artifact replaces the table below (python -m tools.common.lookup_tables)
+    table = load_lookup_table("soc")
+    if table is not None:
+        return table.as_dict()
     soc_dictionary: Dict[str, str] = {
         "000000": "All Occupations",
         "111011": "Chief Executives",
@@ -839,18 +847,28 @@ def _get_soc_data() -> Dict[str, str]:
         }
     return soc_dictionary
 
-def search_oews_soc(keyword: List[str]) -> List[Tuple[str, str]]:
+
+@lru_cache(maxsize=1)
+def _get_soc_index() -> LookupIndex:
+    """Internal function returning the typo-tolerant index over occupation titles, built on first use."""
+    table = load_lookup_table("soc")
+    if table is not None:
+        return table.lookup_index()
+    return LookupIndex((title, code) for code, title in _get_soc_data().items())
+
+def search_oews_soc(keyword: List[str], max_results: Optional[int] = None) -> List[Tuple[str, str]]:
     """
     Search for occupations by keyword(s) and return their SOC codes.
     
-    Supports flexible multi-word searches and multiple search terms. Results are prioritized by match quality:
-    1. Exact word matches (e.g., "manager" → "General and Operations Managers")
-    2. All words match (e.g., "software developer" → "Software Developers") 
-    3. Partial matches (e.g., "soft" → "Software Developers")
+    Supports flexible multi-word searches and multiple search terms. Results are ranked by
+    relevance (BM25): whole-word matches score above prefix matches (e.g., "soft" →
+    "Software Developers") and misspellings, rarer words count for more than common ones,
+    and shorter names that match fully rank above longer ones.
     
     Args:
         keyword (List[str]): Search term(s) to match against occupation titles (case-insensitive).
                             List of strings for multiple searches, or single item list for one search.
+        max_results (Optional[int]): Maximum number of results to return (default: all matches)
     
     Returns:
         List[Tuple[str, str]]: List of (occupation_title, soc_code) tuples matching the search(es)
@@ -872,7 +890,7 @@ def search_oews_soc(keyword: List[str]) -> List[Tuple[str, str]]:
     if not keywords:
         return []
     
-    soc_data = _get_soc_data()
+    index = _get_soc_index()
     all_results = []
     
     # Process each keyword separately
@@ -884,27 +902,9 @@ def search_oews_soc(keyword: List[str]) -> List[Tuple[str, str]]:
         if not search_terms:
             continue
         
-        # Find matches with different priority levels for this keyword
-        exact_matches = []
-        all_word_matches = []
-        partial_matches = []
+        # Rank matching occupations by relevance, with prefix and typo-tolerant matching
+        keyword_results = index.search(search_terms, max_results)
         
-        for soc_code, occupation_title in soc_data.items():
-            title_lower = occupation_title.lower()
-            title_words = re.split(r'\W+', title_lower)
-            
-            # Priority 1: Single term that exactly matches a word in the occupation title
-            if len(search_terms) == 1 and search_terms[0] in title_words:
-                exact_matches.append((occupation_title, soc_code))
-            # Priority 2: All search terms appear as words in the occupation title
-            elif len(search_terms) > 1 and all(term in title_words for term in search_terms):
-                all_word_matches.append((occupation_title, soc_code))
-            # Priority 3: All search terms appear somewhere in the occupation title (substring match)
-            elif all(term in title_lower for term in search_terms):
-                partial_matches.append((occupation_title, soc_code))
-        
-        # Combine results for this keyword, prioritizing exact matches
-        keyword_results = exact_matches + all_word_matches + partial_matches
         all_results.extend(keyword_results)
     
     # Remove duplicates while preserving order
@@ -915,6 +915,10 @@ def search_oews_soc(keyword: List[str]) -> List[Tuple[str, str]]:
             seen.add(result)
             unique_results.append(result)
     
+    # Apply max_results limit
+    if max_results and max_results > 0:
+        unique_results = unique_results[:max_results]
+    
     return unique_results
 
 if __name__ == "__main__":
@@ -0,0 +1,242 @@
+import argparse
+import glob
+import json
+import os
+import re
+import shutil
+import zipfile
+from datetime import datetime
+from functools import lru_cache
+from typing import Dict, List, Optional, Any
+
+"""
+OEWS Local Store
+
+This module ingests the BLS OEWS "all data" release file (all_data_M_YYYY.xlsx, or the zip
+it ships in, or a CSV export of it) into a Parquet store with one row per area and
+occupation, holding employment and the full wage distribution: hourly and annual means
+and 10th, 25th, 50th, 75th and 90th percentiles. Cross-industry rows for every national,
+state, metro and nonmetro area are kept and area codes are converted to the 7-digit codes
+used by the OEWS API, so get_oews_data(backend="store") answers without BLS series calls.
+
+Build it with:
+    python -m tools.oews_data.oews_store oesm23all.zip
+
+Requires pyarrow, and openpyxl for .xlsx release files.
+"""
+
+# Wage statistics kept from the release: store column -> release column
+WAGE_COLUMNS = {
+    "hourly_mean": "H_MEAN",
+    "hourly_pct10": "H_PCT10",
+    "hourly_pct25": "H_PCT25",
+    "hourly_median": "H_MEDIAN",
+    "hourly_pct75": "H_PCT75",
+    "hourly_pct90": "H_PCT90",
+    "annual_mean": "A_MEAN",
+    "annual_pct10": "A_PCT10",
+    "annual_pct25": "A_PCT25",
+    "annual_median": "A_MEDIAN",
+    "annual_pct75": "A_PCT75",
+    "annual_pct90": "A_PCT90",
+}
+
+STORE_COLUMNS = ["area_code", "occ_code", "employment", "jobs_per_1000", "published_lq", "top_coded"] + list(WAGE_COLUMNS)
+
+_SETTINGS: Dict[str, Any] = {"data_dir": os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "..", "data", "oews_store")}
+
+
+def set_oews_store_dir(data_dir: str) -> None:
+    """Set the directory holding the OEWS Parquet store."""
+    _SETTINGS["data_dir"] = data_dir
+    _open_dataset.cache_clear()
+
+
+def _store_root(data_dir: Optional[str] = None) -> str:
+    return os.path.join(data_dir or _SETTINGS["data_dir"], "oews")
+
+
+def _read_release(path: str) -> Any:
+    """Read an all-data release file (.xlsx, .csv, or a zip holding either) as strings."""
+    import pandas as pd
+
+    if path.lower().endswith(".zip"):
+        with zipfile.ZipFile(path) as archive:
+            member = next(
+                (name for name in archive.namelist() if re.search(r"all_data.*\.(xlsx|csv)$", name, re.IGNORECASE)),
+                None
+            )
+            if member is None:
+                raise ValueError(f"No all_data .xlsx or .csv file found in {path}")
+            with archive.open(member) as handle:
+                if member.lower().endswith(".csv"):
+                    return pd.read_csv(handle, dtype=str, keep_default_na=False)
+                return pd.read_excel(handle, dtype=str, keep_default_na=False)
+    if path.lower().endswith(".csv"):
+        return pd.read_csv(path, dtype=str, keep_default_na=False)
+    return pd.read_excel(path, dtype=str, keep_default_na=False)
+
+
+def _oews_area_code(area: str, area_type: str) -> str:
+    """Release AREA and AREA_TYPE -> the 7-digit area code used in OEWS series IDs."""
+    area = area.strip().split(".")[0]
+    if area_type == "1":
+        return "0000000"
+    if area_type in ("2", "3"):
+        return area.zfill(2) + "00000"
+    return area.zfill(7)
+
+
+def _to_store_frame(release: Any) -> Any:
+    """Keep cross-industry, all-ownership rows and convert codes and suppressed values."""
+    import pandas as pd
+
+    release.columns = [column.strip().upper() for column in release.columns]
+    if "I_GROUP" in release.columns:
+        release = release[release["I_GROUP"].str.strip().str.lower() == "cross-industry"]
+    if "OWN_CODE" in release.columns:
+        release = release[release["OWN_CODE"].str.strip().isin(["1235", "123S"])]
+    area_type = release["AREA_TYPE"].str.strip().str.split(".").str[0]
+
+    def _numbers(column: str) -> Any:
+        # "*" and "**" mark suppressed estimates and "#" top-coded wages; all become missing
+        values = release[column].str.replace(",", "", regex=False).str.strip() if column in release.columns else ""
+        return pd.to_numeric(values, errors="coerce")
+
+    wage_columns = [column for column in WAGE_COLUMNS.values() if column in release.columns]
+    frame = pd.DataFrame({
+        "area_code": [_oews_area_code(area, kind) for area, kind in zip(release["AREA"], area_type)],
+        "occ_code": release["OCC_CODE"].str.replace("-", "", regex=False).str.strip(),
+        "area_title": release["AREA_TITLE"].str.strip(),
+        "occ_title": release["OCC_TITLE"].str.strip(),
+        "employment": _numbers("TOT_EMP"),
+        "jobs_per_1000": _numbers("JOBS_1000"),
+        "published_lq": _numbers("LOC_QUOTIENT"),
+        "top_coded": (release[wage_columns].apply(lambda column: column.str.strip() == "#")).any(axis=1) if wage_columns else False,
+    })
+    for store_column, release_column in WAGE_COLUMNS.items():
+        frame[store_column] = _numbers(release_column)
+    return frame.drop_duplicates(["area_code", "occ_code"]).sort_values(["area_code", "occ_code"], kind="stable")
+
+
+def ingest_oews_release(path: str, year: Optional[int] = None, data_dir: Optional[str] = None) -> Dict[str, Any]:
+    """
+    Load one OEWS all-data release into the store, replacing any earlier load of that year.
+
+    Args:
+        path: all_data_M_YYYY.xlsx, a CSV export of it, or the oesmYYall.zip archive
+        year: Release (reference May) year; read from the file name when omitted
+        data_dir: Store directory (defaults to the configured directory)
+
+    Returns:
+        Dict with the year and the number of rows written
+    """
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    if year is None:
+        match = re.search(r"(20\d\d)", os.path.basename(path)) or re.search(r"oesm(\d\d)", os.path.basename(path), re.IGNORECASE)
+        if match is None:
+            raise ValueError(f"Cannot tell the release year from {path}; pass year explicitly")
+        year = int(match.group(1)) if len(match.group(1)) == 4 else 2000 + int(match.group(1))
+
+    frame = _to_store_frame(_read_release(path))
+    root = _store_root(data_dir)
+    directory = os.path.join(root, f"year={year}")
+    shutil.rmtree(directory, ignore_errors=True)
+    os.makedirs(directory, exist_ok=True)
+    pq.write_table(pa.Table.from_pandas(frame[STORE_COLUMNS], preserve_index=False), os.path.join(directory, "part-00000.parquet"), row_group_size=50_000)
+
+    # Area and occupation titles as published, for codes missing from the built-in search tables
+    titles = {
+        "areas": dict(zip(frame["area_code"], frame["area_title"])),
+        "occupations": dict(zip(frame["occ_code"], frame["occ_title"])),
+        "source": os.path.basename(path),
+        "ingested_at": datetime.now().isoformat(),
+    }
+    with open(os.path.join(root, f"_titles_{year}.json"), "w") as handle:
+        json.dump(titles, handle)
+
+    _open_dataset.cache_clear()
+    _release_titles.cache_clear()
+    return {"year": year, "rows": len(frame)}
+
+
+@lru_cache(maxsize=1)
+def _open_dataset() -> Any:
+    import pyarrow as pa
+    import pyarrow.dataset as ds
+
+    root = _store_root()
+    if not glob.glob(os.path.join(root, "year=*", "*.parquet")):
+        return None
+    partitioning = ds.partitioning(pa.schema([("year", pa.int16())]), flavor="hive")
+    return ds.dataset(root, format="parquet", partitioning=partitioning)
+
+
+@lru_cache(maxsize=4)
+def _release_titles(year: int) -> Dict[str, Dict[str, str]]:
+    path = os.path.join(_store_root(), f"_titles_{year}.json")
+    if not os.path.exists(path):
+        return {"areas": {}, "occupations": {}}
+    with open(path) as handle:
+        return json.load(handle)
+
+
+def oews_store_years() -> List[int]:
+    """Release years in the store, newest first."""
+    years = [int(os.path.basename(directory).split("=", 1)[1]) for directory in glob.glob(os.path.join(_store_root(), "year=*"))]
+    return sorted(years, reverse=True)
+
+
+def query_oews_store(
+    area_codes: Optional[List[str]] = None,
+    occ_codes: Optional[List[str]] = None,
+    year: Optional[int] = None
+) -> Optional[List[Dict[str, Any]]]:
+    """
+    Rows for the given areas and occupations from one release (the newest by default).
+
+    Returns:
+        List of row dicts with the store columns plus area_title, occ_title and year, or None
+        when the store holds no release
+    """
+    import pyarrow.dataset as ds
+
+    dataset = _open_dataset()
+    years = oews_store_years()
+    if dataset is None or not years:
+        return None
+    year = int(year) if year else years[0]
+
+    expression = ds.field("year") == year
+    if area_codes:
+        expression = expression & ds.field("area_code").isin(list(area_codes))
+    if occ_codes:
+        expression = expression & ds.field("occ_code").isin(list(occ_codes))
+    rows = dataset.to_table(filter=expression).to_pylist()
+
+    titles = _release_titles(year)
+    for row in rows:
+        row["area_title"] = titles["areas"].get(row["area_code"])
+        row["occ_title"] = titles["occupations"].get(row["occ_code"])
+        # pyarrow returns NaN for missing doubles; None reads better in JSON results
+        for column in ["employment", "jobs_per_1000", "published_lq"] + list(WAGE_COLUMNS):
+            if row[column] is not None and row[column] != row[column]:
+                row[column] = None
+    return rows
+
+
+def oews_store_status() -> Dict[str, Any]:
+    """Store directory and the release years it holds."""
+    return {"data_dir": os.path.abspath(_SETTINGS["data_dir"]), "years": oews_store_years()}
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Ingest an OEWS all-data release into the local Parquet store")
+    parser.add_argument("path", help="all_data_M_YYYY.xlsx, a CSV export of it, or the oesmYYall.zip archive")
+    parser.add_argument("--year", type=int, help="Release year (read from the file name by default)")
+    parser.add_argument("--output-dir", default=_SETTINGS["data_dir"], help="Store directory")
+    args = parser.parse_args()
+
+    print(ingest_oews_release(args.path, args.year, args.output_dir))
@@ -0,0 +1,107 @@
+import heapq
+import json
+from typing import Dict, Any, Optional
+
+from tools.common.code_index import get_code_index
+from tools.oews_data.oews_data import _to_oews_area
+from tools.oews_data.oews_store import query_oews_store, WAGE_COLUMNS
+
+"""
+OEWS Top Occupations
+
+This module ranks every occupation published for one area by employment, location quotient
+or wage, reading the area's rows from the local OEWS store in one query and selecting the
+top k with a heap, so no SOC codes need to be known up front.
+"""
+
+TOP_OCCUPATION_METRICS = ["employment", "employment_lq", "jobs_per_1000"] + list(WAGE_COLUMNS)
+
+
+def _is_detailed(occ_code: str) -> bool:
+    # SOC detailed occupations end in 1-9; major, minor and broad groups end in 0
+    return occ_code != "000000" and not occ_code.endswith("0")
+
+
+def get_top_occupations(
+    area_code: str,
+    metric: Optional[str] = "employment",
+    top_k: Optional[int] = 10,
+    detailed_only: Optional[bool] = True,
+    min_employment: Optional[int] = 0,
+    year: Optional[str] = None
+) -> Dict[str, Any]:
+    """
+    Top occupations in one area from the local OEWS store.
+
+    Args:
+        area_code (str): OEWS area code (e.g., "0016980", "1700000"), 2-digit state FIPS or 5-digit CBSA code
+        metric (str): "employment" (default), "employment_lq" (published location quotient),
+                      "jobs_per_1000", or a wage statistic such as "hourly_median", "annual_mean",
+                      "annual_pct90"
+        top_k (int): Number of occupations to return (default: 10, max: 100)
+        detailed_only (bool): Rank detailed occupations only (default: True); False also ranks
+                              major, minor and broad groups
+        min_employment (int): Skip occupations with lower employment (default: 0)
+        year (str): Release year; defaults to the newest ingested release
+
+    Returns:
+        Dict[str, Any]: Response containing:
+            - status: "success" or "error"
+            - area_code, area_name, year, metric
+            - occupations: Top occupations in rank order with code, name, employment, employment_lq,
+                           jobs_per_1000, hourly_median and annual_median
+            - error_message: Error details (if unsuccessful)
+    """
+    try:
+        if metric not in TOP_OCCUPATION_METRICS:
+            return {"status": "error", "error_message": f"metric must be one of: {', '.join(TOP_OCCUPATION_METRICS)}."}
+        top_k = top_k or 10
+        if not isinstance(top_k, int) or not 1 <= top_k <= 100:
+            return {"status": "error", "error_message": "top_k must be an integer between 1 and 100."}
+        area_code = _to_oews_area(area_code)
+
+        rows = query_oews_store([area_code], year=year)
+        if rows is None:
+            return {"status": "error", "error_message": "No OEWS release in the local store. Ingest the all-data file with python -m tools.oews_data.oews_store."}
+        if not rows:
+            return {"status": "error", "error_message": f"No OEWS data found for area {area_code}."}
+
+        # The store keeps the published LQ as published_lq
+        column = "published_lq" if metric == "employment_lq" else metric
+        candidates = (
+            row for row in rows
+            if row[column] is not None
+            and (_is_detailed(row["occ_code"]) if detailed_only is not False else row["occ_code"] != "000000")
+            and (row["employment"] or 0) >= (min_employment or 0)
+        )
+        top = heapq.nlargest(top_k, candidates, key=lambda row: (row[column], row["employment"] or 0))
+
+        occupation_index = get_code_index("soc")
+        return {
+            "status": "success",
+            "area_code": area_code,
+            "area_name": get_code_index("oews_area").name(area_code) or rows[0]["area_title"] or area_code,
+            "year": str(rows[0]["year"]),
+            "metric": metric,
+            "occupations": [
+                {
+                    "occ_code": row["occ_code"],
+                    "occupation_name": occupation_index.name(row["occ_code"]) or row["occ_title"] or row["occ_code"],
+                    "employment": None if row["employment"] is None else int(row["employment"]),
+                    "employment_lq": row["published_lq"],
+                    "jobs_per_1000": row["jobs_per_1000"],
+                    "hourly_median": row["hourly_median"],
+                    "annual_median": row["annual_median"],
+                }
+                for row in top
+            ],
+        }
+
+    except ImportError:
+        return {"status": "error", "error_message": "The OEWS store requires pyarrow (pip install pyarrow)."}
+    except Exception as e:
+        return {"status": "error", "error_message": f"Unexpected error: {str(e)}"}
+
+
+if __name__ == "__main__":
+    print(json.dumps(get_top_occupations("0016980", "employment_lq", 10, min_employment=1000), indent=2))
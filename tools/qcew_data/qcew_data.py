@@ -1,24 +1,155 @@
-import requests
 import json
+import logging
 from typing import Dict, Any, List
 
-def get_qcew_data(geo_codes: List[str], industry_codes: List[str], year: str = None) -> Dict[str, Any]:
+import numpy as np
+
+from tools.common.bls_api import fetch_bls_series, BLSQuotaExceededError
+from tools.common.code_index import get_code_index
+from tools.common.crosswalk import translate_code
+from tools.common.regional_metrics import matrix_from_nested, fill_nested, location_quotients, herfindahl_index, hachman_index
+from tools.qcew_data.qcew_slices import get_qcew_slice_rows
+from tools.qcew_data.qcew_store import query_qcew_store, qcew_store_partitions
+
+logger = logging.getLogger(__name__)
+
+
+def _to_qcew_area(code: str) -> str:
+    """Accept 2-digit state FIPS codes alongside QCEW area codes."""
+    if code.isdigit() and len(code) == 2:
+        return translate_code(code, "state", "qcew_area")[0][0]
+    return code
+
+
+# Ownership used when both total covered (0) and private (5) are published for a cell
+_PREFERRED_OWNERSHIP = "5"
+
+
+def _add_location_quotients(location_data: Dict[str, Any]) -> None:
+    """Add establishment and employee location quotients against US000 to every area's industries."""
+    us_industries = location_data.get("US000", {}).get("industries", {})
+    
+    # Set LQs to 1.0 for US total
+    for industry_info in us_industries.values():
+        industry_info["establishment_lq"] = 1.0
+        industry_info["employee_lq"] = 1.0
+    
+    # One (area, industry) matrix per measure; the all industries total (10) is the denominator
+    areas = [geo_code for geo_code in location_data if geo_code != "US000"]
+    industries = {geo_code: location_data[geo_code]["industries"] for geo_code in areas}
+    codes = list(dict.fromkeys(code for geo_code in areas for code in industries[geo_code] if code != "10"))
+    if not areas or not codes:
+        return
+    
+    for measure, lq_field in (("employees", "employee_lq"), ("establishments", "establishment_lq")):
+        local = matrix_from_nested(industries, areas, codes, measure)
+        local_totals = np.array([industries[geo_code].get("10", {}).get(measure, 0) for geo_code in areas], dtype=float)
+        national = np.array([us_industries.get(code, {}).get(measure, 0) for code in codes], dtype=float)
+        national_total = us_industries.get("10", {}).get(measure, 0)
+        fill_nested(industries, areas, codes, lq_field, location_quotients(local, local_totals, national, national_total))
+        
+        # Concentration across the requested industries, from employment only
+        if measure == "employees":
+            for geo_code, hhi, hachman in zip(areas, herfindahl_index(local), hachman_index(local, national)):
+                location_data[geo_code]["employee_hhi"] = round(float(hhi), 4)
+                location_data[geo_code]["employee_hachman_index"] = round(float(hachman), 4)
+
+
+def _location_data_from_rows(rows: List[Dict[str, Any]], geo_codes: List[str], industry_codes: List[str]) -> Dict[str, Any]:
+    """Build the get_qcew_data result from annual-average rows read from slices or the local store."""
+    # Prefer private over total covered ownership, as the API path does: supersectors and
+    # most NAICS rows are private only, so the all-industry denominator must be private too
+    chosen = {}
+    for row in rows:
+        key = (row["area_fips"], row["industry_code"])
+        if key not in chosen or row["own_code"] == _PREFERRED_OWNERSHIP:
+            chosen[key] = row
+    
+    industry_index = get_code_index("naics")
+    area_index = get_code_index("qcew_area")
+    ownership_names = {"0": "Total Covered", "5": "Private"}
+    location_data = {}
+    for geo_code in geo_codes:
+        for industry_code in industry_codes:
+            row = chosen.get((geo_code, industry_code))
+            if row is None:
+                continue
+            if geo_code not in location_data:
+                location_data[geo_code] = {
+                    "area_name": area_index.name(geo_code, geo_code),
+                    "industries": {},
+                    "total_employees": 0,
+                    "total_establishments": 0
+                }
+            location_data[geo_code]["industries"][industry_code] = {
+                "industry_name": industry_index.name(industry_code, industry_code),
+                "parent_industry_code": industry_index.parent(industry_code),
+                "employees": row["employees"],
+                "establishments": row["establishments"],
+                "ownership": ownership_names[row["own_code"]],
+                "size": "All sizes",
+                "periodName": "Annual",
+                "year": str(row["year"])
+            }
+            location_data[geo_code]["total_employees"] += row["employees"]
+            location_data[geo_code]["total_establishments"] += row["establishments"]
+    
+    _add_location_quotients(location_data)
+    return {"locations": location_data}
+
+
+def _get_qcew_data_from_slices(geo_codes: List[str], industry_codes: List[str], year: str = None) -> Dict[str, Any]:
+    """Build the get_qcew_data result from QCEW open data slices (annual averages)."""
+    rows, slice_year = get_qcew_slice_rows(geo_codes, industry_codes, year)
+    if slice_year is None:
+        return {"status": "error", "error_message": f"No QCEW open data slices found for {year or 'the last two years'}."}
+    return _location_data_from_rows(rows, geo_codes, industry_codes)
+
+
+def _get_qcew_data_from_store(geo_codes: List[str], industry_codes: List[str], year: str = None) -> Dict[str, Any]:
+    """Build the get_qcew_data result from the local QCEW Parquet store (annual averages)."""
+    try:
+        annual_years = [store_year for store_year, qtr in qcew_store_partitions() if qtr == "A"]
+        if not annual_years:
+            return {"status": "error", "error_message": "No annual QCEW data in the local store. Ingest singlefile archives with python -m tools.qcew_data.qcew_store."}
+        rows = query_qcew_store(
+            area_codes=geo_codes,
+            industry_codes=industry_codes,
+            ownership_codes=["0", "5"],
+            years=[int(year) if year else annual_years[0]],
+            quarters=["A"]
+        )
+    except ImportError:
+        return {"status": "error", "error_message": "The QCEW store backend requires pyarrow (pip install pyarrow)."}
+    return _location_data_from_rows(rows or [], geo_codes, industry_codes)
+
+
+def get_qcew_data(geo_codes: List[str], industry_codes: List[str], year: str = None, backend: str = "api") -> Dict[str, Any]:
     """
     Get simplified QCEW industry establishment and employee data for multiple locations and industries.
     Calculate location quotients for establishment and employee metrics.
     
     Args:
-        geo_codes (list): List of geographic area codes (e.g., ["US000", "C1954"])
+        geo_codes (list): List of geographic area codes (e.g., ["US000", "C1954"]). 2-digit state FIPS codes are accepted.
         industry_codes (list): List of industry codes (e.g., ["10", "111"])
         year (str, optional): Specific year to retrieve data for (e.g., "2023"). If not provided, gets latest data.
+        backend (str, optional): "api" (default) fetches each series from the BLS timeseries API; "slices" reads
+                                 annual averages from the QCEW open data CSV slices, one download per area or
+                                 industry, which is faster for many-industry or many-area requests; "store"
+                                 reads annual averages from the local QCEW Parquet store built from the BLS
+                                 singlefile archives, with no network calls.
         For example, to get manufacturing (1013) data for DuPage County Illinois (17043), you would use get_qcew_data(["17043"], ["1013"])
     
+    Every backend reports private ownership where it is published and total covered otherwise,
+    so the all-industry total (10) that LQs divide by matches the private-only supersector and
+    NAICS rows.
+    
     Returns:
-        dict: JSON data containing employment and establishment data with location quotients
+        dict: {"locations": area code -> employment and establishment data with location quotients},
+              plus "partial_results" listing the missing series when some BLS batches fail after
+              retries, or {"status": "error", "error_message": ...} when the BLS API daily budget
+              is exhausted.
     """
-    base_url = "https://api.bls.gov/publicAPI/v2/timeseries/data/"
-    headers = {"Content-Type": "application/json"}
-
     # Define data types for series ID construction
     qcew_data_types = {
         "1": "All Employees",
@@ -36,10 +167,17 @@ def get_qcew_data(geo_codes: List[str], industry_codes: List[str], year: str = N
         "0": "All sizes",
     }
 
-    # Always include US total and all industries total
-    all_geo_codes = ["US000"] + geo_codes
+    # Always include US total and all industries total; 2-digit state FIPS codes become QCEW statewide areas
+    all_geo_codes = ["US000"] + [_to_qcew_area(geo_code) for geo_code in geo_codes]
     all_industry_codes = ["10"] + industry_codes
     
+    if backend == "slices":
+        return _get_qcew_data_from_slices(all_geo_codes, all_industry_codes, year)
+    if backend == "store":
+        return _get_qcew_data_from_store(all_geo_codes, all_industry_codes, year)
+    if backend != "api":
+        return {"status": "error", "error_message": "backend must be 'api', 'slices' or 'store'."}
+    
     # Generate series IDs for all combinations
     series_ids = []
     for geo_code in all_geo_codes:
@@ -51,37 +189,38 @@ def get_qcew_data(geo_codes: List[str], industry_codes: List[str], year: str = N
     
     # Initialize data structure
     location_data = {}
+    industry_index = get_code_index("naics")
+    area_index = get_code_index("qcew_area")
     
-    # Process in batches of 50 series IDs
-    for i in range(0, len(series_ids), 50):
-        batch = series_ids[i:i + 50]
-        api_key = "243f61eeaa6c450db0a2ecb8dc08c44f"
-        
-        # Set up parameters based on whether year is specified
-        if year:
-            params = {
-                "seriesid": batch,
-                "startyear": year,
-                "endyear": year,
-                "registrationkey": api_key,
-            }
-        else:
-            params = {
-                "seriesid": batch,
-                "latest": "true",
-                "registrationkey": api_key,
-            }
-        
-        try:
-            response = requests.post(base_url, data=json.dumps(params), headers=headers)
-            response.raise_for_status()
-            json_response = response.json()
-            
-            if json_response.get("status") != "REQUEST_SUCCEEDED":
-                continue
-                
-            for series in json_response.get("Results", {}).get("series", []):
+    # Set up parameters based on whether year is specified
+    if year:
+        params = {"startyear": year, "endyear": year}
+    else:
+        params = {"latest": "true"}
+    
+    # Cached series come first; batches of 50 series IDs are fetched concurrently and returned in order
+    try:
+        # U.S. series are the LQ baseline and are reused across requests until the next quarterly release
+        baseline_ids = [series_id for series_id in series_ids if series_id[3:8] == "US000"]
+        batch_results = fetch_bls_series(series_ids, params, baseline_ids, "quarterly")
+    except BLSQuotaExceededError as e:
+        return {"status": "error", "error_message": str(e)}
+    
+    # One ownership per (area, industry): private when it has data, as for slices and the store
+    chosen_ownership = {}
+    for batch_series in batch_results:
+        for series in batch_series:
+            series_id = series.get("seriesID") or ""
+            cell = (series_id[3:8], series_id[11:])
+            if series.get("data") and (cell not in chosen_ownership or series_id[10:11] == _PREFERRED_OWNERSHIP):
+                chosen_ownership[cell] = series_id[10:11]
+    
+    for batch_series in batch_results:
+        for series in batch_series:
+            try:
                 series_id = series["seriesID"]
+                if chosen_ownership.get((series_id[3:8], series_id[11:])) != series_id[10:11]:
+                    continue
                 geo_code = series_id[3:8]
                 industry_code = series_id[11:]
                 data_type = qcew_data_types.get(series_id[8:9], "Unknown")
@@ -95,6 +234,7 @@ def get_qcew_data(geo_codes: List[str], industry_codes: List[str], year: str = N
                 # Initialize location if not exists
                 if geo_code not in location_data:
                     location_data[geo_code] = {
+                        "area_name": area_index.name(geo_code, geo_code),
                         "industries": {},
                         "total_employees": 0,
                         "total_establishments": 0
@@ -103,7 +243,8 @@ def get_qcew_data(geo_codes: List[str], industry_codes: List[str], year: str = N
                 # Initialize industry if not exists
                 if industry_code not in location_data[geo_code]["industries"]:
                     location_data[geo_code]["industries"][industry_code] = {
-                        "industry_name": industry_code,
+                        "industry_name": industry_index.name(industry_code, industry_code),
+                        "parent_industry_code": industry_index.parent(industry_code),
                         "employees": 0,
                         "establishments": 0,
                         "ownership": ownership_code,
@@ -132,66 +273,21 @@ def get_qcew_data(geo_codes: List[str], industry_codes: List[str], year: str = N
                         location_data[geo_code]["industries"][industry_code]["establishments"] = value
                         location_data[geo_code]["total_establishments"] += value
                         
-        except Exception as e:
-            print(f"Error processing batch: {str(e)}")
-            continue
-    
-    # Calculate Location Quotients
-    # First, get national totals from US data
-    us_data = location_data.get("US000", {})
-    us_industries = us_data.get("industries", {})
-    
-    # Calculate LQs for each location and industry
-    for geo_code, geo_info in location_data.items():
-        # Skip US total when calculating LQs
-        if geo_code == "US000":
-            # Set LQs to 1.0 for US total
-            for industry_code, industry_info in geo_info["industries"].items():
-                industry_info["establishment_lq"] = 1.0
-                industry_info["employee_lq"] = 1.0
-            continue
-            
-        # Get the all industries total (10) for this location
-        all_industries_data = geo_info["industries"].get("10", {})
-        all_industries_employees = all_industries_data.get("employees", 0)
-        all_industries_establishments = all_industries_data.get("establishments", 0)
-        
-        # Get the all industries total (10) for US
-        us_all_industries_data = us_industries.get("10", {})
-        us_all_industries_employees = us_all_industries_data.get("employees", 0)
-        us_all_industries_establishments = us_all_industries_data.get("establishments", 0)
-        
-        for industry_code, industry_info in geo_info["industries"].items():
-            # Skip the all industries total (10) when calculating LQs
-            if industry_code == "10":
-                continue
-                
-            # Get the US total for this industry
-            us_industry_data = us_industries.get(industry_code, {})
-            us_industry_employees = us_industry_data.get("employees", 0)
-            us_industry_establishments = us_industry_data.get("establishments", 0)
-            
-            # Calculate Employee LQ
-            if all_industries_employees > 0 and us_all_industries_employees > 0:
-                local_employee_share = industry_info["employees"] / all_industries_employees
-                national_employee_share = us_industry_employees / us_all_industries_employees
-                employee_lq = local_employee_share / national_employee_share if national_employee_share > 0 else 0
-            else:
-                employee_lq = 0
-            
-            # Calculate Establishment LQ
-            if all_industries_establishments > 0 and us_all_industries_establishments > 0:
-                local_establishment_share = industry_info["establishments"] / all_industries_establishments
-                national_establishment_share = us_industry_establishments / us_all_industries_establishments
-                establishment_lq = local_establishment_share / national_establishment_share if national_establishment_share > 0 else 0
-            else:
-                establishment_lq = 0
-            
-            # Add LQs to industry info
-            industry_info["establishment_lq"] = round(establishment_lq, 2)
-            industry_info["employee_lq"] = round(employee_lq, 2)
-    
-    return location_data
+            except Exception as e:
+                logger.warning(f"Error processing BLS series {series.get('seriesID')}: {e}")
+                # Reported with the series whose batches failed to download
+                batch_results.failed_series_ids.append(series.get("seriesID"))
+                batch_results.errors.append(f"Error processing series: {e}")
+    
+    _add_location_quotients(location_data)
+    
+    result = {"locations": location_data}
+    # Series whose batches failed after retries, or could not be read, are reported rather than silently missing
+    partial_results = batch_results.partial_results()
+    if partial_results:
+        result["partial_results"] = partial_results
+    
+    return result
 
 if __name__ == "__main__":
     # Test with latest data (default)
@@ -1,6 +1,10 @@
+from functools import lru_cache
 from typing import Dict, List, Tuple, Optional, Union
 import re
 
+from tools.common.lookup_index import LookupIndex
+from tools.common.lookup_tables import load_lookup_table
+
 """
 QCEW NAICS Search Tool
 
@@ -11,6 +15,10 @@ This is designed for use as an LLM tool to provide manageable result sets.
 
 def _get_qcew_naics_data() -> Dict[str, str]:
     """Internal function containing the complete QCEW NAICS dictionary."""
+    # A built lookup-table artifact replaces the table below (python -m tools.common.lookup_tables)
+    table = load_lookup_table("naics")
+    if table is not None:
+        return table.as_dict()
     naics_dictionary: Dict[str, str] = {
         "10": "10 Total, all industries",
         "101": "101 Goods-producing",
@@ -2693,18 +2701,30 @@ def _get_qcew_naics_data() -> Dict[str, str]:
         }
     return naics_dictionary
 
-def search_qcew_naics(keyword: List[str]) -> List[Tuple[str, str]]:
+
+@lru_cache(maxsize=1)
+def _get_qcew_naics_index() -> LookupIndex:
+    """Internal function returning the typo-tolerant index over industry names, built on first use."""
+    table = load_lookup_table("naics")
+    if table is not None:
+        return table.lookup_index()
+    return LookupIndex((name, code) for code, name in _get_qcew_naics_data().items())
+
+def search_qcew_naics(keyword: List[str], max_results: Optional[int] = None) -> List[Tuple[str, str]]:
     """
     Search for NAICS industries by keyword(s) and return their NAICS codes.
     
-    Supports flexible multi-word searches and multiple search terms. Results are prioritized by match quality:
-    1. Exact word matches (e.g., "manufacturing" → "Manufacturing")
-    2. All words match (e.g., "food manufacturing" → "Food manufacturing") 
-    3. Partial matches (e.g., "manuf" → "Manufacturing")
+    Supports flexible multi-word searches and multiple search terms. Results are ranked by
+    relevance (BM25): whole-word matches score above prefix matches (e.g., "manuf" →
+    "Manufacturing") and misspellings, rarer words count for more than common ones, and
+    shorter names that match fully rank above longer ones. When fewer than max_results
+    industries match that way, names containing the terms anywhere (e.g., "ware" →
+    "Software publishers") fill the remaining places.
     
     Args:
         keyword (List[str]): Search term(s) to match against industry names (case-insensitive).
                             List of strings for multiple searches, or single item list for one search.
+        max_results (Optional[int]): Maximum number of results to return (default: all matches)
     
     Returns:
         List[Tuple[str, str]]: List of (industry_name, naics_code) tuples matching the search(es)
@@ -2726,7 +2746,7 @@ def search_qcew_naics(keyword: List[str]) -> List[Tuple[str, str]]:
     if not keywords:
         return []
     
-    naics_data = _get_qcew_naics_data()
+    index = _get_qcew_naics_index()
     all_results = []
     
     # Process each keyword separately
@@ -2738,27 +2758,9 @@ def search_qcew_naics(keyword: List[str]) -> List[Tuple[str, str]]:
         if not search_terms:
             continue
         
-        # Find matches with different priority levels for this keyword
-        exact_matches = []
-        all_word_matches = []
-        partial_matches = []
+        # Rank matching industries by relevance, with prefix and typo-tolerant matching
+        keyword_results = index.search(search_terms, max_results)
         
-        for naics_code, industry_name in naics_data.items():
-            industry_lower = industry_name.lower()
-            industry_words = re.split(r'\W+', industry_lower)
-            
-            # Priority 1: Single term that exactly matches a word in the industry name
-            if len(search_terms) == 1 and search_terms[0] in industry_words:
-                exact_matches.append((industry_name, naics_code))
-            # Priority 2: All search terms appear as words in the industry name
-            elif len(search_terms) > 1 and all(term in industry_words for term in search_terms):
-                all_word_matches.append((industry_name, naics_code))
-            # Priority 3: All search terms appear somewhere in the industry name (substring match)
-            elif all(term in industry_lower for term in search_terms):
-                partial_matches.append((industry_name, naics_code))
-        
-        # Combine results for this keyword, prioritizing exact matches
-        keyword_results = exact_matches + all_word_matches + partial_matches
         all_results.extend(keyword_results)
     
     # Remove duplicates while preserving order
@@ -2769,6 +2771,10 @@ def search_qcew_naics(keyword: List[str]) -> List[Tuple[str, str]]:
             seen.add(result)
             unique_results.append(result)
     
+    # Apply max_results limit
+    if max_results and max_results > 0:
+        unique_results = unique_results[:max_results]
+    
     return unique_results
 
 if __name__ == "__main__":
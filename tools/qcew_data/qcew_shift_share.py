@@ -0,0 +1,198 @@
+import json
+from datetime import date
+from typing import Dict, Any, List, Optional
+
+import numpy as np
+
+from tools.common.bls_api import BLSQuotaExceededError
+from tools.common.code_index import get_code_index
+from tools.common.regional_metrics import shift_share
+from tools.qcew_data.qcew_data import _to_qcew_area
+from tools.qcew_data.qcew_store import query_qcew_store, qcew_store_partitions
+from tools.qcew_data.qcew_timeseries import fetch_qcew_quarterly, MAX_YEARS
+
+"""
+QCEW Shift-Share Analysis
+
+This module decomposes the employment change of each area and industry between two periods
+into national growth, industry mix and competitive (regional) share. Both periods, the
+areas and the U.S. baseline come from one ranged BLS request per batch of 50 series (or
+from the series cache), or from the local QCEW store; the decomposition itself is a single
+vectorized pass over the (area, industry) matrix.
+"""
+
+
+def _periods_from_api(area_codes: List[str], industry_codes: List[str], base_year: int, end_year: Optional[int]) -> Dict[str, Any]:
+    """Employment in the latest published quarter and the same quarter of base_year."""
+    end_year = end_year or date.today().year
+    if end_year - base_year + 1 > MAX_YEARS:
+        raise ValueError(f"base_year and end_year may be at most {MAX_YEARS - 1} years apart.")
+    rows, partial_results = fetch_qcew_quarterly(area_codes, industry_codes, base_year, end_year, ("1",))
+    national = rows.get(("US000", "10", "1"))
+    if national is None:
+        raise ValueError(f"No U.S. total employment found for {base_year}-{end_year}.")
+    # Comparing like quarters keeps seasonality out of the change
+    end_column = int(np.flatnonzero(~np.isnan(national[1]))[-1])
+    base_column = end_column % 4
+
+    def _value(area_code: str, industry_code: str, column: int) -> float:
+        row = rows.get((area_code, industry_code, "1"))
+        return row[1][column] if row is not None else np.nan
+
+    return {
+        "base_period": f"{base_year}-Q{base_column + 1}",
+        "end_period": f"{base_year + end_column // 4}-Q{end_column % 4 + 1}",
+        "value": lambda area_code, industry_code, which: _value(area_code, industry_code, base_column if which == "base" else end_column),
+        "partial_results": partial_results,
+    }
+
+
+def _periods_from_store(area_codes: List[str], industry_codes: List[str], base_year: int, end_year: Optional[int]) -> Dict[str, Any]:
+    """Annual average employment in base_year and end_year (the newest stored year by default)."""
+    annual_years = [year for year, qtr in qcew_store_partitions() if qtr == "A"]
+    if not annual_years:
+        raise ValueError("No annual QCEW data in the local store. Ingest singlefile archives with python -m tools.qcew_data.qcew_store.")
+    end_year = end_year or annual_years[0]
+    rows = query_qcew_store(area_codes, industry_codes, ["0", "5"], [base_year, end_year], ["A"]) or []
+
+    # Prefer total covered over private ownership when both exist
+    values: Dict[tuple, Dict[str, Any]] = {}
+    for row in rows:
+        key = (row["area_fips"], row["industry_code"], row["year"])
+        if key not in values or row["own_code"] == "0":
+            values[key] = row
+
+    def _value(area_code: str, industry_code: str, which: str) -> float:
+        row = values.get((area_code, industry_code, base_year if which == "base" else end_year))
+        return float(row["employees"]) if row is not None else np.nan
+
+    return {"base_period": f"{base_year} annual average", "end_period": f"{end_year} annual average", "value": _value}
+
+
+def get_qcew_shift_share(
+    geo_codes: List[str],
+    industry_codes: List[str],
+    base_year: str,
+    end_year: Optional[str] = None,
+    backend: str = "api"
+) -> Dict[str, Any]:
+    """
+    Shift-share analysis of QCEW employment for areas and industries between two periods.
+
+    Each industry's change is split into national growth (what it would have gained growing
+    with total U.S. employment), industry mix (the industry's national growth above or
+    below that) and competitive share (local growth above or below the industry's national
+    growth). The three components sum to the actual change.
+
+    Args:
+        geo_codes (list): Geographic area codes (e.g., ["17043"]). 2-digit state FIPS codes are accepted.
+        industry_codes (list): Industry codes (e.g., ["1013", "1023"])
+        base_year (str): Base year (e.g., "2019")
+        end_year (str, optional): End year; defaults to the latest published data
+        backend (str, optional): "api" (default) compares the latest published quarter with the same
+                                 quarter of base_year from the BLS API; "store" compares annual averages
+                                 from the local QCEW Parquet store.
+
+    Returns:
+        dict: Response containing:
+            - status: "success" or "error"
+            - base_period, end_period: The periods compared
+            - national_growth_rate: Total U.S. employment growth between them
+            - areas: Area code -> {"area_name", "industries": code -> {"industry_name", "base_employees",
+                     "end_employees", "change", "national_growth", "industry_mix", "competitive_share",
+                     "incomplete"}, "totals": the same components summed over the industries with both
+                     periods}. An industry missing either period (suppressed or unpublished) has
+                     "incomplete": true, None for change and the components, and is left out of the totals.
+            - partial_results: Series missing because their BLS batches failed (only when some did)
+            - error_message: Error details (if unsuccessful)
+    """
+    try:
+        base_year = int(base_year)
+        end_year = int(end_year) if end_year else None
+        if end_year is not None and end_year <= base_year:
+            return {"status": "error", "error_message": "end_year must be after base_year."}
+        if not geo_codes or not industry_codes:
+            return {"status": "error", "error_message": "geo_codes and industry_codes must be non-empty lists."}
+        if backend not in ("api", "store"):
+            return {"status": "error", "error_message": "backend must be 'api' or 'store'."}
+
+        area_codes = [area_code for area_code in dict.fromkeys(map(_to_qcew_area, geo_codes)) if area_code != "US000"]
+        industry_codes = [industry_code for industry_code in dict.fromkeys(industry_codes) if industry_code != "10"]
+        if not area_codes or not industry_codes:
+            return {"status": "error", "error_message": "Provide at least one sub-national area and one industry other than the all-industry total (10)."}
+        # The U.S. and all-industry series are the national baseline
+        fetch_areas, fetch_industries = ["US000"] + area_codes, ["10"] + industry_codes
+        try:
+            if backend == "store":
+                periods = _periods_from_store(fetch_areas, fetch_industries, base_year, end_year)
+            else:
+                periods = _periods_from_api(fetch_areas, fetch_industries, base_year, end_year)
+        except BLSQuotaExceededError as e:
+            return {"status": "error", "error_message": str(e)}
+        except ValueError as e:
+            return {"status": "error", "error_message": str(e)}
+        except ImportError:
+            return {"status": "error", "error_message": "The QCEW store backend requires pyarrow (pip install pyarrow)."}
+
+        value = periods["value"]
+        base = np.array([[value(area_code, code, "base") for code in industry_codes] for area_code in area_codes], dtype=float)
+        current = np.array([[value(area_code, code, "end") for code in industry_codes] for area_code in area_codes], dtype=float)
+        national_base = np.array([value("US000", code, "base") for code in industry_codes], dtype=float)
+        national_current = np.array([value("US000", code, "end") for code in industry_codes], dtype=float)
+        total_base, total_current = value("US000", "10", "base"), value("US000", "10", "end")
+        if np.isnan(total_base) or np.isnan(total_current) or total_base <= 0:
+            return {"status": "error", "error_message": f"No U.S. total employment found for {periods['base_period']} and {periods['end_period']}."}
+
+        components = shift_share(base, current, national_base, national_current, total_base, total_current)
+        present = ~(np.isnan(base) & np.isnan(current))
+        complete = ~(np.isnan(base) | np.isnan(current))
+
+        def _component(name: str, row: int, column: int) -> Optional[float]:
+            return round(float(components[name][row, column]), 1) if complete[row, column] else None
+
+        industry_index = get_code_index("naics")
+        area_index = get_code_index("qcew_area")
+        areas = {}
+        for row, area_code in enumerate(area_codes):
+            industries = {}
+            for column, industry_code in enumerate(industry_codes):
+                if not present[row, column]:
+                    continue
+                industries[industry_code] = {
+                    "industry_name": industry_index.name(industry_code, industry_code),
+                    "base_employees": None if np.isnan(base[row, column]) else int(base[row, column]),
+                    "end_employees": None if np.isnan(current[row, column]) else int(current[row, column]),
+                    "change": _component("change", row, column),
+                    "national_growth": _component("national_share", row, column),
+                    "industry_mix": _component("industry_mix", row, column),
+                    "competitive_share": _component("regional_shift", row, column),
+                    "incomplete": not complete[row, column],
+                }
+            areas[area_code] = {
+                "area_name": area_index.name(area_code, area_code),
+                "industries": industries,
+                "totals": {
+                    "change": round(float(components["change"][row][complete[row]].sum()), 1),
+                    "national_growth": round(float(components["national_share"][row][complete[row]].sum()), 1),
+                    "industry_mix": round(float(components["industry_mix"][row][complete[row]].sum()), 1),
+                    "competitive_share": round(float(components["regional_shift"][row][complete[row]].sum()), 1),
+                },
+            }
+
+        response = {
+            "status": "success",
+            "base_period": periods["base_period"],
+            "end_period": periods["end_period"],
+            "national_growth_rate": round(float(total_current / total_base - 1), 4),
+            "areas": areas,
+        }
+        if periods.get("partial_results"):
+            response["partial_results"] = periods["partial_results"]
+        return response
+
+    except Exception as e:
+        return {"status": "error", "error_message": f"Unexpected error: {str(e)}"}
+
+
+if __name__ == "__main__":
+    print(json.dumps(get_qcew_shift_share(["17043"], ["1013", "1023"], "2019"), indent=2))
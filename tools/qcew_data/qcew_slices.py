@@ -0,0 +1,154 @@
+import csv
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date
+from typing import Dict, List, Optional, Any, Tuple
+
+from tools.common.cache import TTLCache
+from tools.common.upstream import upstream_get
+
+"""
+QCEW Open Data Slices
+
+This module reads the BLS QCEW open data CSV slices, which return every industry for one
+area (/area/{area}.csv) or every area for one industry (/industry/{code}.csv) for a year
+and quarter in a single file. A query for many industries or many areas is answered from
+one download per area or industry instead of one API series per combination. Slices are
+parsed with a streaming CSV reader, trimmed to the columns the QCEW tools use and cached.
+"""
+
+_SETTINGS: Dict[str, Any] = {
+    "base_url": "https://data.bls.gov/cew/data/api",
+    "timeout_seconds": 120,
+    "max_parallel_downloads": 4,
+}
+
+# Parsed slices keyed by (kind, code, year, quarter); an area slice is a few thousand rows
+_SLICE_CACHE = TTLCache(ttl_seconds=24 * 60 * 60, max_entries=256)
+
+# Ownership codes kept from each slice: total covered and private
+_OWNERSHIP_CODES = ("0", "5")
+
+
+def set_qcew_slice_source(base_url: Optional[str] = None, cache_ttl_seconds: Optional[float] = None) -> None:
+    """Point the slice reader at another server (e.g., a local mirror) and set the cache TTL."""
+    if base_url:
+        _SETTINGS["base_url"] = base_url.rstrip("/")
+    if cache_ttl_seconds is not None:
+        _SLICE_CACHE.ttl_seconds = cache_ttl_seconds
+
+
+def _slice_url(kind: str, code: str, year: str, quarter: str) -> str:
+    return f"{_SETTINGS['base_url']}/{year}/{quarter}/{kind}/{code}.csv"
+
+
+def _parse_row(row: Dict[str, str], annual: bool) -> Dict[str, Any]:
+    def _int(value: Optional[str]) -> int:
+        try:
+            return int(float(value)) if value not in (None, "") else 0
+        except ValueError:
+            return 0
+
+    def _float(value: Optional[str]) -> float:
+        try:
+            return float(value) if value not in (None, "") else 0.0
+        except ValueError:
+            return 0.0
+
+    return {
+        "area_fips": row["area_fips"].strip(),
+        "own_code": row["own_code"].strip(),
+        "industry_code": row["industry_code"].strip(),
+        "year": row["year"].strip(),
+        "qtr": row["qtr"].strip(),
+        "disclosed": row.get("disclosure_code", "").strip() != "N",
+        "establishments": _int(row.get("annual_avg_estabs" if annual else "qtrly_estabs")),
+        "employees": _int(row.get("annual_avg_emplvl" if annual else "month3_emplvl")),
+        "avg_weekly_wage": _int(row.get("annual_avg_wkly_wage" if annual else "avg_wkly_wage")),
+        "employee_lq": _float(row.get("lq_annual_avg_emplvl" if annual else "lq_month3_emplvl")),
+    }
+
+
+def fetch_qcew_slice(kind: str, code: str, year: str, quarter: str = "a") -> Optional[List[Dict[str, Any]]]:
+    """
+    Download and parse one QCEW open data slice, or return it from the cache.
+
+    Args:
+        kind: "area" or "industry"
+        code: QCEW area code (e.g., "17043", "C1698", "US000") or industry code (e.g., "1013")
+        year: Four-digit year
+        quarter: "1" to "4", or "a" for annual averages
+
+    Returns:
+        Rows for total covered and private ownership at all establishment sizes, or None
+        when the slice does not exist (e.g., a year not yet published)
+    """
+    if kind not in ("area", "industry"):
+        raise ValueError("kind must be 'area' or 'industry'")
+    quarter = str(quarter).lower()
+    key = (kind, code, str(year), quarter)
+    rows = _SLICE_CACHE.get(key)
+    if rows is not None:
+        return rows
+
+    response = upstream_get(_slice_url(kind, code, year, quarter), stream=True, timeout=_SETTINGS["timeout_seconds"])
+    try:
+        if response.status_code == 404:
+            return None
+        response.raise_for_status()
+        # Decode line by line so the whole file is never held as one string
+        lines = (line.decode("utf-8-sig") if isinstance(line, bytes) else line for line in response.iter_lines())
+        annual = quarter == "a"
+        rows = [
+            _parse_row(row, annual)
+            for row in csv.DictReader(lines)
+            if row.get("own_code", "").strip() in _OWNERSHIP_CODES and row.get("size_code", "0").strip() == "0"
+        ]
+    finally:
+        response.close()
+
+    _SLICE_CACHE.set(key, rows)
+    return rows
+
+
+def _candidate_years(year: Optional[str]) -> List[str]:
+    # Annual averages are published about nine months after the year ends
+    if year:
+        return [str(year)]
+    current = date.today().year
+    return [str(current - 1), str(current - 2)]
+
+
+def get_qcew_slice_rows(
+    geo_codes: List[str],
+    industry_codes: List[str],
+    year: Optional[str] = None,
+    quarter: str = "a"
+) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+    """
+    Rows for every (area, industry) combination requested, read from as few slices as possible.
+
+    Area slices are used when there are no more areas than industries, industry slices
+    otherwise. Without a year the most recent published year is used.
+
+    Returns:
+        Tuple of (rows, year used), with year None when no slice was found
+    """
+    geo_set, industry_set = set(geo_codes), set(industry_codes)
+    if len(geo_set) <= len(industry_set):
+        kind, codes = "area", list(dict.fromkeys(geo_codes))
+    else:
+        kind, codes = "industry", list(dict.fromkeys(industry_codes))
+
+    for candidate_year in _candidate_years(year):
+        with ThreadPoolExecutor(max_workers=min(_SETTINGS["max_parallel_downloads"], len(codes)) or 1) as executor:
+            slices = list(executor.map(lambda code: fetch_qcew_slice(kind, code, candidate_year, quarter), codes))
+        if any(slice_rows is not None for slice_rows in slices):
+            rows = [
+                row
+                for slice_rows in slices if slice_rows
+                for row in slice_rows
+                if row["area_fips"] in geo_set and row["industry_code"] in industry_set
+            ]
+            return rows, candidate_year
+
+    return [], None
@@ -0,0 +1,329 @@
+import argparse
+import glob
+import io
+import json
+import os
+import shutil
+import zipfile
+from datetime import datetime
+from functools import lru_cache
+from typing import Dict, List, Optional, Any, Iterator, Tuple
+
+from tools.common.code_index import get_code_index
+
+"""
+QCEW Columnar Store
+
+This module ingests the BLS QCEW "singlefile" annual and quarterly CSV archives from a
+local path into a Parquet dataset partitioned by year and quarter, and queries it with
+predicate pushdown on area, industry, ownership and period. Screening every county in
+a state across all 6-digit NAICS industries then reads only the matching partitions and
+row groups instead of calling the BLS API.
+
+Build it with:
+    python -m tools.qcew_data.qcew_store 2023.annual.singlefile.zip 2024.q1-q4.singlefile.zip
+
+Requires pyarrow.
+"""
+
+# Store columns; quarterly files report third-month employment as "employees"
+STORE_COLUMNS = [
+    "area_fips", "own_code", "industry_code", "agglvl_code", "disclosure_code",
+    "establishments", "employees", "total_wages", "avg_weekly_wage", "employee_lq",
+]
+
+_ANNUAL_COLUMNS = {
+    "annual_avg_estabs": "establishments",
+    "annual_avg_emplvl": "employees",
+    "total_annual_wages": "total_wages",
+    "annual_avg_wkly_wage": "avg_weekly_wage",
+    "lq_annual_avg_emplvl": "employee_lq",
+}
+
+_QUARTERLY_COLUMNS = {
+    "qtrly_estabs": "establishments",
+    "month3_emplvl": "employees",
+    "total_qtrly_wages": "total_wages",
+    "avg_wkly_wage": "avg_weekly_wage",
+    "lq_month3_emplvl": "employee_lq",
+}
+
+# Rows per Parquet row group; files are sorted by area and industry so group statistics prune well
+_ROW_GROUP_SIZE = 100_000
+_CHUNK_ROWS = 1_000_000
+
+_SETTINGS: Dict[str, Any] = {"data_dir": os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "..", "data", "qcew_store")}
+
+
+def set_qcew_store_dir(data_dir: str) -> None:
+    """Set the directory holding the partitioned QCEW Parquet store."""
+    _SETTINGS["data_dir"] = data_dir
+    _open_dataset.cache_clear()
+
+
+def _store_root(data_dir: Optional[str] = None) -> str:
+    return os.path.join(data_dir or _SETTINGS["data_dir"], "qcew")
+
+
+def _open_csv_chunks(path: str) -> Iterator[Any]:
+    """Yield DataFrame chunks of a singlefile CSV, or of the CSV inside a singlefile zip."""
+    import pandas as pd
+
+    read_options = {"dtype": str, "chunksize": _CHUNK_ROWS, "keep_default_na": False}
+    if path.lower().endswith(".zip"):
+        with zipfile.ZipFile(path) as archive:
+            for member in archive.namelist():
+                if member.lower().endswith(".csv"):
+                    with archive.open(member) as handle:
+                        yield from pd.read_csv(io.TextIOWrapper(handle, encoding="utf-8-sig"), **read_options)
+    else:
+        yield from pd.read_csv(path, encoding="utf-8-sig", **read_options)
+
+
+def _to_store_frame(chunk: Any) -> Any:
+    """Keep all-size rows and rename annual or quarterly measures to the store columns."""
+    import pandas as pd
+
+    chunk.columns = [column.strip() for column in chunk.columns]
+    chunk = chunk[chunk["size_code"].str.strip() == "0"]
+    renames = _ANNUAL_COLUMNS if "annual_avg_emplvl" in chunk.columns else _QUARTERLY_COLUMNS
+    frame = pd.DataFrame({
+        "area_fips": chunk["area_fips"].str.strip(),
+        "own_code": chunk["own_code"].str.strip(),
+        "industry_code": chunk["industry_code"].str.strip(),
+        "agglvl_code": pd.to_numeric(chunk["agglvl_code"], errors="coerce").fillna(0).astype("int16"),
+        "disclosure_code": chunk["disclosure_code"].str.strip(),
+        "year": pd.to_numeric(chunk["year"], errors="coerce").astype("int16"),
+        "qtr": chunk["qtr"].str.strip().str.upper(),
+    })
+    for source, target in renames.items():
+        values = pd.to_numeric(chunk[source], errors="coerce") if source in chunk.columns else 0
+        frame[target] = values
+    for column in ("establishments", "employees"):
+        frame[column] = frame[column].fillna(0).astype("int64")
+    for column in ("total_wages", "avg_weekly_wage", "employee_lq"):
+        frame[column] = frame[column].astype("float64")
+    return frame.sort_values(["area_fips", "industry_code", "own_code"], kind="stable")
+
+
+def ingest_qcew_singlefiles(paths: List[str], data_dir: Optional[str] = None) -> Dict[str, int]:
+    """
+    Load QCEW singlefile archives into the partitioned Parquet store.
+
+    Each (year, quarter) partition found in a file replaces any earlier ingestion of it,
+    so re-running the job with a revised file is safe.
+
+    Args:
+        paths: Local paths to "YYYY.annual.singlefile" or "YYYY.q1-q4.singlefile" CSV or zip files
+        data_dir: Store directory (defaults to the configured directory)
+
+    Returns:
+        Rows written per partition, keyed like "2023/A"
+    """
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    root = _store_root(data_dir)
+    written: Dict[str, int] = {}
+    part_numbers: Dict[Tuple[int, str], int] = {}
+    for path in paths:
+        for chunk in _open_csv_chunks(path):
+            frame = _to_store_frame(chunk)
+            for (year, qtr), partition in frame.groupby(["year", "qtr"], sort=True):
+                key = (int(year), str(qtr))
+                directory = os.path.join(root, f"year={key[0]}", f"qtr={key[1]}")
+                if key not in part_numbers:
+                    shutil.rmtree(directory, ignore_errors=True)
+                    os.makedirs(directory, exist_ok=True)
+                    part_numbers[key] = 0
+                table = pa.Table.from_pandas(partition[STORE_COLUMNS], preserve_index=False)
+                pq.write_table(table, os.path.join(directory, f"part-{part_numbers[key]:05d}.parquet"), row_group_size=_ROW_GROUP_SIZE)
+                part_numbers[key] += 1
+                written[f"{key[0]}/{key[1]}"] = written.get(f"{key[0]}/{key[1]}", 0) + len(partition)
+
+    # Leading underscore keeps the manifest out of the dataset scan
+    manifest_path = os.path.join(root, "_manifest.json")
+    manifest = {}
+    if os.path.exists(manifest_path):
+        with open(manifest_path) as handle:
+            manifest = json.load(handle)
+    for partition, rows in written.items():
+        manifest[partition] = {"rows": rows, "sources": [os.path.basename(path) for path in paths], "ingested_at": datetime.now().isoformat()}
+    with open(manifest_path, "w") as handle:
+        json.dump(manifest, handle, indent=2, sort_keys=True)
+
+    _open_dataset.cache_clear()
+    return written
+
+
+@lru_cache(maxsize=1)
+def _open_dataset() -> Any:
+    import pyarrow as pa
+    import pyarrow.dataset as ds
+
+    root = _store_root()
+    if not glob.glob(os.path.join(root, "year=*", "qtr=*", "*.parquet")):
+        return None
+    # Explicit types so quarter "1" and "A" partitions share one string column
+    partitioning = ds.partitioning(pa.schema([("year", pa.int16()), ("qtr", pa.string())]), flavor="hive")
+    return ds.dataset(root, format="parquet", partitioning=partitioning)
+
+
+def qcew_store_partitions() -> List[Tuple[int, str]]:
+    """(year, quarter) partitions in the store, newest first; quarter is "A" for annual averages."""
+    partitions = []
+    for directory in glob.glob(os.path.join(_store_root(), "year=*", "qtr=*")):
+        year = os.path.basename(os.path.dirname(directory)).split("=", 1)[1]
+        qtr = os.path.basename(directory).split("=", 1)[1]
+        partitions.append((int(year), qtr))
+    return sorted(partitions, reverse=True)
+
+
+def query_qcew_store(
+    area_codes: Optional[List[str]] = None,
+    industry_codes: Optional[List[str]] = None,
+    ownership_codes: Optional[List[str]] = None,
+    years: Optional[List[int]] = None,
+    quarters: Optional[List[str]] = None,
+    columns: Optional[List[str]] = None
+) -> Optional[List[Dict[str, Any]]]:
+    """
+    Read rows from the store; every filter given is pushed down to the Parquet scan.
+
+    Returns:
+        List of row dicts (store columns plus year and qtr), or None when no store is built
+    """
+    import pyarrow.dataset as ds
+
+    dataset = _open_dataset()
+    if dataset is None:
+        return None
+
+    conditions = []
+    if years:
+        conditions.append(ds.field("year").isin([int(year) for year in years]))
+    if quarters:
+        conditions.append(ds.field("qtr").isin([str(quarter).upper() for quarter in quarters]))
+    if area_codes:
+        conditions.append(ds.field("area_fips").isin(list(area_codes)))
+    if industry_codes:
+        conditions.append(ds.field("industry_code").isin(list(industry_codes)))
+    if ownership_codes:
+        conditions.append(ds.field("own_code").isin(list(ownership_codes)))
+
+    expression = None
+    for condition in conditions:
+        expression = condition if expression is None else expression & condition
+    rows = dataset.to_table(columns=columns, filter=expression).to_pylist()
+    # pyarrow returns NaN for missing doubles; None reads better in JSON results
+    for row in rows:
+        for column in ("total_wages", "avg_weekly_wage", "employee_lq"):
+            if column in row and row[column] is not None and row[column] != row[column]:
+                row[column] = None
+    return rows
+
+
+def qcew_store_status() -> Dict[str, Any]:
+    """Store directory and the partitions it holds."""
+    return {
+        "data_dir": os.path.abspath(_SETTINGS["data_dir"]),
+        "partitions": [f"{year}/{qtr}" for year, qtr in qcew_store_partitions()],
+    }
+
+
+def screen_qcew_counties(
+    state_fips: str,
+    industry_codes: Optional[List[str]] = None,
+    year: Optional[str] = None,
+    ownership_code: Optional[str] = "5",
+    min_employees: Optional[int] = 0,
+    sort_by: Optional[str] = "employees",
+    limit: Optional[int] = 50
+) -> Dict[str, Any]:
+    """
+    Screen every county in a state by industry from the local QCEW store.
+
+    Args:
+        state_fips (str): 2-digit state FIPS code (e.g., "17")
+        industry_codes (Optional[List[str]]): Industry codes to include (e.g., ["311", "3254"]).
+                                              Defaults to every 6-digit NAICS industry.
+        year (Optional[str]): Year of annual averages. Defaults to the newest year in the store.
+        ownership_code (Optional[str]): "0" total covered, "1" federal, "2" state, "3" local government,
+                                        "5" private (default)
+        min_employees (Optional[int]): Drop rows with fewer employees (default: 0)
+        sort_by (Optional[str]): "employees", "establishments", "avg_weekly_wage" or "employee_lq"
+        limit (Optional[int]): Maximum rows to return (default: 50, max: 1000)
+
+    Returns:
+        Dict[str, Any]: Response containing:
+            - status: "success" or "error"
+            - year: Year screened
+            - total_matches: Rows matching before the limit
+            - rows: County-industry rows with area and industry names, employees, establishments,
+                    average weekly wage and the BLS employment location quotient
+            - error_message: Error details (if unsuccessful)
+    """
+    try:
+        if not isinstance(state_fips, str) or len(state_fips) != 2 or not state_fips.isdigit():
+            return {"status": "error", "error_message": "state_fips must be a 2-digit string (e.g., '17')."}
+        if sort_by not in ("employees", "establishments", "avg_weekly_wage", "employee_lq"):
+            return {"status": "error", "error_message": "sort_by must be one of: employees, establishments, avg_weekly_wage, employee_lq."}
+        limit = limit or 50
+        if not isinstance(limit, int) or not 1 <= limit <= 1000:
+            return {"status": "error", "error_message": "limit must be an integer between 1 and 1000."}
+
+        annual_years = [partition_year for partition_year, qtr in qcew_store_partitions() if qtr == "A"]
+        if not annual_years:
+            return {"status": "error", "error_message": "No annual QCEW data in the local store. Ingest singlefile archives with python -m tools.qcew_data.qcew_store."}
+        year = int(year) if year else annual_years[0]
+
+        area_index = get_code_index("qcew_area")
+        counties = [code for code in area_index.names if code.startswith(state_fips) and code[2:] not in ("000", "999")]
+        rows = query_qcew_store(
+            area_codes=counties,
+            industry_codes=industry_codes or None,
+            ownership_codes=[ownership_code or "5"],
+            years=[year],
+            quarters=["A"]
+        ) or []
+
+        if not industry_codes:
+            rows = [row for row in rows if len(row["industry_code"]) == 6 and row["industry_code"].isdigit()]
+        rows = [row for row in rows if row["employees"] >= (min_employees or 0)]
+        rows.sort(key=lambda row: (-(row[sort_by] or 0), row["area_fips"], row["industry_code"]))
+
+        industry_index = get_code_index("naics")
+        return {
+            "status": "success",
+            "year": str(year),
+            "total_matches": len(rows),
+            "rows": [
+                {
+                    "area_fips": row["area_fips"],
+                    "area_name": area_index.name(row["area_fips"], row["area_fips"]),
+                    "industry_code": row["industry_code"],
+                    "industry_name": industry_index.name(row["industry_code"], row["industry_code"]),
+                    "employees": row["employees"],
+                    "establishments": row["establishments"],
+                    "avg_weekly_wage": row["avg_weekly_wage"],
+                    "employee_lq": row["employee_lq"],
+                    "disclosure_code": row["disclosure_code"],
+                }
+                for row in rows[:limit]
+            ],
+        }
+
+    except ImportError:
+        return {"status": "error", "error_message": "The QCEW store requires pyarrow (pip install pyarrow)."}
+    except Exception as e:
+        return {"status": "error", "error_message": f"Unexpected error: {str(e)}"}
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Ingest BLS QCEW singlefile archives into the local Parquet store")
+    parser.add_argument("paths", nargs="+", help="Annual or quarterly singlefile CSV or zip files")
+    parser.add_argument("--output-dir", default=_SETTINGS["data_dir"], help="Store directory")
+    args = parser.parse_args()
+
+    for partition, count in ingest_qcew_singlefiles(args.paths, args.output_dir).items():
+        print(f"{partition}: {count} rows")
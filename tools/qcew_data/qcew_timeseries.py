@@ -0,0 +1,179 @@
+import json
+from datetime import date
+from typing import Dict, Any, List, Optional, Tuple
+
+import numpy as np
+
+from tools.common.bls_api import fetch_bls_series, BLSQuotaExceededError
+from tools.common.code_index import get_code_index
+from tools.common.regional_metrics import period_growth, compound_annual_growth
+from tools.qcew_data.qcew_data import _to_qcew_area
+
+"""
+QCEW Time Series
+
+This module returns QCEW employment and establishment counts as quarterly time series over
+a range of years. The whole range is requested in each batch of 50 series (the BLS API
+serves up to 20 years per request), so a ten-year series costs the same number of calls
+as a single year. Every series is aligned to one shared quarter axis and returned as
+compact arrays with year-over-year growth and CAGR computed server-side.
+"""
+
+# The BLS Public Data API returns at most 20 years per request with a registration key
+MAX_YEARS = 20
+
+_MEASURES = {"1": "employees", "2": "establishments"}
+_OWNERSHIP_NAMES = {"0": "Total Covered", "5": "Private"}
+
+
+def _round_list(values: np.ndarray, digits: int) -> List[Optional[float]]:
+    return [None if np.isnan(value) else round(float(value), digits) for value in values]
+
+
+def fetch_qcew_quarterly(
+    area_codes: List[str],
+    industry_codes: List[str],
+    start_year: int,
+    end_year: int,
+    data_codes: Tuple[str, ...] = tuple(_MEASURES)
+) -> Tuple[Dict[Tuple[str, str, str], Tuple[str, np.ndarray]], Optional[Dict[str, Any]]]:
+    """
+    Fetch quarterly QCEW series for every area, industry and data code over a year range.
+
+    Returns:
+        A tuple of the rows, (area code, industry code, data code) -> (ownership code, values),
+        where values has one column per quarter from Q1 of start_year (NaN when unpublished),
+        and partial-result metadata for series whose batches failed (None when all succeeded).
+        Series with no data are left out.
+
+    Raises:
+        BLSQuotaExceededError: If the series do not fit today's BLS API budget
+    """
+    # Both ownerships are requested because an industry's series exists under only one of them
+    series_ids = [
+        f"ENU{area_code}{data_code}0{ownership_code}{industry_code}"
+        for area_code in area_codes
+        for industry_code in industry_codes
+        for data_code in data_codes
+        for ownership_code in _OWNERSHIP_NAMES
+    ]
+    params = {"startyear": str(start_year), "endyear": str(end_year)}
+    baseline_ids = [series_id for series_id in series_ids if series_id[3:8] == "US000"]
+    batch_results = fetch_bls_series(series_ids, params, baseline_ids, "quarterly")
+
+    # Quarter axis: column = (year - start_year) * 4 + quarter - 1
+    years = end_year - start_year + 1
+    rows: Dict[Tuple[str, str, str], Tuple[str, np.ndarray]] = {}
+    for batch_series in batch_results:
+        for series in batch_series:
+            series_id = series["seriesID"]
+            area_code, data_code, ownership_code, industry_code = series_id[3:8], series_id[8:9], series_id[10:11], series_id[11:]
+            values = np.full(years * 4, np.nan)
+            for item in series.get("data", []):
+                period = item.get("period", "")
+                if not (period.startswith("Q") and period[1:].isdigit() and 1 <= int(period[1:]) <= 4):
+                    continue
+                column = (int(item["year"]) - start_year) * 4 + int(period[1:]) - 1
+                if 0 <= column < len(values) and item.get("value") not in (None, "", "-"):
+                    values[column] = float(item["value"])
+            if np.isnan(values).all():
+                continue
+            # Prefer total covered over private ownership when both exist
+            key = (area_code, industry_code, data_code)
+            if key not in rows or ownership_code == "0":
+                rows[key] = (ownership_code, values)
+    return rows, batch_results.partial_results()
+
+
+def get_qcew_time_series(
+    geo_codes: List[str],
+    industry_codes: List[str],
+    start_year: str,
+    end_year: Optional[str] = None
+) -> Dict[str, Any]:
+    """
+    Get quarterly QCEW employment and establishment time series with growth metrics.
+
+    Args:
+        geo_codes (list): Geographic area codes (e.g., ["US000", "17043"]). 2-digit state FIPS codes are accepted.
+        industry_codes (list): Industry codes (e.g., ["10", "1013"])
+        start_year (str): First year of the series (e.g., "2015")
+        end_year (str, optional): Last year of the series; defaults to the current year. At most
+                                  20 years are returned per request.
+
+    Returns:
+        dict: Response containing:
+            - status: "success" or "error"
+            - periods: Shared quarter axis (e.g., ["2015-Q1", ..., "2024-Q4"]) trimmed to published quarters
+            - series: One entry per area, industry and measure with values aligned to periods,
+                      yoy_growth (vs. the same quarter a year earlier) and cagr (latest quarter vs.
+                      the same quarter in the first year with data)
+            - partial_results: Series missing because their BLS batches failed (only when some did)
+            - error_message: Error details (if unsuccessful)
+    """
+    try:
+        end_year = int(end_year) if end_year else date.today().year
+        start_year = int(start_year)
+        if start_year > end_year:
+            return {"status": "error", "error_message": "start_year must not be after end_year."}
+        if end_year - start_year + 1 > MAX_YEARS:
+            return {"status": "error", "error_message": f"At most {MAX_YEARS} years can be requested at once."}
+        if not geo_codes or not industry_codes:
+            return {"status": "error", "error_message": "geo_codes and industry_codes must be non-empty lists."}
+
+        area_codes = list(dict.fromkeys(_to_qcew_area(geo_code) for geo_code in geo_codes))
+        industry_codes = list(dict.fromkeys(industry_codes))
+
+        try:
+            rows, partial_results = fetch_qcew_quarterly(area_codes, industry_codes, start_year, end_year)
+        except BLSQuotaExceededError as e:
+            return {"status": "error", "error_message": str(e)}
+
+        if not rows:
+            return {"status": "error", "error_message": f"No QCEW data found for {start_year}-{end_year}."}
+
+        keys = [
+            (area_code, industry_code, data_code)
+            for area_code in area_codes
+            for industry_code in industry_codes
+            for data_code in _MEASURES
+            if (area_code, industry_code, data_code) in rows
+        ]
+        matrix = np.vstack([rows[key][1] for key in keys])
+        # Trim quarters no series has data for (e.g., not yet published)
+        published = np.flatnonzero(~np.isnan(matrix).all(axis=0))
+        first, last = published[0], published[-1]
+        yoy = period_growth(matrix, 4)[:, first:last + 1]
+        cagr = compound_annual_growth(matrix, 4)
+        matrix = matrix[:, first:last + 1]
+
+        industry_index = get_code_index("naics")
+        area_index = get_code_index("qcew_area")
+        response = {
+            "status": "success",
+            "periods": [f"{start_year + column // 4}-Q{column % 4 + 1}" for column in range(first, last + 1)],
+            "series": [
+                {
+                    "area_code": area_code,
+                    "area_name": area_index.name(area_code, area_code),
+                    "industry_code": industry_code,
+                    "industry_name": industry_index.name(industry_code, industry_code),
+                    "ownership": _OWNERSHIP_NAMES[rows[(area_code, industry_code, data_code)][0]],
+                    "measure": _MEASURES[data_code],
+                    "values": [None if np.isnan(value) else int(value) for value in matrix[row]],
+                    "yoy_growth": _round_list(yoy[row], 4),
+                    "cagr": _round_list(cagr[row:row + 1], 4)[0],
+                }
+                for row, (area_code, industry_code, data_code) in enumerate(keys)
+            ],
+        }
+        if partial_results:
+            response["partial_results"] = partial_results
+        return response
+
+    except Exception as e:
+        return {"status": "error", "error_message": f"Unexpected error: {str(e)}"}
+
+
+if __name__ == "__main__":
+    print(json.dumps(get_qcew_time_series(["17043"], ["1013"], "2019"), indent=2))
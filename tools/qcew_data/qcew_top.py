@@ -0,0 +1,132 @@
+import heapq
+import json
+from typing import Dict, Any, Optional
+
+from tools.common.code_index import get_code_index
+from tools.qcew_data.qcew_data import _to_qcew_area
+from tools.qcew_data.qcew_slices import fetch_qcew_slice, _candidate_years
+from tools.qcew_data.qcew_store import query_qcew_store, qcew_store_partitions
+
+"""
+QCEW Top Industries
+
+This module answers "what are the largest / most concentrated / best paying industries in
+this area" without guessing NAICS codes first. Every industry for the area is read in one
+QCEW open data area slice (or one local store query), filtered to a NAICS level, and the
+top k are selected with a heap.
+"""
+
+TOP_INDUSTRY_METRICS = ["employees", "establishments", "employee_lq", "avg_weekly_wage"]
+
+
+def _naics_level(industry_code: str) -> Optional[int]:
+    """NAICS digits of a QCEW industry code, or None for QCEW aggregates ("10", "101", "1013")."""
+    if industry_code.startswith("10"):
+        return None
+    if "-" in industry_code:
+        # Combined sectors: "31-33", "44-45", "48-49"
+        return 2
+    return len(industry_code) if industry_code.isdigit() else None
+
+
+def get_top_industries(
+    area_code: str,
+    metric: Optional[str] = "employees",
+    top_k: Optional[int] = 10,
+    naics_level: Optional[int] = 6,
+    ownership_code: Optional[str] = "5",
+    year: Optional[str] = None,
+    min_employees: Optional[int] = 0,
+    backend: Optional[str] = "slices"
+) -> Dict[str, Any]:
+    """
+    Top industries in one area by employment, establishments, location quotient or wage.
+
+    Args:
+        area_code (str): QCEW area code (e.g., "17043", "C1698", "17000") or 2-digit state FIPS code
+        metric (str): "employees" (default), "establishments", "employee_lq" (BLS employment location
+                      quotient against the U.S.) or "avg_weekly_wage"
+        top_k (int): Number of industries to return (default: 10, max: 100)
+        naics_level (int): NAICS digits to rank at, 2 (sector) to 6 (national industry; default)
+        ownership_code (str): "5" private (default) or "0" total covered; the "store" backend also
+                              accepts "1" federal, "2" state and "3" local government
+        year (str): Year of annual averages; defaults to the latest published (or stored) year
+        min_employees (int): Skip industries with fewer employees, useful with employee_lq (default: 0)
+        backend (str): "slices" (default, QCEW open data area slice) or "store" (local QCEW Parquet store)
+
+    Returns:
+        Dict[str, Any]: Response containing:
+            - status: "success" or "error"
+            - area_code, area_name, year, metric
+            - industries: Top industries in rank order with code, name, employees, establishments,
+                          employee_lq and avg_weekly_wage
+            - error_message: Error details (if unsuccessful)
+    """
+    try:
+        if metric not in TOP_INDUSTRY_METRICS:
+            return {"status": "error", "error_message": f"metric must be one of: {', '.join(TOP_INDUSTRY_METRICS)}."}
+        top_k = top_k or 10
+        if not isinstance(top_k, int) or not 1 <= top_k <= 100:
+            return {"status": "error", "error_message": "top_k must be an integer between 1 and 100."}
+        naics_level = naics_level or 6
+        if naics_level not in (2, 3, 4, 5, 6):
+            return {"status": "error", "error_message": "naics_level must be 2, 3, 4, 5 or 6."}
+        ownership_code = ownership_code or "5"
+        area_code = _to_qcew_area(area_code)
+
+        if backend == "store":
+            annual_years = [store_year for store_year, qtr in qcew_store_partitions() if qtr == "A"]
+            if not annual_years:
+                return {"status": "error", "error_message": "No annual QCEW data in the local store. Ingest singlefile archives with python -m tools.qcew_data.qcew_store."}
+            year = int(year) if year else annual_years[0]
+            rows = query_qcew_store(area_codes=[area_code], ownership_codes=[ownership_code], years=[year], quarters=["A"]) or []
+            rows = [dict(row, disclosed=row["disclosure_code"] != "N") for row in rows]
+        elif backend in (None, "slices"):
+            if ownership_code not in ("0", "5"):
+                return {"status": "error", "error_message": "The slices backend supports ownership_code '0' or '5'."}
+            rows = None
+            for candidate_year in _candidate_years(year):
+                rows = fetch_qcew_slice("area", area_code, candidate_year)
+                if rows is not None:
+                    year = candidate_year
+                    break
+            if rows is None:
+                return {"status": "error", "error_message": f"No QCEW open data slice found for area {area_code} in {year or 'the last two years'}."}
+            rows = [row for row in rows if row["own_code"] == ownership_code]
+        else:
+            return {"status": "error", "error_message": "backend must be 'slices' or 'store'."}
+
+        candidates = (
+            row for row in rows
+            if row["disclosed"] and _naics_level(row["industry_code"]) == naics_level and row["employees"] >= (min_employees or 0)
+        )
+        top = heapq.nlargest(top_k, candidates, key=lambda row: (row[metric] or 0, row["employees"]))
+
+        industry_index = get_code_index("naics")
+        return {
+            "status": "success",
+            "area_code": area_code,
+            "area_name": get_code_index("qcew_area").name(area_code, area_code),
+            "year": str(year),
+            "metric": metric,
+            "industries": [
+                {
+                    "industry_code": row["industry_code"],
+                    "industry_name": industry_index.name(row["industry_code"], row["industry_code"]),
+                    "employees": row["employees"],
+                    "establishments": row["establishments"],
+                    "employee_lq": row["employee_lq"],
+                    "avg_weekly_wage": row["avg_weekly_wage"],
+                }
+                for row in top
+            ],
+        }
+
+    except ImportError:
+        return {"status": "error", "error_message": "The QCEW store backend requires pyarrow (pip install pyarrow)."}
+    except Exception as e:
+        return {"status": "error", "error_message": f"Unexpected error: {str(e)}"}
+
+
+if __name__ == "__main__":
+    print(json.dumps(get_top_industries("17043", "employee_lq", 10, min_employees=100), indent=2))